@@ -0,0 +1,93 @@
+"""Conditional GET helpers: ETag/If-None-Match and Last-Modified.
+
+Routes compute a validator from cheap version data (row revision counters,
+content hashes from the context index) before loading the full resource. If
+the client already has that version, ``not_modified`` returns a bodiless 304
+and the route skips the expensive work.
+
+ETags are weak (``W/``) because the same representation may be sent gzipped
+or not.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+
+# Bump when a response schema changes so clients drop stale representations.
+REPRESENTATION_VERSION = "2"
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.sha256(
+        "\x1f".join([REPRESENTATION_VERSION, *map(str, parts)]).encode("utf-8")
+    ).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def latest(values: Iterable[Optional[datetime]]) -> Optional[datetime]:
+    present = [_as_utc(value) for value in values if value is not None]
+    return max(present) if present else None
+
+
+def not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: Optional[str] = None,
+) -> Optional[Response]:
+    """Set validator headers on ``response``; return a 304 if the client is current.
+
+    Per RFC 9110, ``If-Modified-Since`` is only consulted when the request
+    has no ``If-None-Match``.
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        current = _weak_match(if_none_match, etag)
+    else:
+        current = _not_modified_since(
+            request.headers.get("if-modified-since"), last_modified
+        )
+    if current:
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def _weak_match(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+def _not_modified_since(header: Optional[str], last_modified: Optional[datetime]):
+    if not header or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision.
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Annotated, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import BaseModel
+
+from ..context.store import ContextEntry, ContextStore
+from ..core.config import Settings, get_settings
+from .caching import latest, make_etag, not_modified
+from .dependencies import get_context_store
+
+router = APIRouter(prefix="/api")
+
+
+class ContextRead(BaseModel):
+    slug: str
+    content: str
+    content_hash: str
+    size: int
+    updated_at: datetime
+
+
+class ContextPage(BaseModel):
+    total: int
+    limit: int
+    offset: int
+    items: List[ContextRead]
+
+
+@router.get("/contexts", response_model=ContextPage)
+async def list_contexts(
+    request: Request,
+    response: Response,
+    store: Annotated[ContextStore | None, Depends(get_context_store)],
+    settings: Annotated[Settings, Depends(get_settings)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    offset: Annotated[int, Query(ge=0)] = 0,
+) -> ContextPage:
+    """List context files by name.
+
+    The validators come from the store's index (content hashes and mtimes),
+    so an unchanged listing answers 304 without reading any file.
+    """
+    if store is None:
+        raise HTTPException(status_code=503, detail="Context store unavailable")
+    entries, total = await asyncio.to_thread(_page, store, limit, offset)
+    cached = not_modified(
+        request,
+        response,
+        make_etag("contexts", limit, offset, total, *_versions(entries)),
+        latest(_modified(entry) for entry in entries),
+        settings.cache_control_contexts,
+    )
+    if cached is not None:
+        return cached
+
+    items = await asyncio.to_thread(_read_items, entries)
+    return ContextPage(total=total, limit=limit, offset=offset, items=items)
+
+
+def _page(store: ContextStore, limit: int, offset: int):
+    return store.list_entries(offset=offset, limit=limit), store.count()
+
+
+def _versions(entries: List[ContextEntry]) -> List[str]:
+    return [f"{entry.slug}:{entry.content_hash}" for entry in entries]
+
+
+def _modified(entry: ContextEntry) -> datetime:
+    return datetime.fromtimestamp(entry.mtime_ns / 1e9, tz=timezone.utc)
+
+
+def _read_items(entries: List[ContextEntry]) -> List[ContextRead]:
+    items = []
+    for entry in entries:
+        try:
+            content = entry.content
+        except FileNotFoundError:
+            continue
+        items.append(
+            ContextRead(
+                slug=entry.slug,
+                content=content,
+                content_hash=entry.content_hash,
+                size=entry.size,
+                updated_at=_modified(entry),
+            )
+        )
+    return items
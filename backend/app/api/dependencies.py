@@ -1,45 +1,188 @@
+from contextlib import AsyncExitStack
+from functools import lru_cache
 from pathlib import Path
 
-from fastapi import Depends
-from sqlalchemy.engine.url import make_url
-from sqlmodel import SQLModel
+import httpx
+from fastapi import Request
 
+from ..context.store import ContextStore
 from ..core.config import Settings, get_settings
-from ..core.db import get_engine, get_session
-from ..prompts.repository import FilePromptRepository
-from ..suggestions.service import ClaudeClient, LLMClient, SuggestionService
+from ..core.tracing import span
+from ..prompts.repository import CachedPromptRepository
+from ..search.index import SearchIndex
+from ..suggestions.budget import BudgetedLLMClient, TokenBudget
+from ..suggestions.cache import (
+    CachedLLMClient,
+    LLMResponseCache,
+    MemoryLRU,
+    SQLiteResponseStore,
+)
+from ..suggestions.grounding import ContextRetriever
+from ..suggestions.jobs import SuggestionJobQueue
+from ..suggestions.limiter import LimitedLLMClient, LLMLimiter
+from ..suggestions.resilience import (
+    CircuitBreaker,
+    LatencyTracker,
+    ResilientLLMClient,
+)
+from ..suggestions.service import (
+    ClaudeClient,
+    LLMClient,
+    SuggestionService,
+    is_complete_response,
+)
 
 
-def get_prompt_repository() -> FilePromptRepository:
+def get_prompt_repository() -> CachedPromptRepository:
     settings = get_settings()
-    return FilePromptRepository(prompts_dir=settings.prompts_dir)
+    return _prompt_repository_for(Path(settings.prompts_dir))
 
 
-def get_llm_client() -> LLMClient:
-    settings = get_settings()
-    # In a real app, we might check APP_ENV or similar
-    # For now, if we have a real key, we can use the real client
-    # but for tests, we will use dependency_overrides.
-    return ClaudeClient(api_key=settings.claude_api_key, model=settings.claude_model)
+@lru_cache
+def _prompt_repository_for(prompts_dir: Path) -> CachedPromptRepository:
+    return CachedPromptRepository(prompts_dir=prompts_dir)
+
+
+def build_llm_cache(settings: Settings) -> LLMResponseCache | None:
+    if not settings.llm_cache_enabled:
+        return None
+    memory = MemoryLRU(
+        max_entries=settings.llm_cache_memory_entries,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+    )
+    store = SQLiteResponseStore(
+        path=settings.llm_cache_path,
+        max_entries=settings.llm_cache_max_entries,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+    )
+    return LLMResponseCache(memory, store, version=settings.llm_cache_version)
+
+
+def build_llm_client(
+    settings: Settings,
+    http_client: httpx.AsyncClient,
+    llm_cache: LLMResponseCache | None = None,
+    budget: TokenBudget | None = None,
+) -> LLMClient:
+    client: LLMClient = ClaudeClient(
+        api_key=settings.claude_api_key,
+        model=settings.claude_model,
+        http_client=http_client,
+        url=settings.claude_messages_url,
+        cache_system=settings.claude_prompt_cache,
+        cache_min_tokens=settings.claude_prompt_cache_min_tokens,
+    )
+    # Limiter below the retries and hedging so every upstream attempt, hedges
+    # included, takes its own slot and rate budget.
+    client = LimitedLLMClient(
+        client,
+        LLMLimiter(
+            requests_per_minute=settings.llm_requests_per_minute,
+            tokens_per_minute=settings.llm_tokens_per_minute,
+            max_concurrency=settings.llm_max_concurrency,
+            max_queue=settings.llm_max_queue,
+            max_wait=settings.llm_max_queue_wait_seconds,
+        ),
+        expected_output_tokens=settings.llm_expected_output_tokens,
+    )
+    client = ResilientLLMClient(
+        client,
+        max_retries=settings.llm_max_retries,
+        backoff_base=settings.llm_backoff_base_seconds,
+        backoff_max=settings.llm_backoff_max_seconds,
+        deadline=settings.llm_deadline_seconds or None,
+        breaker=CircuitBreaker(
+            failure_threshold=settings.llm_breaker_failure_threshold,
+            reset_timeout=settings.llm_breaker_reset_seconds,
+        ),
+        hedge_percentile=(
+            settings.llm_hedge_percentile if settings.llm_hedge_enabled else None
+        ),
+        latency=LatencyTracker(min_samples=settings.llm_hedge_min_samples),
+    )
+    # Budget below the cache so cached answers are free and keyed on the
+    # prompt's full output budget rather than a downgraded one.
+    if budget is not None:
+        client = BudgetedLLMClient(client, budget)
+    # Cache outermost so hits never touch the budget, limiter, breaker or retries.
+    if llm_cache is not None:
+        client = CachedLLMClient(
+            client,
+            llm_cache,
+            model=settings.claude_model,
+            should_cache=is_complete_response,
+        )
+    return client
+
+
+def build_token_budget(settings: Settings) -> TokenBudget:
+    return TokenBudget(
+        max_output_tokens=settings.llm_max_output_tokens,
+        output_tokens_by_prompt=settings.llm_output_tokens_by_prompt,
+        per_call=settings.llm_max_tokens_per_call,
+        per_day=settings.llm_max_tokens_per_day,
+        mode=settings.llm_budget_mode,
+        min_output_tokens=settings.llm_min_output_tokens,
+    )
+
+
+def build_suggestion_service(
+    settings: Settings,
+    http_client: httpx.AsyncClient,
+    llm_cache: LLMResponseCache | None = None,
+    context_store: ContextStore | None = None,
+) -> SuggestionService:
+    """Build the app-scoped service; called once from the lifespan."""
+    retriever = None
+    if context_store is not None:
+        retriever = ContextRetriever(
+            context_store,
+            token_budget=settings.context_token_budget,
+            chunk_tokens=settings.context_chunk_tokens,
+        )
+    budget = build_token_budget(settings)
+    return SuggestionService(
+        get_prompt_repository(),
+        build_llm_client(settings, http_client, llm_cache, budget),
+        context_retriever=retriever,
+        budget=budget,
+    )
 
 
-def get_suggestion_service() -> SuggestionService:
-    return SuggestionService(get_prompt_repository(), get_llm_client())
+def get_suggestion_service(request: Request) -> SuggestionService:
+    return request.app.state.suggestion_service
 
 
-async def get_session_dep(settings: Settings = Depends(get_settings)):  # noqa: B008
-    _ensure_sqlite_dir(settings.database_url)
-    engine = get_engine(settings)
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
-    async with get_session(engine) as session:
+def get_token_budget(request: Request) -> TokenBudget:
+    return request.app.state.suggestion_service.budget
+
+
+async def get_session_dep(request: Request):
+    async with AsyncExitStack() as stack:
+        with span("di.session"):
+            session = await stack.enter_async_context(
+                request.app.state.database.session()
+            )
+        yield session
+
+
+async def get_read_session_dep(request: Request):
+    """Session for read-only routes; uses the read engine where there is one."""
+    async with AsyncExitStack() as stack:
+        with span("di.session"):
+            session = await stack.enter_async_context(
+                request.app.state.database.read_session()
+            )
         yield session
 
 
-def _ensure_sqlite_dir(database_url: str) -> None:
-    url = make_url(database_url)
-    if url.drivername.startswith("sqlite") and url.database:
-        path = Path(url.database)
-        if not path.is_absolute():
-            path = Path.cwd() / path
-        path.parent.mkdir(parents=True, exist_ok=True)
+def get_search_index(request: Request) -> SearchIndex | None:
+    return getattr(request.app.state, "search_index", None)
+
+
+def get_context_store(request: Request) -> ContextStore | None:
+    return getattr(request.app.state, "context_store", None)
+
+
+def get_job_queue(request: Request) -> SuggestionJobQueue:
+    return request.app.state.job_queue
@@ -0,0 +1,62 @@
+from typing import Annotated, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models import Suggestion, SuggestionJob
+from ..suggestions.jobs import SuggestionJobQueue
+from .dependencies import get_job_queue, get_read_session_dep
+from .suggestions import SuggestionRequest
+
+router = APIRouter(prefix="/api")
+
+
+class SuggestionJobRead(BaseModel):
+    id: int
+    topic: str
+    status: str
+    topic_id: Optional[int] = None
+    suggestions: List[str] = []
+    error: Optional[str] = None
+
+
+@router.post("/suggestion-jobs", response_model=SuggestionJobRead, status_code=202)
+async def create_suggestion_job(
+    request: SuggestionRequest,
+    queue: Annotated[SuggestionJobQueue, Depends(get_job_queue)],
+) -> SuggestionJobRead:
+    """Queue suggestion generation and return immediately; poll for the result."""
+    job = await queue.submit(request.topic)
+    return SuggestionJobRead(id=job.id, topic=job.topic, status=job.status)
+
+
+@router.get("/suggestion-jobs/{job_id}", response_model=SuggestionJobRead)
+async def get_suggestion_job(
+    job_id: int,
+    session: Annotated[AsyncSession, Depends(get_read_session_dep)],
+) -> SuggestionJobRead:
+    job = await session.get(SuggestionJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    suggestions: List[str] = []
+    if job.topic_id is not None:
+        suggestions = list(
+            (
+                await session.exec(
+                    select(Suggestion.content)
+                    .where(Suggestion.topic_id == job.topic_id)
+                    .order_by(Suggestion.position)
+                )
+            ).all()
+        )
+    return SuggestionJobRead(
+        id=job.id,
+        topic=job.topic,
+        status=job.status,
+        topic_id=job.topic_id,
+        suggestions=suggestions,
+        error=job.error,
+    )
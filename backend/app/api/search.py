@@ -0,0 +1,45 @@
+import asyncio
+from typing import Annotated, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+
+from ..search.index import SearchIndex
+from .dependencies import get_search_index
+
+router = APIRouter(prefix="/api")
+
+
+class SearchHitRead(BaseModel):
+    kind: str
+    ref: str
+    title: str
+    snippet: str
+    score: float
+
+    model_config = {"from_attributes": True}
+
+
+class SearchResponse(BaseModel):
+    total: int
+    limit: int
+    offset: int
+    results: List[SearchHitRead]
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search(
+    q: Annotated[str, Query(min_length=1)],
+    index: Annotated[SearchIndex | None, Depends(get_search_index)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    offset: Annotated[int, Query(ge=0)] = 0,
+) -> SearchResponse:
+    if index is None:
+        raise HTTPException(status_code=503, detail="Search index unavailable")
+    page = await asyncio.to_thread(index.search, q, limit, offset)
+    return SearchResponse(
+        total=page.total,
+        limit=limit,
+        offset=offset,
+        results=[SearchHitRead.model_validate(hit) for hit in page.hits],
+    )
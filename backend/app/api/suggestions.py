@@ -1,14 +1,35 @@
-from typing import Annotated, List
+import json
+import logging
+from typing import Annotated, AsyncIterator, List, Optional, Sequence, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, field_validator
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..models import Suggestion, Topic
-from ..suggestions.service import SuggestionService
-from .dependencies import get_session_dep, get_suggestion_service
+from ..core.config import Settings, get_settings
+from ..core.persistence import add_topics, save_topic
+from ..models import Topic
+from ..search.index import SearchIndex, index_topic
+from ..suggestions.budget import BudgetExceeded
+from ..suggestions.limiter import RateLimitExceeded
+from ..suggestions.resilience import CircuitOpenError, UpstreamUnavailable
+from ..suggestions.service import SuggestionResult, SuggestionService
+from ..suggestions.tokens import TokenUsage
+from .dependencies import get_search_index, get_session_dep, get_suggestion_service
 
 router = APIRouter(prefix="/api")
+logger = logging.getLogger(__name__)
+
+# Errors whose message is meant for the client; anything else is logged and
+# reported generically.
+STREAM_ERRORS = (
+    ValueError,
+    CircuitOpenError,
+    UpstreamUnavailable,
+    RateLimitExceeded,
+    BudgetExceeded,
+)
 
 
 class SuggestionRequest(BaseModel):
@@ -22,8 +43,28 @@ class SuggestionRequest(BaseModel):
         return v.strip()
 
 
+class BatchSuggestionRequest(BaseModel):
+    topics: List[str] = Field(..., min_length=1)
+
+    @field_validator("topics")
+    @classmethod
+    def topics_must_not_be_blank(cls, v: List[str]) -> List[str]:
+        if any(not topic.strip() for topic in v):
+            raise ValueError("Topics cannot be blank")
+        return [topic.strip() for topic in v]
+
+
+class ContextUsage(BaseModel):
+    slug: str
+    tokens: int
+    score: float
+
+    model_config = {"from_attributes": True}
+
+
 class SuggestionResponse(BaseModel):
     suggestions: List[str]
+    context: List[ContextUsage] = []
 
 
 @router.post("/suggestions", response_model=SuggestionResponse)
@@ -31,19 +72,157 @@ async def create_suggestions(
     request: SuggestionRequest,
     service: Annotated[SuggestionService, Depends(get_suggestion_service)],
     session: Annotated[AsyncSession, Depends(get_session_dep)],
+    search_index: Annotated[SearchIndex | None, Depends(get_search_index)],
 ) -> SuggestionResponse:
     try:
-        suggestions = service.get_suggestions(request.topic)
+        result = await service.get_suggestions(request.topic)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
-    topic = Topic(title=request.topic.strip(), detail="")
-    session.add(topic)
-    await session.commit()
-    await session.refresh(topic)
+    topic = await save_topic(
+        session, request.topic, suggestions=result.suggestions, usage=result.usage
+    )
+    await index_topic(search_index, topic, result.suggestions)
+
+    return SuggestionResponse(
+        suggestions=result.suggestions,
+        context=[ContextUsage.model_validate(chunk) for chunk in result.context],
+    )
+
+
+class BatchSuggestionItem(BaseModel):
+    topic: str
+    topic_id: Optional[int] = None
+    suggestions: List[str] = []
+    context: List[ContextUsage] = []
+    error: Optional[str] = None
+
+
+class BatchSuggestionResponse(BaseModel):
+    results: List[BatchSuggestionItem]
+
+
+@router.post("/suggestions/batch", response_model=BatchSuggestionResponse)
+async def create_suggestions_batch(
+    request: BatchSuggestionRequest,
+    service: Annotated[SuggestionService, Depends(get_suggestion_service)],
+    session: Annotated[AsyncSession, Depends(get_session_dep)],
+    search_index: Annotated[SearchIndex | None, Depends(get_search_index)],
+    settings: Annotated[Settings, Depends(get_settings)],
+) -> BatchSuggestionResponse:
+    """Generate suggestions for many topics concurrently.
+
+    Topics that fail (for example a response without exactly 3 outlines) are
+    reported with an ``error`` and not persisted; the rest are saved in a
+    single transaction.
+    """
+    if len(request.topics) > settings.suggestion_batch_max_topics:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.suggestion_batch_max_topics} topics per batch",
+        )
+
+    outcomes = await service.get_suggestions_batch(
+        request.topics, concurrency=settings.suggestion_batch_concurrency
+    )
+    succeeded = [
+        (title, outcome)
+        for title, outcome in zip(request.topics, outcomes, strict=True)
+        if isinstance(outcome, SuggestionResult)
+    ]
+    topics = iter(await _persist_batch(session, succeeded))
+
+    items = []
+    for title, outcome in zip(request.topics, outcomes, strict=True):
+        if not isinstance(outcome, SuggestionResult):
+            items.append(BatchSuggestionItem(topic=title, error=str(outcome)))
+            continue
+        topic = next(topics)
+        await index_topic(search_index, topic, outcome.suggestions)
+        items.append(
+            BatchSuggestionItem(
+                topic=title,
+                topic_id=topic.id,
+                suggestions=outcome.suggestions,
+                context=[ContextUsage.model_validate(c) for c in outcome.context],
+            )
+        )
+    return BatchSuggestionResponse(results=items)
+
+
+@router.post("/suggestions/stream")
+async def stream_suggestions(
+    request: SuggestionRequest,
+    service: Annotated[SuggestionService, Depends(get_suggestion_service)],
+    session: Annotated[AsyncSession, Depends(get_session_dep)],
+    search_index: Annotated[SearchIndex | None, Depends(get_search_index)],
+) -> StreamingResponse:
+    """Stream each outline as a server-sent event as soon as it is complete.
 
-    for idx, content in enumerate(suggestions):
-        session.add(Suggestion(topic_id=topic.id, content=content, position=idx))
+    Emits ``outline`` events (``{"index", "content"}``), then a final ``done``
+    event with the persisted topic id and the context used, or an ``error``
+    event if the response did not contain exactly 3 outlines.
+    """
+
+    async def events() -> AsyncIterator[str]:
+        # The 200 and its headers are sent before the first event, so every
+        # failure from here on has to be reported in-band.
+        try:
+            async for event in _stream_events(
+                request.topic, service, session, search_index
+            ):
+                yield event
+        except STREAM_ERRORS as e:
+            yield _sse("error", {"detail": str(e)})
+        except Exception:
+            logger.exception("Streaming suggestions failed")
+            yield _sse("error", {"detail": "Suggestion generation failed"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _stream_events(
+    title: str,
+    service: SuggestionService,
+    session: AsyncSession,
+    search_index: SearchIndex | None,
+) -> AsyncIterator[str]:
+    suggestions: List[str] = []
+    usage = TokenUsage()
+    context = await service.select_context(title)
+    async for outline in service.stream_suggestions(title, context, usage):
+        yield _sse("outline", {"index": len(suggestions), "content": outline})
+        suggestions.append(outline)
+
+    topic = await save_topic(session, title, suggestions=suggestions, usage=usage)
+    await index_topic(search_index, topic, suggestions)
+    yield _sse(
+        "done",
+        {
+            "topic_id": topic.id,
+            "suggestions": suggestions,
+            "context": [
+                ContextUsage.model_validate(chunk).model_dump() for chunk in context
+            ],
+        },
+    )
+
+
+async def _persist_batch(
+    session: AsyncSession, results: Sequence[Tuple[str, SuggestionResult]]
+) -> List[Topic]:
+    topics = await add_topics(
+        session,
+        [(title, "", result.suggestions) for title, result in results],
+        [result.usage for _, result in results],
+    )
     await session.commit()
+    return topics
+
 
-    return SuggestionResponse(suggestions=suggestions)
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
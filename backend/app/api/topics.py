@@ -1,11 +1,20 @@
-from typing import Annotated
+from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel, Field, field_validator
+from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..api.dependencies import get_session_dep
-from ..models import Topic
+from ..api.dependencies import (
+    get_read_session_dep,
+    get_search_index,
+    get_session_dep,
+)
+from ..core.config import Settings, get_settings
+from ..core.persistence import save_topic
+from ..models import Draft, Suggestion, Topic
+from ..search.index import SearchIndex, index_topic
+from .caching import latest, make_etag, not_modified
 
 router = APIRouter(prefix="/api")
 
@@ -35,13 +44,123 @@ class TopicRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class TopicPage(BaseModel):
+    items: List[TopicRead]
+    next_cursor: Optional[int] = None
+
+
+class SuggestionRead(BaseModel):
+    id: int
+    content: str
+    position: int
+
+    model_config = {"from_attributes": True}
+
+
+class DraftRead(BaseModel):
+    id: int
+    content: str
+    selected_suggestion_index: Optional[int] = None
+
+    model_config = {"from_attributes": True}
+
+
+class TopicDetail(TopicRead):
+    suggestions: List[SuggestionRead]
+    drafts: List[DraftRead]
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+
 @router.post("/topics", response_model=TopicRead)
 async def create_topic(
     payload: TopicCreate,
     session: Annotated[AsyncSession, Depends(get_session_dep)],
+    search_index: Annotated[SearchIndex | None, Depends(get_search_index)],
 ) -> TopicRead:
-    topic = Topic(title=payload.title, detail=payload.detail)
-    session.add(topic)
-    await session.commit()
-    await session.refresh(topic)
+    topic = await save_topic(session, payload.title, payload.detail)
+    await index_topic(search_index, topic)
     return TopicRead.model_validate(topic)
+
+
+@router.get("/topics", response_model=TopicPage)
+async def list_topics(
+    request: Request,
+    response: Response,
+    session: Annotated[AsyncSession, Depends(get_read_session_dep)],
+    settings: Annotated[Settings, Depends(get_settings)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: Annotated[Optional[int], Query(ge=1)] = None,
+) -> TopicPage:
+    """List topics newest first.
+
+    Pass the returned ``next_cursor`` to get the following page. Pages are
+    keyed on the primary key, not an offset, so every page is an index range
+    scan however deep it is. A client that already has this page (same ids
+    and revisions) gets a 304 instead of the re-serialised payload.
+    """
+    query = select(Topic).order_by(col(Topic.id).desc()).limit(limit + 1)
+    if cursor is not None:
+        query = query.where(col(Topic.id) < cursor)
+    topics = (await session.exec(query)).all()
+
+    cached = not_modified(
+        request,
+        response,
+        make_etag("topics", limit, cursor, *(f"{t.id}:{t.revision}" for t in topics)),
+        latest(topic.updated_at for topic in topics),
+        settings.cache_control_topics,
+    )
+    if cached is not None:
+        return cached
+
+    next_cursor = topics[limit - 1].id if len(topics) > limit else None
+    return TopicPage(
+        items=[TopicRead.model_validate(topic) for topic in topics[:limit]],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/topics/{topic_id}", response_model=TopicDetail)
+async def get_topic(
+    topic_id: int,
+    request: Request,
+    response: Response,
+    session: Annotated[AsyncSession, Depends(get_read_session_dep)],
+    settings: Annotated[Settings, Depends(get_settings)],
+) -> TopicDetail:
+    """Return a topic with its suggestions and drafts.
+
+    The topic row's revision is the validator, so a client with the current
+    version gets a 304 after one primary-key lookup.
+    """
+    topic = await session.get(Topic, topic_id)
+    if topic is None:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    cached = not_modified(
+        request,
+        response,
+        make_etag("topic", topic_id, topic.revision),
+        topic.updated_at,
+        settings.cache_control_topics,
+    )
+    if cached is not None:
+        return cached
+
+    suggestions = await session.exec(
+        select(Suggestion)
+        .where(Suggestion.topic_id == topic_id)
+        .order_by(Suggestion.position)
+    )
+    drafts = await session.exec(
+        select(Draft).where(Draft.topic_id == topic_id).order_by(Draft.id)
+    )
+    return TopicDetail(
+        id=topic.id,
+        title=topic.title,
+        detail=topic.detail,
+        suggestions=[SuggestionRead.model_validate(s) for s in suggestions.all()],
+        drafts=[DraftRead.model_validate(d) for d in drafts.all()],
+        input_tokens=topic.input_tokens,
+        output_tokens=topic.output_tokens,
+    )
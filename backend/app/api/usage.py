@@ -0,0 +1,65 @@
+from datetime import timedelta
+from typing import Annotated, List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..suggestions.budget import TokenBudget, start_of_day, usage_by_day
+from .dependencies import get_read_session_dep, get_token_budget
+
+router = APIRouter(prefix="/api")
+
+
+class DailyUsage(BaseModel):
+    date: str
+    topics: int
+    input_tokens: int
+    output_tokens: int
+
+
+class BudgetStatus(BaseModel):
+    per_call: Optional[int] = None
+    per_day: Optional[int] = None
+    mode: str
+    spent_today: int
+    remaining_today: Optional[int] = None
+
+
+class UsageReport(BaseModel):
+    topics: int
+    input_tokens: int
+    output_tokens: int
+    days: List[DailyUsage]
+    budget: BudgetStatus
+
+
+@router.get("/usage", response_model=UsageReport)
+async def get_usage(
+    session: Annotated[AsyncSession, Depends(get_read_session_dep)],
+    budget: Annotated[TokenBudget, Depends(get_token_budget)],
+    days: Annotated[int, Query(ge=1, le=366)] = 30,
+) -> UsageReport:
+    """Tokens billed for saved topics per UTC day, oldest first.
+
+    ``budget.spent_today`` is this process's running count, which also
+    includes calls whose result was not saved (failed parses, errors).
+    """
+    since = start_of_day(budget.today() - timedelta(days=days - 1))
+    rows = [
+        DailyUsage(date=day, topics=topics, input_tokens=i, output_tokens=o)
+        for day, topics, i, o in await usage_by_day(session, since)
+    ]
+    return UsageReport(
+        topics=sum(row.topics for row in rows),
+        input_tokens=sum(row.input_tokens for row in rows),
+        output_tokens=sum(row.output_tokens for row in rows),
+        days=rows,
+        budget=BudgetStatus(
+            per_call=budget.per_call or None,
+            per_day=budget.per_day or None,
+            mode=budget.mode,
+            spent_today=budget.spent_today(),
+            remaining_today=budget.remaining_today(),
+        ),
+    )
@@ -3,16 +3,32 @@
 - Stores files under ``data/context/`` (override via ``root``).
 - Supports ``.md`` and ``.txt`` files.
 - Slugs must be lowercase letters/numbers with hyphens (e.g., ``topic-1``).
+- Keeps a SQLite index (slug, mtime, size, content hash) that is refreshed
+  by stat-ing the directory and re-hashing only changed files, so listings
+  never read file contents up front. It lives at ``context_index_path``
+  (``var/context_index.db``), outside the content directory; a store given
+  only a ``root`` keeps it in a ``.index.sqlite3`` file there.
+- When given a ``SearchIndex``, mirrors every change into its full-text index.
 """
 
+import hashlib
+import os
 import re
+import sqlite3
+import threading
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 from ..core.config import get_settings
 
+if TYPE_CHECKING:
+    from ..search.index import SearchIndex
+
 SUPPORTED_EXTENSIONS = (".md", ".txt")
 SLUG_PATTERN = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+INDEX_FILENAME = ".index.sqlite3"
 
 
 @dataclass
@@ -21,30 +37,121 @@ class ContextRecord:
     content: str
 
 
-class ContextStore:
-    def __init__(self, root: Path | None = None) -> None:
-        self.root = root or get_settings().context_dir
+@dataclass(frozen=True)
+class ContextEntry:
+    """Index metadata for one context file; ``content`` is read on demand."""
 
-    def list_contexts(self) -> list[ContextRecord]:
-        self._ensure_root()
+    slug: str
+    path: Path
+    mtime_ns: int
+    size: int
+    content_hash: str
+
+    @cached_property
+    def content(self) -> str:
+        return self.path.read_text(encoding="utf-8")
 
+    def to_record(self) -> ContextRecord:
+        return ContextRecord(slug=self.slug, content=self.content)
+
+
+class ContextStore:
+    def __init__(
+        self,
+        root: Path | None = None,
+        index_path: Path | None = None,
+        search_index: Optional["SearchIndex"] = None,
+    ) -> None:
+        if root is None:
+            settings = get_settings()
+            root = settings.context_dir
+            index_path = index_path or settings.context_index_path
+        self.root = root
+        self.index_path = index_path or root / INDEX_FILENAME
+        self.search_index = search_index
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def list_contexts(
+        self, offset: int = 0, limit: int | None = None
+    ) -> list[ContextRecord]:
         records: list[ContextRecord] = []
-        for path in sorted(self.root.iterdir()):
-            if not path.is_file():
-                continue
-            if path.suffix not in SUPPORTED_EXTENSIONS:
-                continue
-            slug = path.stem
-            if not SLUG_PATTERN.fullmatch(slug):
-                continue
+        for entry in self.list_entries(offset=offset, limit=limit):
             try:
-                content = path.read_text(encoding="utf-8")
+                records.append(entry.to_record())
             except FileNotFoundError:
                 continue
-            records.append(ContextRecord(slug=slug, content=content))
-
         return records
 
+    def list_entries(
+        self, offset: int = 0, limit: int | None = None
+    ) -> list[ContextEntry]:
+        """Return a page of index entries ordered by file name."""
+        self.refresh()
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT filename, slug, mtime_ns, size, content_hash "
+                "FROM context_index ORDER BY filename LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset),
+            )
+            return [
+                ContextEntry(
+                    slug=slug,
+                    path=self.root / filename,
+                    mtime_ns=mtime_ns,
+                    size=size,
+                    content_hash=content_hash,
+                )
+                for filename, slug, mtime_ns, size, content_hash in rows
+            ]
+
+    def count(self) -> int:
+        self.refresh()
+        with self._lock:
+            row = self._connect().execute("SELECT COUNT(*) FROM context_index")
+            return row.fetchone()[0]
+
+    def refresh(self) -> None:
+        """Sync the index with the directory, hashing only changed files."""
+        self._ensure_root()
+
+        on_disk: dict[str, tuple[int, int]] = {}
+        with os.scandir(self.root) as it:
+            for dir_entry in it:
+                if not dir_entry.is_file() or _slug_for(dir_entry.name) is None:
+                    continue
+                try:
+                    stat = dir_entry.stat()
+                except FileNotFoundError:
+                    continue
+                on_disk[dir_entry.name] = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            conn = self._connect()
+            indexed = {
+                filename: (mtime_ns, size)
+                for filename, mtime_ns, size in conn.execute(
+                    "SELECT filename, mtime_ns, size FROM context_index"
+                )
+            }
+            removed = indexed.keys() - on_disk.keys()
+            conn.executemany(
+                "DELETE FROM context_index WHERE filename = ?",
+                [(filename,) for filename in removed],
+            )
+            if self.search_index is not None:
+                for filename in removed:
+                    self.search_index.remove_context(filename)
+            for filename, signature in on_disk.items():
+                if indexed.get(filename) == signature:
+                    continue
+                try:
+                    data = (self.root / filename).read_bytes()
+                except FileNotFoundError:
+                    continue
+                self._upsert(conn, filename, signature, data)
+            conn.commit()
+
     def save_context(self, slug: str, content: str) -> ContextRecord:
         self._ensure_root()
 
@@ -52,8 +159,57 @@ class ContextStore:
         path = self.root / f"{safe_slug}.md"
         path.write_text(content, encoding="utf-8")
 
+        stat = path.stat()
+        with self._lock:
+            conn = self._connect()
+            self._upsert(
+                conn,
+                path.name,
+                (stat.st_mtime_ns, stat.st_size),
+                content.encode("utf-8"),
+            )
+            conn.commit()
+
         return ContextRecord(slug=safe_slug, content=content)
 
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _upsert(
+        self,
+        conn: sqlite3.Connection,
+        filename: str,
+        signature: tuple[int, int],
+        data: bytes,
+    ) -> None:
+        slug = _slug_for(filename)
+        content_hash = hashlib.sha256(data).hexdigest()
+        conn.execute(
+            "INSERT OR REPLACE INTO context_index "
+            "(filename, slug, mtime_ns, size, content_hash) VALUES (?, ?, ?, ?, ?)",
+            (filename, slug, signature[0], signature[1], content_hash),
+        )
+        if self.search_index is not None:
+            content = data.decode("utf-8", errors="replace")
+            self.search_index.index_context(filename, slug, content, content_hash)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.index_path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS context_index ("
+                "filename TEXT PRIMARY KEY, slug TEXT NOT NULL, "
+                "mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+                "content_hash TEXT NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
     def _ensure_root(self) -> None:
         self.root.mkdir(parents=True, exist_ok=True)
 
@@ -64,3 +220,10 @@ class ContextStore:
             "Slug must use lowercase letters, numbers, and hyphens only "
             "(e.g., topic-1)."
         )
+
+
+def _slug_for(filename: str) -> str | None:
+    stem, suffix = os.path.splitext(filename)
+    if suffix not in SUPPORTED_EXTENSIONS or not SLUG_PATTERN.fullmatch(stem):
+        return None
+    return stem
@@ -1,6 +1,8 @@
 from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Literal
 
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 REPO_ROOT = Path(__file__).resolve().parents[3]
@@ -10,11 +12,111 @@ class Settings(BaseSettings):
     # These fields match your .env keys automatically (case-insensitive)
     app_env: str = "dev"
     claude_model: str = "claude-sonnet-4-20250514"
+    claude_messages_url: str = "https://api.anthropic.com/v1/messages"
+    # Mark the prompt template (system block) cacheable on the Anthropic side.
+    claude_prompt_cache: bool = True
+    # Anthropic's minimum cacheable prefix; shorter templates go unmarked.
+    claude_prompt_cache_min_tokens: int = 1024
     port: int = 8000
     context_dir: Path = Path("data/context")
+    context_index_path: Path = Path("var/context_index.db")
     prompts_dir: Path = REPO_ROOT / "prompts"
     database_url: str = "sqlite+aiosqlite:///./var/mindlore.db"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: float = 1800.0
+    db_pool_pre_ping: bool = True
+    # SQLAlchemy's per-connection prepared statement cache (asyncpg).
+    db_statement_cache_size: int = 100
+    # Behind PgBouncer in transaction pooling mode: give every prepared
+    # statement a unique name and turn off both statement caches, so
+    # statements never collide on a server connection shared by clients.
+    db_pgbouncer: bool = False
+    # Applied to every SQLite connection (see app/core/db.py).
+    sqlite_journal_mode: Literal[
+        "delete", "truncate", "persist", "memory", "wal", "off"
+    ] = "wal"
+    sqlite_synchronous: Literal["off", "normal", "full", "extra"] = "normal"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 20_000
+    sqlite_mmap_size_bytes: int = 256 * 1024 * 1024
+    sqlite_temp_store: Literal["default", "file", "memory"] = "memory"
     claude_api_key: str
+    llm_timeout_seconds: float = 60.0
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry_seconds: float = 30.0
+    llm_http2: bool = True
+    llm_max_retries: int = 3
+    llm_backoff_base_seconds: float = 0.5
+    llm_backoff_max_seconds: float = 20.0
+    # Whole-call limit, retries included; llm_timeout_seconds is per attempt.
+    # 0 disables it.
+    llm_deadline_seconds: float = 90.0
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_seconds: float = 30.0
+    # Hedge a call once it is slower than this percentile of recent calls.
+    llm_hedge_enabled: bool = False
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_min_samples: int = 20
+    # Client-side limits for claude_model; 0 disables a per-minute limit.
+    llm_requests_per_minute: int = 50
+    llm_tokens_per_minute: int = 40_000
+    llm_max_concurrency: int = 10
+    llm_max_queue: int = 100
+    llm_max_queue_wait_seconds: float = 10.0
+    llm_expected_output_tokens: int = 1024
+    # max_tokens sent with each call, overridable per prompt name; set
+    # LLM_OUTPUT_TOKENS_BY_PROMPT as JSON, e.g. '{"topics_first": 1500}'.
+    llm_max_output_tokens: int = 4096
+    llm_output_tokens_by_prompt: Dict[str, int] = {}
+    # Token budgets (estimated prompt plus output budget); 0 disables one.
+    # "downgrade" shrinks max_tokens to fit instead of rejecting the call,
+    # down to llm_min_output_tokens.
+    llm_max_tokens_per_call: int = 0
+    llm_max_tokens_per_day: int = 0
+    llm_budget_mode: Literal["reject", "downgrade"] = "reject"
+    llm_min_output_tokens: int = 256
+    llm_cache_enabled: bool = True
+    llm_cache_path: Path = Path("var/llm_cache.db")
+    llm_cache_ttl_seconds: float = 7 * 24 * 60 * 60
+    llm_cache_memory_entries: int = 256
+    llm_cache_max_entries: int = 10_000
+    llm_cache_version: str = "1"
+    search_index_path: Path = Path("var/search.db")
+    context_token_budget: int = 1500
+    context_chunk_tokens: int = 300
+    suggestion_batch_concurrency: int = 5
+    suggestion_batch_max_topics: int = 100
+    suggestion_job_workers: int = 2
+    suggestion_job_lease_seconds: float = 300.0
+    suggestion_job_sweep_seconds: float = 30.0
+    suggestion_job_retry_seconds: float = 30.0
+    metrics_enabled: bool = True
+    # Cache-Control for conditional GETs; "no-cache" means "revalidate first".
+    cache_control_topics: str = "private, no-cache"
+    cache_control_contexts: str = "private, no-cache"
+    gzip_enabled: bool = False
+    gzip_minimum_size: int = 1024
+    # Trace requests to a JSONL file; tracing_format is "native" or "otlp".
+    tracing_enabled: bool = False
+    tracing_path: Path = Path("var/traces.jsonl")
+    tracing_format: str = "native"
+    # Requests sending profiling_header are profiled; see app/core/profiling.py.
+    profiling_enabled: bool = False
+    profiling_dir: Path = Path("var/profiles")
+    profiling_header: str = "X-Profile"
+    profiling_sample_interval_ms: float = 5.0
+
+    @field_validator("database_url")
+    @classmethod
+    def use_async_postgres_driver(cls, v: str) -> str:
+        # Accept the plain URLs hosting providers hand out.
+        for prefix in ("postgres://", "postgresql://"):
+            if v.startswith(prefix):
+                return "postgresql+asyncpg://" + v[len(prefix) :]
+        return v
 
     # This config tells Pydantic exactly where to find your file
     # and to ignore extra variables like OPEN_AI_KEY if they exist
@@ -1,18 +1,114 @@
 from __future__ import annotations
 
+import time
 from contextlib import asynccontextmanager
+from pathlib import Path
 from typing import AsyncIterator
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateColumn
+from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .config import Settings
+from .metrics import DB_COMMIT_SECONDS, DB_CONNECTION_SECONDS
+from .tracing import span
 
+# Arbitrary constant shared by every replica; see ``_create_schema``.
+SCHEMA_LOCK_ID = 0x6D696E64
 
-def get_engine(settings: Settings) -> AsyncEngine:
-    """Create an async engine for the configured database."""
-    return create_async_engine(settings.database_url, future=True)
+
+# asyncpg prepares every statement under a name, and its own statement cache
+# reuses them. Through PgBouncer's transaction pooling another client may get
+# the server connection next, so names must be unique and nothing cached.
+PGBOUNCER_CONNECT_ARGS = {
+    "statement_cache_size": 0,
+    "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+}
+
+# Engine roles; only SQLite files distinguish them (see ``Database``).
+ROLE_SHARED = "shared"
+ROLE_WRITER = "writer"
+ROLE_READER = "reader"
+
+
+def get_engine(settings: Settings, role: str = ROLE_SHARED) -> AsyncEngine:
+    """Create an async engine for the configured database.
+
+    On SQLite every connection gets the tuning pragmas from ``settings``. A
+    writer engine holds one connection and opens transactions with
+    ``BEGIN IMMEDIATE``, so the file's write lock is taken up front (waiting
+    up to ``busy_timeout``) rather than failing when a read upgrades to a
+    write. Reader connections are ``query_only``.
+
+    Every engine reports how long each pooled connection stays checked out
+    (``DB_CONNECTION_SECONDS``). Sessions take a connection at their first
+    statement and give it back at commit or rollback, so this covers the
+    transaction, not work a request does around it.
+    """
+    url = make_url(settings.database_url)
+    options = _pool_options(settings)
+    if url.drivername == "postgresql+asyncpg":
+        cache_size = settings.db_statement_cache_size
+        if settings.db_pgbouncer:
+            cache_size = 0
+            options["connect_args"] = PGBOUNCER_CONNECT_ARGS
+        url = url.update_query_dict({"prepared_statement_cache_size": str(cache_size)})
+    if role == ROLE_WRITER and options:
+        options.update(pool_size=1, max_overflow=0)
+    engine = create_async_engine(url, future=True, **options)
+    if url.drivername.startswith("sqlite"):
+        _tune_sqlite(engine, settings, role)
+    _time_checkouts(engine, role)
+    return engine
+
+
+def _time_checkouts(engine: AsyncEngine, role: str) -> None:
+    @event.listens_for(engine.sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record) -> None:
+        start = connection_record.info.pop("checked_out_at", None)
+        if start is not None:
+            DB_CONNECTION_SECONDS.labels(role).observe(time.perf_counter() - start)
+
+
+def _tune_sqlite(engine: AsyncEngine, settings: Settings, role: str) -> None:
+    pragmas = [
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        # Negative values are KiB rather than pages.
+        f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_bytes)}",
+        f"PRAGMA temp_store={settings.sqlite_temp_store}",
+    ]
+    if role == ROLE_READER:
+        pragmas.append("PRAGMA query_only=1")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+        if role == ROLE_WRITER:
+            # Stop the driver issuing its own deferred BEGIN; see on_begin.
+            dbapi_connection.isolation_level = None
+            connection_record.info["begin_immediate"] = True
+
+    if role == ROLE_WRITER:
+
+        @event.listens_for(engine.sync_engine, "begin")
+        def on_begin(conn: Connection) -> None:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
 
 
 @asynccontextmanager
@@ -23,3 +119,127 @@ async def get_session(engine: AsyncEngine) -> AsyncIterator[AsyncSession]:
     )
     async with async_session_factory() as session:
         yield session
+
+
+class InstrumentedSession(AsyncSession):
+    """AsyncSession that records commit latency and a trace span."""
+
+    async def commit(self) -> None:
+        start = time.perf_counter()
+        try:
+            with span("db.commit"):
+                await super().commit()
+        finally:
+            DB_COMMIT_SECONDS.observe(time.perf_counter() - start)
+
+
+class Database:
+    """Engine and session factory shared for the lifetime of the app.
+
+    Built once in the ``create_app`` lifespan and stored on ``app.state`` so
+    requests reuse one connection pool instead of creating their own.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        ensure_sqlite_dir(settings.database_url)
+        if _is_sqlite_file(settings.database_url):
+            # SQLite allows one writer per file; give writes a single
+            # connection and let WAL readers run alongside it.
+            self.engine = get_engine(settings, ROLE_WRITER)
+            self.read_engine = get_engine(settings, ROLE_READER)
+        else:
+            self.engine = self.read_engine = get_engine(settings)
+        self.session_factory = async_sessionmaker(
+            self.engine, class_=InstrumentedSession, expire_on_commit=False
+        )
+        self.read_session_factory = async_sessionmaker(
+            self.read_engine, class_=InstrumentedSession, expire_on_commit=False
+        )
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """Session for work that writes; see ``read_session`` for reads."""
+        async with self.session_factory() as session:
+            yield session
+
+    @asynccontextmanager
+    async def read_session(self) -> AsyncIterator[AsyncSession]:
+        """Session on the read engine; writes through it fail on SQLite."""
+        async with self.read_session_factory() as session:
+            yield session
+
+    async def create_schema(self) -> None:
+        """Create any missing tables and indexes; run once at startup."""
+        async with self.engine.begin() as conn:
+            await conn.run_sync(_create_schema)
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+        if self.read_engine is not self.engine:
+            await self.read_engine.dispose()
+
+
+def _create_schema(conn: Connection) -> None:
+    # Replicas starting together would race between "does the table exist?"
+    # and CREATE TABLE. Take a lock held until this transaction commits so
+    # they bootstrap one at a time.
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": SCHEMA_LOCK_ID})
+    elif conn.dialect.name == "sqlite" and not conn.info.get("begin_immediate"):
+        # The sqlite3 driver does not open a transaction for DDL on its own.
+        # (Writer connections already began with BEGIN IMMEDIATE.)
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    SQLModel.metadata.create_all(conn)
+    _add_missing_columns(conn)
+    # create_all only adds indexes along with new tables; add ones declared
+    # since an existing table was created.
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _add_missing_columns(conn: Connection) -> None:
+    # create_all never alters existing tables. Add columns declared since a
+    # table was created; they must be nullable or have a server default.
+    inspector = inspect(conn)
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+
+
+def ensure_sqlite_dir(database_url: str) -> None:
+    url = make_url(database_url)
+    if url.drivername.startswith("sqlite") and url.database:
+        path = Path(url.database)
+        if not path.is_absolute():
+            path = Path.cwd() / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+
+def _is_sqlite_file(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.drivername.startswith("sqlite") and url.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def _pool_options(settings: Settings) -> dict:
+    url = make_url(settings.database_url)
+    if url.drivername.startswith("sqlite") and not _is_sqlite_file(
+        settings.database_url
+    ):
+        # In-memory SQLite uses a single static connection; no pool to size.
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
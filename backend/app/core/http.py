@@ -0,0 +1,21 @@
+import httpx
+
+from .config import Settings
+
+
+def create_http_client(settings: Settings) -> httpx.AsyncClient:
+    """Create the app-lifetime HTTP client used for outbound LLM calls.
+
+    One pooled client keeps TLS sessions and HTTP/2 connections alive between
+    requests instead of paying for a fresh handshake on every generation.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+        keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+    )
+    return httpx.AsyncClient(
+        http2=settings.llm_http2,
+        limits=limits,
+        timeout=httpx.Timeout(settings.llm_timeout_seconds),
+    )
@@ -0,0 +1,215 @@
+"""Prometheus metrics for HTTP, LLM, database and parsing stages.
+
+Counters and histograms are module-level and shared by the process. Gauges
+for app-scoped objects (caches, queues) are computed only when ``/metrics``
+is scraped, by ``StateCollector`` reading whatever apps are running, so the
+request path never updates them.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+
+import httpx
+from prometheus_client import REGISTRY, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# LLM generations take seconds; HTTP and DB buckets stay on the default scale.
+LLM_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "mindlore_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "mindlore_llm_request_duration_seconds",
+    "Upstream LLM call latency.",
+    ["model", "outcome"],
+    buckets=LLM_BUCKETS,
+)
+LLM_ERRORS = Counter(
+    "mindlore_llm_errors_total",
+    "Failed upstream LLM calls by HTTP status or exception type.",
+    ["model", "code"],
+)
+LLM_TOKENS = Counter(
+    "mindlore_llm_tokens_total",
+    "Tokens reported in the provider's usage field.",
+    ["model", "direction"],
+)
+DB_CONNECTION_SECONDS = Histogram(
+    "mindlore_db_connection_held_seconds",
+    "Time a pooled database connection is checked out, by engine role.",
+    ["role"],
+)
+DB_COMMIT_SECONDS = Histogram(
+    "mindlore_db_commit_duration_seconds",
+    "Database commit latency.",
+)
+LLM_BUDGET_ACTIONS = Counter(
+    "mindlore_llm_budget_actions_total",
+    "LLM calls downgraded or rejected by a token budget.",
+    ["limit", "action"],
+)
+PARSE_FAILURES = Counter(
+    "mindlore_suggestion_parse_failures_total",
+    "LLM responses that did not contain exactly 3 outlines.",
+)
+
+
+@contextmanager
+def observe_llm_call(model: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    except (asyncio.CancelledError, GeneratorExit):
+        # The caller went away (client disconnect, hedging); not an upstream error.
+        LLM_REQUEST_SECONDS.labels(model, "cancelled").observe(
+            time.perf_counter() - start
+        )
+        raise
+    except BaseException as exc:
+        LLM_REQUEST_SECONDS.labels(model, "error").observe(time.perf_counter() - start)
+        LLM_ERRORS.labels(model, _error_code(exc)).inc()
+        raise
+    LLM_REQUEST_SECONDS.labels(model, "ok").observe(time.perf_counter() - start)
+
+
+def record_llm_usage(model: str, usage: Optional[dict]) -> None:
+    """Count tokens from an Anthropic (or OpenAI) ``usage`` object."""
+    if not usage:
+        return
+    counts = {
+        "input": usage.get("input_tokens", usage.get("prompt_tokens")),
+        "output": usage.get("output_tokens", usage.get("completion_tokens")),
+        # Anthropic prompt caching; input_tokens excludes both of these.
+        "cache_read": usage.get("cache_read_input_tokens"),
+        "cache_creation": usage.get("cache_creation_input_tokens"),
+    }
+    for direction, count in counts.items():
+        if count:
+            LLM_TOKENS.labels(model, direction).inc(count)
+
+
+def _error_code(exc: BaseException) -> str:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return str(exc.response.status_code)
+    return type(exc).__name__
+
+
+class PrometheusMiddleware:
+    """Pure ASGI middleware timing each request until its body is sent.
+
+    The route label is the matched path template (``/api/topics/{topic_id}``),
+    so cardinality stays bounded; unmatched paths are labelled ``unmatched``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            ).observe(time.perf_counter() - start)
+
+
+class StateCollector(Collector):
+    """Scrape-time gauges over the ``app.state`` of every running app."""
+
+    def __init__(self) -> None:
+        self._states: List[Any] = []
+
+    def track(self, state: Any) -> None:
+        self._states.append(state)
+
+    def untrack(self, state: Any) -> None:
+        if state in self._states:
+            self._states.remove(state)
+
+    def collect(self) -> Iterator[Any]:
+        cache_entries = GaugeMetricFamily(
+            "mindlore_llm_cache_memory_entries",
+            "Responses held in the in-memory LLM cache tier.",
+        )
+        cache_lookups = CounterMetricFamily(
+            "mindlore_llm_cache_lookups",
+            "LLM cache lookups by result.",
+            labels=["result"],
+        )
+        jobs_queued = GaugeMetricFamily(
+            "mindlore_suggestion_jobs_queued",
+            "Suggestion jobs waiting for a worker.",
+        )
+        llm_waiting = GaugeMetricFamily(
+            "mindlore_llm_limiter_waiting",
+            "Calls waiting for LLM rate-limit budget or a concurrency slot.",
+        )
+        inflight = GaugeMetricFamily(
+            "mindlore_suggestions_inflight",
+            "Distinct suggestion generations in progress.",
+        )
+
+        totals = {"entries": 0, "memory": 0, "disk": 0, "miss": 0}
+        queued = waiting = running = 0
+        for state in list(self._states):
+            cache = getattr(state, "llm_cache", None)
+            if cache is not None:
+                totals["entries"] += len(cache.memory)
+                totals["memory"] += cache.stats.memory_hits
+                totals["disk"] += cache.stats.disk_hits
+                totals["miss"] += cache.stats.misses
+            job_queue = getattr(state, "job_queue", None)
+            if job_queue is not None:
+                queued += job_queue.queued
+            service = getattr(state, "suggestion_service", None)
+            if service is not None:
+                running += service.inflight
+                limiter = _find_limiter(service.llm_client)
+                if limiter is not None:
+                    waiting += limiter.waiting
+
+        cache_entries.add_metric([], totals["entries"])
+        cache_lookups.add_metric(["memory_hit"], totals["memory"])
+        cache_lookups.add_metric(["disk_hit"], totals["disk"])
+        cache_lookups.add_metric(["miss"], totals["miss"])
+        jobs_queued.add_metric([], queued)
+        llm_waiting.add_metric([], waiting)
+        inflight.add_metric([], running)
+        yield from (cache_entries, cache_lookups, jobs_queued, llm_waiting, inflight)
+
+
+def _find_limiter(client: Any) -> Any:
+    # Walk the wrapper chain (cache -> budget -> retries -> limiter -> model client).
+    while client is not None:
+        limiter = getattr(client, "limiter", None)
+        if limiter is not None:
+            return limiter
+        client = getattr(client, "inner", None)
+    return None
+
+
+state_collector = StateCollector()
+REGISTRY.register(state_collector)
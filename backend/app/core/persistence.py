@@ -0,0 +1,59 @@
+"""Write helpers that save topics and their suggestions in one transaction.
+
+Topics are flushed to get their ids (``RETURNING`` where the database
+supports it) and all child suggestions go in as a single executemany
+``INSERT``, so a save is one round-trip per table and one commit.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models import Suggestion, Topic
+from ..suggestions.tokens import TokenUsage
+
+TopicRow = Tuple[str, str, Sequence[str]]
+
+
+async def add_topics(
+    session: AsyncSession,
+    rows: Sequence[TopicRow],
+    usage: Sequence[Optional[TokenUsage]] = (),
+) -> List[Topic]:
+    """Stage ``(title, detail, suggestions)`` rows without committing.
+
+    ``usage`` holds the tokens billed for generating each row, in row order.
+    """
+    if not rows:
+        return []
+    topics = [Topic(title=title, detail=detail) for title, detail, _ in rows]
+    # usage may be shorter than rows (or empty) when not every row has one.
+    for topic, tokens in zip(topics, usage, strict=False):
+        if tokens is not None:
+            topic.input_tokens = tokens.input_tokens
+            topic.output_tokens = tokens.output_tokens
+    session.add_all(topics)
+    await session.flush()
+
+    values = [
+        {"topic_id": topic.id, "content": content, "position": idx}
+        for topic, (_, _, suggestions) in zip(topics, rows, strict=True)
+        for idx, content in enumerate(suggestions)
+    ]
+    if values:
+        await session.exec(insert(Suggestion), params=values)
+    return topics
+
+
+async def save_topic(
+    session: AsyncSession,
+    title: str,
+    detail: str = "",
+    suggestions: Sequence[str] = (),
+    usage: Optional[TokenUsage] = None,
+) -> Topic:
+    """Insert a topic and its suggestions and commit once."""
+    (topic,) = await add_topics(session, [(title, detail, suggestions)], [usage])
+    await session.commit()
+    return topic
@@ -0,0 +1,140 @@
+"""Opt-in profiling of individual requests.
+
+``ProfilingMiddleware`` is only installed when ``profiling_enabled`` is set,
+so normal deployments pay nothing. Once installed, a request carrying the
+profiling header runs under cProfile while a background thread samples every
+thread's stack. Two files are written to ``profiling_dir``:
+
+- ``<id>.pstats``: load with ``python -m pstats`` or snakeviz.
+- ``<id>.collapsed``: one ``frame;frame;frame count`` line per stack, the
+  input format of flamegraph.pl and speedscope.
+
+The id is returned in the ``X-Profile-Id`` response header. Both profilers see
+the whole process, so other requests running concurrently show up too; the
+sampler's per-thread roots also show time spent in aiosqlite's worker threads.
+"""
+
+import asyncio
+import cProfile
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+class StackSampler:
+    """Sample the stacks of all other threads every ``interval`` seconds."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                root = names.get(thread_id, str(thread_id))
+                self.stacks[_collapse(root, frame)] += 1
+
+    def render(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+def _collapse(root: str, frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+        names.append(f"{code.co_qualname} ({filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(root)
+    return ";".join(reversed(names))
+
+
+class ProfilingMiddleware:
+    """Profile requests that send ``header``; see the module docstring.
+
+    cProfile allows one active profiler per process, so a request arriving
+    while another is being profiled runs unprofiled (no ``X-Profile-Id``).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        output_dir: Path,
+        header: str = "x-profile",
+        sample_interval: float = 0.005,
+    ) -> None:
+        self.app = app
+        self.output_dir = Path(output_dir)
+        self.header = header.lower().encode("latin-1")
+        self.sample_interval = sample_interval
+        self._active = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or self._active
+            or not self._requested(scope["headers"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER, profile_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = cProfile.Profile()
+        sampler = StackSampler(self.sample_interval)
+        sampler.start()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            sampler.stop()
+            self._active = False
+            await asyncio.to_thread(self._write, profile_id, profiler, sampler)
+
+    def _requested(self, headers: list) -> bool:
+        value: Optional[bytes] = None
+        for name, header_value in headers:
+            if name == self.header:
+                value = header_value
+                break
+        return value is not None and value.lower() not in (b"", b"0", b"false")
+
+    def _write(
+        self, profile_id: str, profiler: cProfile.Profile, sampler: StackSampler
+    ) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(self.output_dir / f"{profile_id}.pstats")
+        (self.output_dir / f"{profile_id}.collapsed").write_text(sampler.render())
@@ -0,0 +1,265 @@
+"""Lightweight request tracing.
+
+``TracingMiddleware`` opens a root ``request`` span and collects every span
+started while handling it, including spans in tasks created along the way
+(contextvars are copied into new tasks). Finished traces go to a
+``SpanExporter``; ``JsonlSpanExporter`` appends one JSON line per trace, either
+in a flat native format or as an OTLP/JSON ``ExportTraceServiceRequest`` that
+the OpenTelemetry collector's file receiver can read.
+
+Outside a traced request ``span`` is a no-op, so background jobs and tests
+pay only a contextvar lookup.
+"""
+
+import asyncio
+import json
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SERVICE_NAME = "mindlore"
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(
+            {key: value for key, value in attributes.items() if value is not None}
+        )
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    spans: List[Span] = field(default_factory=list)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("span", default=None)
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Span]:
+    """Start a span without making it current; call ``end_span`` when done.
+
+    For async generators, which cannot hold a contextvar across ``yield``.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    parent = _current_span.get()
+    new = Span(
+        name=name,
+        trace_id=trace.trace_id,
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        start_ns=time.time_ns(),
+    )
+    new.set(**attributes)
+    trace.spans.append(new)
+    return new
+
+
+def end_span(span_: Optional[Span], error: Optional[BaseException] = None) -> None:
+    if span_ is None:
+        return
+    span_.end_ns = time.time_ns()
+    if error is not None:
+        span_.error = type(error).__name__
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time the block as a child of the current span and make it current."""
+    new = start_span(name, **attributes)
+    if new is None:
+        yield None
+        return
+    token = _current_span.set(new)
+    try:
+        yield new
+    except BaseException as exc:
+        end_span(new, exc)
+        raise
+    else:
+        end_span(new)
+    finally:
+        _current_span.reset(token)
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Add attributes to the current span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: Sequence[Span]) -> None:
+        """Receive the finished spans of one trace."""
+        ...
+
+
+class JsonlSpanExporter:
+    """Append each trace as one JSON line; ``format`` is "native" or "otlp"."""
+
+    def __init__(self, path: Path, format: str = "native") -> None:
+        if format not in ("native", "otlp"):
+            raise ValueError(f"Unknown trace format: {format}")
+        self.path = Path(path)
+        self.format = format
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[Span]) -> None:
+        if not spans:
+            return
+        record = to_otlp(spans) if self.format == "otlp" else to_native(spans)
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line)
+
+
+def to_native(spans: Sequence[Span]) -> dict:
+    return {
+        "trace_id": spans[0].trace_id,
+        "spans": [
+            {
+                "name": s.name,
+                "span_id": s.span_id,
+                "parent_id": s.parent_id,
+                "start_ns": s.start_ns,
+                "duration_ms": round(s.duration_ms, 3),
+                "attributes": s.attributes,
+                "error": s.error,
+            }
+            for s in spans
+        ],
+    }
+
+
+def to_otlp(spans: Sequence[Span]) -> dict:
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [_otlp_attribute("service.name", SERVICE_NAME)]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": SERVICE_NAME},
+                        "spans": [_otlp_span(s) for s in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+def _otlp_span(s: Span) -> dict:
+    record = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        # SPAN_KIND_SERVER for the root, SPAN_KIND_INTERNAL otherwise.
+        "kind": 2 if s.parent_id is None else 1,
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": [_otlp_attribute(k, v) for k, v in s.attributes.items()],
+        "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+    }
+    if s.parent_id:
+        record["parentSpanId"] = s.parent_id
+    return record
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def server_timing(root: Span, spans: Sequence[Span]) -> str:
+    """Summarise the root's finished children, summing repeated phases."""
+    phases: Dict[str, float] = {}
+    for s in spans:
+        if s.parent_id == root.span_id and s.end_ns:
+            phases[s.name] = phases.get(s.name, 0.0) + s.duration_ms
+    total = (time.time_ns() - root.start_ns) / 1e6
+    entries = [f"{name};dur={ms:.1f}" for name, ms in phases.items()]
+    entries.append(f"total;dur={total:.1f}")
+    return ", ".join(entries)
+
+
+class TracingMiddleware:
+    """Trace each HTTP request and add a ``Server-Timing`` header.
+
+    The header is built when the response starts, so phases still running
+    at that point (the LLM call of a streamed response) are left out of it
+    but still exported.
+    """
+
+    def __init__(self, app: ASGIApp, exporter: Optional[SpanExporter]) -> None:
+        self.app = app
+        self.exporter = exporter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(trace_id=secrets.token_hex(16))
+        trace_token = _current_trace.set(trace)
+        root = start_span("request", http_method=scope["method"])
+        span_token = _current_span.set(root)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.set(http_status_code=message["status"])
+                headers = list(message.get("headers", []))
+                timing = server_timing(root, trace.spans)
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        error: Optional[BaseException] = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            route = scope.get("route")
+            root.set(http_route=getattr(route, "path", None))
+            end_span(root, error)
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            # Spans of a shared generation another request still awaits may
+            # not have finished; leave them out.
+            finished = [s for s in trace.spans if s.end_ns]
+            if self.exporter is not None:
+                await asyncio.to_thread(self.exporter.export, finished)
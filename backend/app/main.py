@@ -1,14 +1,36 @@
+import asyncio
+import math
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from sqlmodel import SQLModel
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 
-from .api.dependencies import _ensure_sqlite_dir, get_settings
+from .api.contexts import router as contexts_router
+from .api.dependencies import (
+    build_llm_cache,
+    build_suggestion_service,
+    get_settings,
+)
 from .api.health import router as health_router
+from .api.jobs import router as jobs_router
+from .api.metrics import router as metrics_router
+from .api.search import router as search_router
 from .api.suggestions import router as suggestions_router
 from .api.topics import router as topics_router
-from .core.db import get_engine
+from .api.usage import router as usage_router
+from .context.store import ContextStore
+from .core.db import Database
+from .core.http import create_http_client
+from .core.metrics import PrometheusMiddleware, state_collector
+from .core.profiling import ProfilingMiddleware
+from .core.tracing import JsonlSpanExporter, TracingMiddleware
 from .core.version import VERSION
+from .search.index import SearchIndex, backfill_topics, sync_contexts
+from .suggestions.budget import BudgetExceeded, seed_budget
+from .suggestions.jobs import SuggestionJobQueue
+from .suggestions.limiter import RateLimitExceeded
+from .suggestions.resilience import CircuitOpenError, UpstreamUnavailable
 
 
 def create_app() -> FastAPI:
@@ -16,11 +38,56 @@ def create_app() -> FastAPI:
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
-        _ensure_sqlite_dir(settings.database_url)
-        engine = get_engine(settings)
-        async with engine.begin() as conn:
-            await conn.run_sync(SQLModel.metadata.create_all)
-        yield
+        database = Database(settings)
+        await database.create_schema()
+        app.state.database = database
+
+        search_index = SearchIndex(settings.search_index_path)
+        context_store = ContextStore(
+            root=settings.context_dir,
+            index_path=settings.context_index_path,
+            search_index=search_index,
+        )
+        app.state.search_index = search_index
+        app.state.context_store = context_store
+        await asyncio.to_thread(
+            lambda: sync_contexts(search_index, context_store.list_entries())
+        )
+        await backfill_topics(database, search_index)
+
+        http_client = create_http_client(settings)
+        llm_cache = build_llm_cache(settings)
+        app.state.http_client = http_client
+        app.state.llm_cache = llm_cache
+        suggestion_service = build_suggestion_service(
+            settings, http_client, llm_cache, context_store
+        )
+        app.state.suggestion_service = suggestion_service
+        await seed_budget(database, suggestion_service.budget)
+
+        job_queue = SuggestionJobQueue(
+            database,
+            suggestion_service,
+            workers=settings.suggestion_job_workers,
+            lease_seconds=settings.suggestion_job_lease_seconds,
+            sweep_seconds=settings.suggestion_job_sweep_seconds,
+            retry_seconds=settings.suggestion_job_retry_seconds,
+            search_index=search_index,
+        )
+        await job_queue.start()
+        app.state.job_queue = job_queue
+        state_collector.track(app.state)
+        try:
+            yield
+        finally:
+            state_collector.untrack(app.state)
+            await job_queue.stop()
+            await http_client.aclose()
+            if llm_cache is not None:
+                llm_cache.close()
+            context_store.close()
+            search_index.close()
+            await database.dispose()
 
     app = FastAPI(title="MindLore", version=VERSION, lifespan=lifespan)
     app.state.settings = settings
@@ -29,9 +96,69 @@ def create_app() -> FastAPI:
     # Dependency wiring placeholder for future routes.
     app.dependency_overrides[get_settings] = lambda: settings
 
+    @app.exception_handler(CircuitOpenError)
+    async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        )
+
+    @app.exception_handler(UpstreamUnavailable)
+    async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailable):
+        headers = None
+        if exc.retry_after is not None:
+            headers = {"Retry-After": str(math.ceil(exc.retry_after))}
+        return JSONResponse(
+            status_code=503, content={"detail": str(exc)}, headers=headers
+        )
+
+    @app.exception_handler(BudgetExceeded)
+    async def budget_exceeded_handler(request: Request, exc: BudgetExceeded):
+        if exc.retry_after is None:
+            # Too big for the per-call budget; retrying will not help.
+            return JSONResponse(status_code=400, content={"detail": str(exc)})
+        return JSONResponse(
+            status_code=429,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        )
+
+    @app.exception_handler(RateLimitExceeded)
+    async def rate_limited_handler(request: Request, exc: RateLimitExceeded):
+        return JSONResponse(
+            status_code=429,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        )
+
     app.include_router(health_router)
     app.include_router(suggestions_router)
     app.include_router(topics_router)
+    app.include_router(search_router)
+    app.include_router(jobs_router)
+    app.include_router(contexts_router)
+    app.include_router(usage_router)
+    if settings.gzip_enabled:
+        # Event streams are excluded by Starlette, so SSE still flushes live.
+        app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_minimum_size)
+    if settings.metrics_enabled:
+        app.add_middleware(PrometheusMiddleware)
+        app.include_router(metrics_router)
+    if settings.tracing_enabled:
+        app.add_middleware(
+            TracingMiddleware,
+            exporter=JsonlSpanExporter(
+                settings.tracing_path, format=settings.tracing_format
+            ),
+        )
+    if settings.profiling_enabled:
+        app.add_middleware(
+            ProfilingMiddleware,
+            output_dir=settings.profiling_dir,
+            header=settings.profiling_header,
+            sample_interval=settings.profiling_sample_interval_ms / 1000,
+        )
 
     return app
 
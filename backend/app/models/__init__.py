@@ -1,5 +1,7 @@
+from . import revisions  # noqa: F401  (registers the revision listeners)
 from .draft import Draft
 from .suggestion import Suggestion
+from .suggestion_job import SuggestionJob
 from .topic import Topic
 
-__all__ = ["Topic", "Suggestion", "Draft"]
+__all__ = ["Topic", "Suggestion", "Draft", "SuggestionJob"]
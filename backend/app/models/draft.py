@@ -7,6 +7,6 @@ from sqlmodel import Field, SQLModel
 
 class Draft(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    topic_id: int = Field(foreign_key="topic.id")
+    topic_id: int = Field(foreign_key="topic.id", index=True)
     content: str
     selected_suggestion_index: Optional[int] = None
@@ -0,0 +1,82 @@
+"""Keep ``Topic.revision`` and ``updated_at`` current.
+
+They are the validators for conditional GETs, so every change made through a
+session to a topic, or to its suggestions or drafts, bumps them: unit-of-work
+flushes and ORM bulk inserts alike. Topics created in the same
+transaction already carry fresh values and are left alone, so saving a new
+topic with its suggestions costs no extra statement.
+"""
+
+from itertools import chain
+from typing import Iterable, Set
+
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlmodel import col
+
+from ._time import utcnow
+from .draft import Draft
+from .suggestion import Suggestion
+from .topic import Topic
+
+CHILDREN = (Suggestion, Draft)
+# Own columns that are bookkeeping, not content.
+_TOPIC_BOOKKEEPING = {"revision", "updated_at"}
+_CREATED_TOPICS = "created_topic_ids"
+
+
+def _created(session: Session) -> Set[int]:
+    return session.info.setdefault(_CREATED_TOPICS, set())
+
+
+def _bump(session: Session, topic_ids: Iterable[int]) -> None:
+    ids = set(topic_ids) - _created(session) - {None}
+    if ids:
+        session.execute(
+            update(Topic)
+            .where(col(Topic.id).in_(ids))
+            .values(revision=col(Topic.revision) + 1, updated_at=utcnow())
+        )
+
+
+def _topic_changed(topic: Topic) -> bool:
+    changed = {attr.key for attr in inspect(topic).attrs if attr.history.has_changes()}
+    return bool(changed - _TOPIC_BOOKKEEPING)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_on_flush(session: Session, flush_context, instances) -> None:
+    edited = set()
+    for topic in session.dirty:
+        if isinstance(topic, Topic) and _topic_changed(topic):
+            topic.revision = (topic.revision or 1) + 1
+            topic.updated_at = utcnow()
+            edited.add(topic.id)
+    children = {
+        obj.topic_id
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, CHILDREN)
+        and (obj not in session.dirty or session.is_modified(obj))
+    }
+    _bump(session, children - edited)
+
+
+@event.listens_for(Session, "after_flush")
+def _remember_created_topics(session: Session, flush_context) -> None:
+    _created(session).update(obj.id for obj in session.new if isinstance(obj, Topic))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_on_bulk_insert(state: ORMExecuteState) -> None:
+    mapper = state.bind_mapper
+    if not state.is_insert or mapper is None or mapper.class_ not in CHILDREN:
+        return
+    params = state.parameters
+    rows = params if isinstance(params, list) else [params or {}]
+    _bump(state.session, (row.get("topic_id") for row in rows))
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _forget_created_topics(session: Session) -> None:
+    session.info.pop(_CREATED_TOPICS, None)
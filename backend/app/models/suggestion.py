@@ -2,10 +2,13 @@ from __future__ import annotations
 
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
 class Suggestion(SQLModel, table=True):
+    __table_args__ = (Index("ix_suggestion_topic_id_position", "topic_id", "position"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     topic_id: int = Field(foreign_key="topic.id")
     content: str
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime
+from sqlmodel import Field, SQLModel
+
+from ._time import utcnow
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class SuggestionJob(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    topic: str
+    status: str = Field(default=JOB_QUEUED, index=True)
+    topic_id: Optional[int] = Field(default=None, foreign_key="topic.id")
+    error: Optional[str] = None
+    # The queue that claimed the job and until when; another queue may take
+    # over a running job only once its lease has expired.
+    owner: Optional[str] = None
+    lease_until: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
+    # A queued job put back after hitting backpressure waits until then.
+    run_after: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
+    created_at: datetime = Field(
+        default_factory=utcnow, sa_column=Column(DateTime(timezone=True))
+    )
+    updated_at: datetime = Field(
+        default_factory=utcnow, sa_column=Column(DateTime(timezone=True))
+    )
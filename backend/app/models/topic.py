@@ -1,11 +1,27 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Column, DateTime
 from sqlmodel import Field, SQLModel
 
+from ._time import utcnow
+
 
 class Topic(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     detail: str = ""
+    # Validators for conditional GETs; ``revisions`` bumps both whenever the
+    # topic or its suggestions or drafts change through a session.
+    revision: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+    updated_at: Optional[datetime] = Field(
+        default_factory=utcnow, sa_column=Column(DateTime(timezone=True))
+    )
+    created_at: Optional[datetime] = Field(
+        default_factory=utcnow, sa_column=Column(DateTime(timezone=True), index=True)
+    )
+    # Tokens billed for the generation; None for topics saved without one.
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
@@ -1,7 +1,28 @@
+import hashlib
+import os
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Protocol
+from typing import Dict, Protocol, Tuple
 
-TOPIC_SEPARATOR = "\n\nTopic:\n"
+TOPIC_HEADER = "Topic:\n"
+CONTEXT_SEPARATOR = "\nBackground context (use only where relevant):\n"
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A loaded prompt and the hash of its text."""
+
+    name: str
+    text: str
+    content_hash: str
+
+    @classmethod
+    def from_text(cls, name: str, text: str) -> "PromptTemplate":
+        return cls(
+            name=name,
+            text=text,
+            content_hash=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        )
 
 
 class PromptRepository(Protocol):
@@ -9,6 +30,10 @@ class PromptRepository(Protocol):
         """Load prompt text by name."""
         ...
 
+    def get_template(self, name: str) -> PromptTemplate:
+        """Load a pre-split prompt template by name."""
+        ...
+
 
 class FilePromptRepository:
     def __init__(self, prompts_dir: str):
@@ -18,7 +43,47 @@ class FilePromptRepository:
         file_path = self.prompts_dir / f"{name}.md"
         return file_path.read_text(encoding="utf-8")
 
+    def get_template(self, name: str) -> PromptTemplate:
+        return PromptTemplate.from_text(name, self.get_prompt(name))
+
+
+class CachedPromptRepository(FilePromptRepository):
+    """File repository that keeps parsed templates in memory.
+
+    Each lookup only stats the file; it is re-read when its mtime or size
+    changes, so edits go live without a restart.
+    """
+
+    def __init__(self, prompts_dir: str):
+        super().__init__(prompts_dir)
+        self._templates: Dict[str, Tuple[Tuple[int, int], PromptTemplate]] = {}
+
+    def get_prompt(self, name: str) -> str:
+        return self.get_template(name).text
+
+    def get_template(self, name: str) -> PromptTemplate:
+        file_path = self.prompts_dir / f"{name}.md"
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._templates.get(name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        template = PromptTemplate.from_text(name, file_path.read_text(encoding="utf-8"))
+        self._templates[name] = (signature, template)
+        return template
+
+
+def render_messages(
+    prompt_template: PromptTemplate, topic: str, context: str = ""
+) -> Tuple[str, str]:
+    """Render the prompt as ``(system, user)`` parts.
 
-def render_prompt(prompt_template: str, topic: str) -> str:
-    """Combine the prompt template with the topic."""
-    return f"{prompt_template}{TOPIC_SEPARATOR}{topic}\n"
+    The system part is the template alone, identical on every request so the
+    provider can cache it; the user part carries the topic, then any context.
+    """
+    user = f"{TOPIC_HEADER}{topic}\n"
+    if context:
+        user = f"{user}{CONTEXT_SEPARATOR}{context}\n"
+    return prompt_template.text, user
@@ -0,0 +1,278 @@
+"""SQLite FTS5 index over context snippets and generated topics.
+
+The index lives in its own SQLite file so it works whatever database backs
+the SQLModel tables. Writers keep it in sync as they save; ``search`` ranks
+with BM25 and highlights matches with ``<mark>`` tags in HTML-escaped text.
+"""
+
+import asyncio
+import html
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sqlmodel import col, select
+
+from ..core.db import Database
+from ..models import Suggestion, Topic
+
+CONTEXT_KIND = "context"
+TOPIC_KIND = "topic"
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+# FTS5 wraps matches in these control characters, which never occur in the
+# indexed text; they become <mark> tags only after the text is escaped.
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+# Topics read, and indexed in one transaction, per step of ``backfill_topics``.
+BACKFILL_PAGE_SIZE = 500
+
+TopicDocument = Tuple[int, str, str, Sequence[str]]
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    ref: str
+    title: str
+    snippet: str
+    score: float
+
+
+@dataclass
+class SearchPage:
+    total: int
+    hits: list[SearchHit]
+
+
+class SearchIndex:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def index_context(self, filename: str, slug: str, content: str, version: str):
+        self._upsert(CONTEXT_KIND, filename, slug, content, version)
+
+    def remove_context(self, filename: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            self._delete(conn, CONTEXT_KIND, filename)
+            conn.commit()
+
+    def context_versions(self) -> dict[str, str]:
+        """Map indexed context file names to the content hash they were built from."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT ref, version FROM search_docs WHERE kind = ?", (CONTEXT_KIND,)
+            )
+            return dict(rows.fetchall())
+
+    def index_topic(
+        self, topic_id: int, title: str, detail: str, suggestions: Sequence[str]
+    ) -> None:
+        self.index_topics([(topic_id, title, detail, suggestions)])
+
+    def index_topics(self, topics: Iterable[TopicDocument]) -> None:
+        """Index ``(id, title, detail, suggestions)`` rows in one transaction."""
+        with self._lock:
+            conn = self._connect()
+            for topic_id, title, detail, suggestions in topics:
+                body = "\n\n".join(part for part in (detail, *suggestions) if part)
+                self._write(conn, TOPIC_KIND, str(topic_id), title, body, "")
+            conn.commit()
+
+    def last_topic_id(self) -> int:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT MAX(CAST(ref AS INTEGER)) FROM search_docs WHERE kind = ?",
+                (TOPIC_KIND,),
+            )
+            return row.fetchone()[0] or 0
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> SearchPage:
+        expression = match_expression(query)
+        if not expression:
+            return SearchPage(total=0, hits=[])
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(
+                "SELECT COUNT(*) FROM search_fts WHERE search_fts MATCH ?",
+                (expression,),
+            ).fetchone()[0]
+            rows = conn.execute(
+                "SELECT d.kind, d.ref, "
+                "highlight(search_fts, 0, ?, ?), "
+                "snippet(search_fts, 1, ?, ?, '…', 24), "
+                "bm25(search_fts, 4.0, 1.0) AS rank "
+                "FROM search_fts JOIN search_docs d ON d.id = search_fts.rowid "
+                "WHERE search_fts MATCH ? ORDER BY rank LIMIT ? OFFSET ?",
+                (_MARK_START, _MARK_END) * 2 + (expression, limit, offset),
+            ).fetchall()
+        hits = [
+            SearchHit(
+                kind=kind,
+                ref=ref,
+                title=mark_matches(title),
+                snippet=mark_matches(snippet),
+                score=-rank,
+            )
+            for kind, ref, title, snippet, rank in rows
+        ]
+        return SearchPage(total=total, hits=hits)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _upsert(self, kind: str, ref: str, title: str, body: str, version: str):
+        with self._lock:
+            conn = self._connect()
+            self._write(conn, kind, ref, title, body, version)
+            conn.commit()
+
+    def _write(
+        self,
+        conn: sqlite3.Connection,
+        kind: str,
+        ref: str,
+        title: str,
+        body: str,
+        version: str,
+    ) -> None:
+        self._delete(conn, kind, ref)
+        cursor = conn.execute(
+            "INSERT INTO search_docs (kind, ref, version) VALUES (?, ?, ?)",
+            (kind, ref, version),
+        )
+        conn.execute(
+            "INSERT INTO search_fts (rowid, title, body) VALUES (?, ?, ?)",
+            (cursor.lastrowid, title, body),
+        )
+
+    def _delete(self, conn: sqlite3.Connection, kind: str, ref: str) -> None:
+        row = conn.execute(
+            "SELECT id FROM search_docs WHERE kind = ? AND ref = ?", (kind, ref)
+        ).fetchone()
+        if row is None:
+            return
+        conn.execute("DELETE FROM search_fts WHERE rowid = ?", row)
+        conn.execute("DELETE FROM search_docs WHERE id = ?", row)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            # Writes happen on every save; WAL keeps them from blocking searches.
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_docs ("
+                "id INTEGER PRIMARY KEY, kind TEXT NOT NULL, ref TEXT NOT NULL, "
+                "version TEXT NOT NULL DEFAULT '', UNIQUE (kind, ref))"
+            )
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+                "title, body, tokenize = 'porter unicode61')"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+
+async def index_topic(
+    index: Optional[SearchIndex], topic: Topic, suggestions: Sequence[str] = ()
+) -> None:
+    """Add a freshly committed topic to ``index`` off the event loop."""
+    if index is None:
+        return
+    await asyncio.to_thread(
+        index.index_topic, topic.id, topic.title, topic.detail, suggestions
+    )
+
+
+def mark_matches(highlighted: str) -> str:
+    """Escape FTS5 output as HTML, then turn its match markers into ``<mark>``."""
+    return (
+        html.escape(highlighted)
+        .replace(_MARK_START, "<mark>")
+        .replace(_MARK_END, "</mark>")
+    )
+
+
+def match_expression(query: str) -> str:
+    """Turn free text into an FTS5 query that ANDs quoted terms.
+
+    Quoting every term keeps user input from being parsed as FTS syntax.
+    """
+    return " ".join(f'"{token}"' for token in _TOKEN_PATTERN.findall(query))
+
+
+async def backfill_topics(
+    database: Database, index: SearchIndex, page_size: int = BACKFILL_PAGE_SIZE
+) -> int:
+    """Index topics created since the last indexed one; returns how many.
+
+    Reads ``page_size`` topics at a time and indexes each page in one
+    transaction off the event loop, so a large backlog neither fills memory
+    nor stalls requests.
+    """
+    last_id = await asyncio.to_thread(index.last_topic_id)
+    total = 0
+    while True:
+        page = await _topic_documents(database, last_id, page_size)
+        if not page:
+            return total
+        await asyncio.to_thread(index.index_topics, page)
+        total += len(page)
+        last_id = page[-1][0]
+
+
+async def _topic_documents(
+    database: Database, after_id: int, limit: int
+) -> List[TopicDocument]:
+    async with database.read_session() as session:
+        topics = (
+            await session.exec(
+                select(Topic).where(Topic.id > after_id).order_by(Topic.id).limit(limit)
+            )
+        ).all()
+        if not topics:
+            return []
+        suggestions = (
+            await session.exec(
+                select(Suggestion)
+                .where(col(Suggestion.topic_id).in_([t.id for t in topics]))
+                .order_by(Suggestion.topic_id, Suggestion.position)
+            )
+        ).all()
+
+    by_topic: dict[int, list[str]] = {}
+    for suggestion in suggestions:
+        by_topic.setdefault(suggestion.topic_id, []).append(suggestion.content)
+    return [
+        (topic.id, topic.title, topic.detail, by_topic.get(topic.id, []))
+        for topic in topics
+    ]
+
+
+def sync_contexts(index: SearchIndex, entries: Iterable) -> None:
+    """Re-index context entries whose content hash changed; drop removed ones."""
+    indexed = index.context_versions()
+    seen = set()
+    for entry in entries:
+        filename = entry.path.name
+        seen.add(filename)
+        if indexed.get(filename) == entry.content_hash:
+            continue
+        try:
+            content = entry.content
+        except FileNotFoundError:
+            continue
+        index.index_context(filename, entry.slug, content, entry.content_hash)
+    for filename in indexed.keys() - seen:
+        index.remove_context(filename)
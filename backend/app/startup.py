@@ -0,0 +1,139 @@
+"""Cold-start optimised entry point for scale-to-zero deployments.
+
+    uvicorn app.startup:create_lazy_app --factory
+
+Importing this module pulls in only the standard library, so the server
+starts listening and answers ``/health`` straight away. Lifespan startup kicks
+off the load in the background: ``app.main`` (FastAPI, SQLAlchemy, httpx, ...)
+is imported in a worker thread, the full app is built and its lifespan runs
+(schema bootstrap, HTTP client, job queue). Requests that arrive before it is
+done wait for it, then every request is handed to the full app.
+
+While the load is running ``/health`` answers 200; once a load has failed it
+answers 503 so orchestrators stop routing to the container. The next
+non-health request retries the load.
+
+``benchmarks/startup.py`` measures import time and time to the first
+``/health`` for both entry points; ``tests/test_startup_budget.py`` holds the
+lazy one to a budget.
+"""
+
+import asyncio
+import importlib
+import json
+import logging
+import os
+from contextlib import AsyncExitStack
+from typing import Any, Callable, Optional
+
+from .core.version import VERSION
+
+HEALTH_PATH = "/health"
+
+logger = logging.getLogger(__name__)
+
+
+class LazyApp:
+    """ASGI app that builds ``factory()`` in the background from lifespan startup."""
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self.factory = factory
+        self.app: Any = None
+        self.error: Optional[BaseException] = None
+        self._loading: Optional[asyncio.Task] = None
+        self._stack = AsyncExitStack()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if self.app is None and scope["type"] == "http":
+            if scope["path"] == HEALTH_PATH:
+                await _send_health(send, self.error)
+                return
+        await (await self.load())(scope, receive, send)
+
+    async def load(self) -> Any:
+        """Build the full app once; concurrent callers share the same load."""
+        if self.app is not None:
+            return self.app
+        return await asyncio.shield(self._start_loading())
+
+    def _start_loading(self) -> asyncio.Task:
+        if self._loading is None:
+            self._loading = asyncio.create_task(self._load())
+            self._loading.add_done_callback(self._finished_loading)
+        return self._loading
+
+    def _finished_loading(self, task: asyncio.Task) -> None:
+        if task.cancelled():
+            self._loading = None
+            return
+        self.error = task.exception()
+        if self.error is not None:
+            logger.error("Loading the app failed", exc_info=self.error)
+            # Let the next request try again.
+            self._loading = None
+
+    async def _load(self) -> Any:
+        app = await asyncio.to_thread(self.factory)
+        await self._stack.enter_async_context(app.router.lifespan_context(app))
+        self.app = app
+        return app
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._start_loading()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                loading = self._loading
+                if loading is not None and not loading.done():
+                    await asyncio.wait([loading])
+                await self._stack.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def _create_full_app() -> Any:
+    return importlib.import_module(".main", __package__).create_app()
+
+
+def create_lazy_app() -> LazyApp:
+    return LazyApp(_create_full_app)
+
+
+def _app_env() -> str:
+    # Mirrors Settings.app_env without importing pydantic: environment
+    # first (case-insensitive), then .env.
+    for key, value in os.environ.items():
+        if key.upper() == "APP_ENV":
+            return value
+    try:
+        with open(".env", encoding="utf-8") as f:
+            for line in f:
+                key, sep, value = line.partition("=")
+                if sep and key.strip().upper() == "APP_ENV":
+                    return value.strip().strip("'\"")
+    except OSError:
+        pass
+    return "dev"
+
+
+async def _send_health(send, error: Optional[BaseException] = None) -> None:
+    payload = {"status": "ok", "env": _app_env(), "version": VERSION}
+    if error is not None:
+        payload.update(status="unavailable", detail=type(error).__name__)
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200 if error is None else 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,245 @@
+"""Output budgets and per-call / per-day token budgets for LLM calls.
+
+Each prompt has an output budget, sent as ``max_tokens``. ``BudgetedLLMClient``
+reserves the estimated prompt tokens plus that budget before a call reaches
+the upstream; afterwards the reservation is replaced by the tokens actually
+billed. A call that would not fit a budget is rejected with
+``BudgetExceeded``, or in ``downgrade`` mode sent with a smaller
+``max_tokens`` as long as ``min_output_tokens`` still fit.
+
+The client sits below the response cache, so a cached answer costs nothing
+and is looked up under the prompt's full output budget, never a downgraded one.
+
+The day's spend (UTC) is kept in memory, like the rate limiter's buckets, and
+seeded at startup from the token counts saved on topics so a restart does not
+reset it.
+"""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as dt_time
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+)
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.db import Database
+from ..core.metrics import LLM_BUDGET_ACTIONS
+from ..models import Topic
+from .tokens import TokenUsage, estimate_tokens, metered, metered_stream
+
+if TYPE_CHECKING:
+    from .service import LLMClient
+
+LIMIT_PER_CALL = "per_call"
+LIMIT_PER_DAY = "per_day"
+
+
+class BudgetExceeded(RuntimeError):
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class Grant:
+    """A reservation against the budget; ``usage`` collects the real spend."""
+
+    max_tokens: int
+    reserved: int
+    day: date
+    usage: TokenUsage = field(default_factory=TokenUsage)
+
+
+class TokenBudget:
+    def __init__(
+        self,
+        max_output_tokens: int = 4096,
+        output_tokens_by_prompt: Optional[Dict[str, int]] = None,
+        per_call: int = 0,
+        per_day: int = 0,
+        mode: Literal["reject", "downgrade"] = "reject",
+        min_output_tokens: int = 256,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """A ``per_call`` or ``per_day`` of 0 disables that budget."""
+        self.max_output_tokens = max_output_tokens
+        self.output_tokens_by_prompt = dict(output_tokens_by_prompt or {})
+        self.per_call = per_call
+        self.per_day = per_day
+        self.mode = mode
+        self.min_output_tokens = min_output_tokens
+        self._clock = clock
+        self._day = self.today()
+        self._spent = 0
+
+    def output_tokens(self, prompt_name: str) -> int:
+        return self.output_tokens_by_prompt.get(prompt_name, self.max_output_tokens)
+
+    def spent_today(self) -> int:
+        self._roll_over()
+        return self._spent
+
+    def remaining_today(self) -> Optional[int]:
+        if not self.per_day:
+            return None
+        return max(0, self.per_day - self.spent_today())
+
+    def seed(self, spent: int) -> None:
+        """Count tokens already spent today, e.g. by an earlier process."""
+        self._roll_over()
+        self._spent += spent
+
+    def reserve(self, input_tokens: int, max_tokens: Optional[int] = None) -> Grant:
+        """Reserve ``input_tokens`` plus ``max_tokens`` of output.
+
+        ``max_tokens`` defaults to ``max_output_tokens``. Raises
+        ``BudgetExceeded`` if the call does not fit, even downgraded.
+        """
+        self._roll_over()
+        if max_tokens is None:
+            max_tokens = self.max_output_tokens
+        for limit, room, retry_after in self._limits(input_tokens):
+            if max_tokens <= room:
+                continue
+            if self.mode == "downgrade" and room >= self.min_output_tokens:
+                LLM_BUDGET_ACTIONS.labels(limit, "downgraded").inc()
+                max_tokens = room
+                continue
+            LLM_BUDGET_ACTIONS.labels(limit, "rejected").inc()
+            if limit == LIMIT_PER_CALL:
+                raise BudgetExceeded(
+                    f"Prompt needs about {input_tokens + max_tokens} tokens; "
+                    f"the per-call budget is {self.per_call}"
+                )
+            raise BudgetExceeded(
+                "Daily LLM token budget exhausted", retry_after=retry_after
+            )
+        reserved = input_tokens + max_tokens
+        self._spent += reserved
+        return Grant(max_tokens=max_tokens, reserved=reserved, day=self._day)
+
+    def settle(self, grant: Grant) -> None:
+        """Replace the reservation with the tokens actually billed."""
+        self._roll_over()
+        if grant.day == self._day:
+            self._spent += grant.usage.total - grant.reserved
+
+    @contextmanager
+    def spend(
+        self, input_tokens: int, max_tokens: Optional[int] = None
+    ) -> Iterator[Grant]:
+        """Reserve, meter the LLM calls made inside the block, then settle."""
+        grant = self.reserve(input_tokens, max_tokens)
+        try:
+            with metered(grant.usage):
+                yield grant
+        finally:
+            self.settle(grant)
+
+    def _limits(self, input_tokens: int) -> List[Tuple[str, int, Optional[float]]]:
+        """``(limit, room for output, retry_after)`` for each enabled budget."""
+        limits = []
+        if self.per_call:
+            limits.append((LIMIT_PER_CALL, self.per_call - input_tokens, None))
+        if self.per_day:
+            room = self.per_day - self.spent_today() - input_tokens
+            limits.append((LIMIT_PER_DAY, room, self._seconds_until_tomorrow()))
+        return limits
+
+    def today(self) -> date:
+        return datetime.fromtimestamp(self._clock(), timezone.utc).date()
+
+    def _roll_over(self) -> None:
+        today = self.today()
+        if today != self._day:
+            self._day = today
+            self._spent = 0
+
+    def _seconds_until_tomorrow(self) -> float:
+        tomorrow = datetime.combine(
+            self._day + timedelta(days=1), dt_time(), tzinfo=timezone.utc
+        )
+        return max(0.0, tomorrow.timestamp() - self._clock())
+
+
+class BudgetedLLMClient:
+    """Charge calls to ``inner`` against ``budget``.
+
+    Sends the granted ``max_tokens``, which is below the one asked for when
+    the budget downgrades the call.
+    """
+
+    def __init__(self, inner: "LLMClient", budget: TokenBudget):
+        self.inner = inner
+        self.budget = budget
+
+    async def agenerate(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> str:
+        input_tokens = estimate_tokens(system) + estimate_tokens(prompt)
+        with self.budget.spend(input_tokens, max_tokens) as grant:
+            return await self.inner.agenerate(
+                prompt, system=system, max_tokens=grant.max_tokens
+            )
+
+    async def astream(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        input_tokens = estimate_tokens(system) + estimate_tokens(prompt)
+        grant = self.budget.reserve(input_tokens, max_tokens)
+        try:
+            chunks = self.inner.astream(
+                prompt, system=system, max_tokens=grant.max_tokens
+            )
+            async for chunk in metered_stream(chunks, grant.usage):
+                yield chunk
+        finally:
+            self.budget.settle(grant)
+
+
+def start_of_day(day: date) -> datetime:
+    return datetime.combine(day, dt_time(), tzinfo=timezone.utc)
+
+
+async def usage_by_day(
+    session: AsyncSession, since: datetime
+) -> List[Tuple[str, int, int, int]]:
+    """``(date, topics, input_tokens, output_tokens)`` per UTC day since ``since``."""
+    day = func.date(Topic.created_at)
+    rows = await session.exec(
+        select(
+            day,
+            func.count(),
+            func.coalesce(func.sum(Topic.input_tokens), 0),
+            func.coalesce(func.sum(Topic.output_tokens), 0),
+        )
+        .where(Topic.created_at >= since)
+        .group_by(day)
+        .order_by(day)
+    )
+    return [(str(d), topics, int(i), int(o)) for d, topics, i, o in rows.all()]
+
+
+async def seed_budget(database: Database, budget: TokenBudget) -> int:
+    """Seed today's spend from saved topics; returns the tokens counted."""
+    if not budget.per_day:
+        return 0
+    async with database.read_session() as session:
+        rows = await usage_by_day(session, start_of_day(budget.today()))
+    spent = sum(i + o for _, _, i, o in rows)
+    budget.seed(spent)
+    return spent
@@ -0,0 +1,267 @@
+"""Content-addressed cache for LLM responses.
+
+Responses are keyed on a hash of (version, model, max_tokens, system prompt,
+user prompt). Because the system prompt is the whole template, editing a
+template changes the key; ``version`` only needs bumping when something else
+changes the output (other request parameters, parsing rules).
+
+Two tiers: a small in-memory LRU in front of a SQLite file that survives
+restarts. Both tiers honour the same TTL.
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
+
+from .service import LLMClient
+
+
+def cache_key(
+    model: str,
+    prompt: str,
+    version: str,
+    system: str = "",
+    max_tokens: Optional[int] = None,
+) -> str:
+    digest = hashlib.sha256()
+    for part in (version, model, str(max_tokens or ""), system, prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+
+class MemoryLRU:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, created_at: Optional[float] = None) -> None:
+        created_at = self._clock() if created_at is None else created_at
+        self._entries[key] = (created_at + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLiteResponseStore:
+    """Durable tier; evicts least recently used rows beyond ``max_entries``.
+
+    The connection is opened on first use so an idle cache never touches disk.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def get(self, key: str) -> Optional[tuple[str, float]]:
+        """Return ``(response, created_at)`` for a live entry."""
+        now = self._clock()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] + self.ttl_seconds <= now:
+                conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute(
+                "UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            conn.commit()
+            return row[0], row[1]
+
+    def set(self, key: str, model: str, response: str) -> None:
+        now = self._clock()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses "
+                "(key, model, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            conn.execute(
+                "DELETE FROM llm_responses WHERE created_at <= ?",
+                (now - self.ttl_seconds,),
+            )
+            conn.execute(
+                "DELETE FROM llm_responses WHERE key IN ("
+                "SELECT key FROM llm_responses "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            conn = self._connect()
+            return conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_responses_accessed_at "
+                "ON llm_responses (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        memory: MemoryLRU,
+        store: Optional[SQLiteResponseStore] = None,
+        version: str = "1",
+    ) -> None:
+        self.memory = memory
+        self.store = store
+        self.version = version
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.memory_hits += 1
+            return value
+        if self.store is not None:
+            row = await asyncio.to_thread(self.store.get, key)
+            if row is not None:
+                value, created_at = row
+                self.memory.set(key, value, created_at=created_at)
+                self.stats.disk_hits += 1
+                return value
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, model: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, key, model, value)
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+
+
+class CachedLLMClient:
+    """Serve repeated prompts from ``cache`` instead of calling ``inner``.
+
+    Only responses accepted by ``should_cache`` are stored, so a malformed
+    generation is retried rather than replayed.
+    """
+
+    def __init__(
+        self,
+        inner: LLMClient,
+        cache: LLMResponseCache,
+        model: str,
+        should_cache: Callable[[str], bool] = bool,
+    ):
+        self.inner = inner
+        self.cache = cache
+        self.model = model
+        self.should_cache = should_cache
+
+    def key_for(
+        self, prompt: str, system: str = "", max_tokens: Optional[int] = None
+    ) -> str:
+        return cache_key(self.model, prompt, self.cache.version, system, max_tokens)
+
+    async def agenerate(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> str:
+        key = self.key_for(prompt, system, max_tokens)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = await self.inner.agenerate(
+            prompt, system=system, max_tokens=max_tokens
+        )
+        if self.should_cache(response):
+            await self.cache.set(key, self.model, response)
+        return response
+
+    async def astream(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        key = self.key_for(prompt, system, max_tokens)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        async for chunk in self.inner.astream(
+            prompt, system=system, max_tokens=max_tokens
+        ):
+            chunks.append(chunk)
+            yield chunk
+        response = "".join(chunks)
+        if self.should_cache(response):
+            await self.cache.set(key, self.model, response)
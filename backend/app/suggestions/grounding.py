@@ -0,0 +1,153 @@
+"""Select context snippets relevant to a topic within a token budget.
+
+Context files are split into paragraph chunks, ranked against the topic with
+BM25, and packed greedily (best first) until the budget is spent. Chunks are
+cached per file by content hash so only edited files are re-chunked.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from ..context.store import ContextStore
+from .tokens import estimate_tokens
+
+CONTEXT_HEADER = "--- {slug} ---\n"
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass(frozen=True)
+class ContextChunk:
+    slug: str
+    text: str
+    tokens: int
+    score: float = 0.0
+
+
+@dataclass
+class _IndexedChunk:
+    chunk: ContextChunk
+    terms: Counter = field(default_factory=Counter)
+    length: int = 0
+
+
+def tokenize(text: str) -> List[str]:
+    return [term.casefold() for term in _TERM_PATTERN.findall(text)]
+
+
+def split_into_chunks(slug: str, text: str, max_tokens: int) -> List[ContextChunk]:
+    """Merge consecutive paragraphs into chunks of at most ``max_tokens``.
+
+    A single paragraph longer than the limit becomes its own chunk.
+    """
+    chunks: List[ContextChunk] = []
+    current: List[str] = []
+    current_tokens = 0
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        tokens = estimate_tokens(paragraph)
+        if current and current_tokens + tokens > max_tokens:
+            body = "\n\n".join(current)
+            chunks.append(ContextChunk(slug, body, estimate_tokens(body)))
+            current, current_tokens = [], 0
+        current.append(paragraph)
+        current_tokens += tokens
+    if current:
+        body = "\n\n".join(current)
+        chunks.append(ContextChunk(slug, body, estimate_tokens(body)))
+    return chunks
+
+
+def rank_chunks(
+    query: str, chunks: List[_IndexedChunk], k1: float = 1.5, b: float = 0.75
+) -> List[ContextChunk]:
+    """Score chunks against query with Okapi BM25; drop non-matching ones."""
+    query_terms = set(tokenize(query))
+    if not query_terms or not chunks:
+        return []
+
+    avg_length = sum(c.length for c in chunks) / len(chunks) or 1.0
+    doc_freq = {term: sum(1 for c in chunks if term in c.terms) for term in query_terms}
+    ranked = []
+    for indexed in chunks:
+        score = 0.0
+        for term in query_terms:
+            tf = indexed.terms.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(
+                1 + (len(chunks) - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5)
+            )
+            norm = tf + k1 * (1 - b + b * indexed.length / avg_length)
+            score += idf * tf * (k1 + 1) / norm
+        if score > 0:
+            chunk = indexed.chunk
+            ranked.append(ContextChunk(chunk.slug, chunk.text, chunk.tokens, score))
+    ranked.sort(key=lambda c: c.score, reverse=True)
+    return ranked
+
+
+def pack_chunks(ranked: List[ContextChunk], budget: int) -> List[ContextChunk]:
+    """Take the best chunks that fit in ``budget`` tokens, including headers."""
+    selected = []
+    remaining = budget
+    for chunk in ranked:
+        cost = chunk.tokens + estimate_tokens(CONTEXT_HEADER.format(slug=chunk.slug))
+        if cost <= remaining:
+            selected.append(chunk)
+            remaining -= cost
+    return selected
+
+
+def render_context(chunks: List[ContextChunk]) -> str:
+    return "\n\n".join(
+        f"{CONTEXT_HEADER.format(slug=chunk.slug)}{chunk.text}" for chunk in chunks
+    )
+
+
+class ContextRetriever:
+    def __init__(
+        self, store: ContextStore, token_budget: int, chunk_tokens: int = 300
+    ) -> None:
+        self.store = store
+        self.token_budget = token_budget
+        self.chunk_tokens = chunk_tokens
+        self._lock = threading.Lock()
+        self._chunks: Dict[str, Tuple[str, List[_IndexedChunk]]] = {}
+
+    def select(self, topic: str) -> List[ContextChunk]:
+        """Return the best context chunks for topic within the token budget."""
+        if self.token_budget <= 0:
+            return []
+        return pack_chunks(
+            rank_chunks(topic, self._indexed_chunks()), self.token_budget
+        )
+
+    def _indexed_chunks(self) -> List[_IndexedChunk]:
+        entries = self.store.list_entries()
+        with self._lock:
+            live = {}
+            for entry in entries:
+                key = entry.path.name
+                cached = self._chunks.get(key)
+                if cached is None or cached[0] != entry.content_hash:
+                    try:
+                        text = entry.content
+                    except FileNotFoundError:
+                        continue
+                    cached = (entry.content_hash, self._index(entry.slug, text))
+                live[key] = cached
+            self._chunks = live
+            return [chunk for _, chunks in live.values() for chunk in chunks]
+
+    def _index(self, slug: str, text: str) -> List[_IndexedChunk]:
+        indexed = []
+        for chunk in split_into_chunks(slug, text, self.chunk_tokens):
+            terms = tokenize(chunk.text)
+            indexed.append(_IndexedChunk(chunk, Counter(terms), len(terms)))
+        return indexed
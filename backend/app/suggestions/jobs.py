@@ -0,0 +1,305 @@
+"""Background generation of suggestions, tracked in the ``suggestionjob`` table.
+
+Jobs are rows first and queue entries second: ``submit`` only hands a job id
+to the in-process workers. On startup, and every ``sweep_seconds`` after that,
+the queue picks up every job that is still queued, or running under an
+expired lease, so jobs left behind by a dead worker are not stuck until the
+next restart.
+
+Several processes may share the table (uvicorn workers on one SQLite file,
+replicas on one Postgres database), so a worker claims a job with a single
+conditional ``UPDATE`` before running it and holds a lease on it, renewed while
+it runs. Only one claim can succeed, so a job is generated once even when
+every process has it queued. A job whose owner died is taken over once its
+lease expires, and a worker that lost its lease cannot record a result over
+the new owner's.
+
+A job that hits backpressure (rate limit, open circuit, exhausted retries or
+the daily token budget) is put back in the queue until the ``retry_after``
+the error gives, or ``retry_seconds``, instead of failing.
+"""
+
+import asyncio
+import logging
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import and_, or_, update
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.db import Database
+from ..core.persistence import add_topics
+from ..models import SuggestionJob
+from ..models._time import utcnow
+from ..models.suggestion_job import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING
+from ..search.index import SearchIndex, index_topic
+from .budget import BudgetExceeded
+from .limiter import RateLimitExceeded
+from .resilience import CircuitOpenError, UpstreamUnavailable
+from .service import SuggestionService
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean "not now" rather than "this job is broken".
+BACKPRESSURE_ERRORS = (
+    RateLimitExceeded,
+    CircuitOpenError,
+    UpstreamUnavailable,
+    BudgetExceeded,
+)
+
+
+class SuggestionJobQueue:
+    def __init__(
+        self,
+        database: Database,
+        service: SuggestionService,
+        workers: int = 2,
+        search_index: Optional[SearchIndex] = None,
+        lease_seconds: float = 300.0,
+        sweep_seconds: float = 30.0,
+        retry_seconds: float = 30.0,
+    ) -> None:
+        self.database = database
+        self.service = service
+        self.workers = max(1, workers)
+        self.search_index = search_index
+        self.lease_seconds = lease_seconds
+        self.sweep_seconds = sweep_seconds
+        self.retry_seconds = retry_seconds
+        self.owner = secrets.token_hex(8)
+        self._queue: asyncio.Queue[int] = asyncio.Queue()
+        self._pending: Set[int] = set()
+        self._retries: Dict[int, asyncio.TimerHandle] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    async def start(self) -> int:
+        """Start the workers and queue jobs that can be claimed; returns how many."""
+        found = await self._sweep()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep_forever()))
+        return found
+
+    async def stop(self) -> None:
+        """Cancel the workers and release their jobs for the next start."""
+        for handle in self._retries.values():
+            handle.cancel()
+        self._retries.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        async with self.database.session() as session:
+            await session.exec(
+                update(SuggestionJob)
+                .where(
+                    col(SuggestionJob.owner) == self.owner,
+                    col(SuggestionJob.status) == JOB_RUNNING,
+                )
+                .values(status=JOB_QUEUED, owner=None, lease_until=None)
+            )
+            await session.commit()
+
+    async def submit(self, topic: str) -> SuggestionJob:
+        async with self.database.session() as session:
+            job = SuggestionJob(topic=topic)
+            session.add(job)
+            await session.commit()
+            await session.refresh(job)
+        self._enqueue(job.id)
+        return job
+
+    async def join(self) -> None:
+        """Wait until every queued job has been processed."""
+        await self._queue.join()
+
+    def _enqueue(self, job_id: int) -> None:
+        if job_id not in self._pending:
+            self._pending.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    async def _sweep(self) -> int:
+        """Queue every claimable job; returns how many there were."""
+        async with self.database.read_session() as session:
+            job_ids = (
+                await session.exec(
+                    select(SuggestionJob.id)
+                    .where(_claimable(utcnow()))
+                    .order_by(SuggestionJob.id)
+                )
+            ).all()
+        for job_id in job_ids:
+            self._enqueue(job_id)
+        return len(job_ids)
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_seconds)
+            try:
+                await self._sweep()
+            except Exception:
+                logger.exception("Could not sweep for suggestion jobs")
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._pending.discard(job_id)
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                # Saving or indexing failed after generation; keep the worker.
+                logger.exception("Suggestion job %s failed", job_id)
+                await self._fail(job_id, e)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: int) -> None:
+        if not await self._claim(job_id):
+            return
+        renewing = asyncio.create_task(self._renew_lease(job_id))
+        try:
+            await self._generate(job_id)
+        finally:
+            renewing.cancel()
+
+    async def _claim(self, job_id: int) -> bool:
+        """Atomically mark the job running under this queue's lease."""
+        now = utcnow()
+        async with self.database.session() as session:
+            result = await session.exec(
+                update(SuggestionJob)
+                .where(col(SuggestionJob.id) == job_id, _claimable(now))
+                .values(
+                    status=JOB_RUNNING,
+                    owner=self.owner,
+                    lease_until=now + timedelta(seconds=self.lease_seconds),
+                    run_after=None,
+                    updated_at=now,
+                )
+            )
+            await session.commit()
+        return result.rowcount == 1
+
+    async def _renew_lease(self, job_id: int) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self.database.session() as session:
+                    await session.exec(
+                        update(SuggestionJob)
+                        .where(
+                            col(SuggestionJob.id) == job_id,
+                            col(SuggestionJob.owner) == self.owner,
+                        )
+                        .values(
+                            lease_until=utcnow() + timedelta(seconds=self.lease_seconds)
+                        )
+                    )
+                    await session.commit()
+            except Exception:
+                logger.exception("Could not renew the lease on job %s", job_id)
+
+    async def _generate(self, job_id: int) -> None:
+        # No session stays open across the model call: on SQLite a write
+        # session holds the only writer connection and the file's write lock.
+        async with self.database.read_session() as session:
+            job = await session.get(SuggestionJob, job_id)
+        try:
+            result = await self.service.get_suggestions(job.topic)
+        except BACKPRESSURE_ERRORS as e:
+            if isinstance(e, BudgetExceeded) and e.retry_after is None:
+                # Too big for the per-call budget; it will never fit.
+                await self._fail(job_id, e)
+            else:
+                await self._retry_later(job_id, e.retry_after)
+            return
+        except Exception as e:
+            await self._fail(job_id, e)
+            return
+
+        async with self.database.session() as session:
+            (topic,) = await add_topics(
+                session, [(job.topic, "", result.suggestions)], [result.usage]
+            )
+            if not await self._finish(session, job_id, JOB_DONE, topic_id=topic.id):
+                # Another queue took the job over; keep its result, not ours.
+                await session.rollback()
+                return
+            await session.commit()
+
+        await index_topic(self.search_index, topic, result.suggestions)
+
+    async def _fail(self, job_id: int, error: Exception) -> None:
+        # Best effort: the failure may have been the database itself.
+        try:
+            async with self.database.session() as session:
+                await self._finish(
+                    session,
+                    job_id,
+                    JOB_FAILED,
+                    error=str(error) or type(error).__name__,
+                )
+                await session.commit()
+        except Exception:
+            logger.exception("Could not mark suggestion job %s failed", job_id)
+
+    async def _retry_later(self, job_id: int, retry_after: Optional[float]) -> None:
+        """Put the job back in the queue to run after ``retry_after`` seconds."""
+        delay = self.retry_seconds if retry_after is None else retry_after
+        async with self.database.session() as session:
+            requeued = await self._finish(
+                session,
+                job_id,
+                JOB_QUEUED,
+                owner=None,
+                run_after=utcnow() + timedelta(seconds=delay),
+            )
+            await session.commit()
+        if requeued:
+            self._retries[job_id] = asyncio.get_running_loop().call_later(
+                delay, self._retry_due, job_id
+            )
+
+    def _retry_due(self, job_id: int) -> None:
+        self._retries.pop(job_id, None)
+        self._enqueue(job_id)
+
+    async def _finish(
+        self, session: AsyncSession, job_id: int, status: str, **values
+    ) -> bool:
+        """Record the outcome if this queue still owns the job."""
+        result = await session.exec(
+            update(SuggestionJob)
+            .where(
+                col(SuggestionJob.id) == job_id,
+                col(SuggestionJob.owner) == self.owner,
+            )
+            .values(status=status, lease_until=None, updated_at=utcnow(), **values)
+        )
+        return result.rowcount == 1
+
+
+def _claimable(now: datetime):
+    """Jobs nobody runs: queued and due, or running under an expired lease."""
+    return or_(
+        and_(
+            col(SuggestionJob.status) == JOB_QUEUED,
+            or_(
+                col(SuggestionJob.run_after).is_(None),
+                col(SuggestionJob.run_after) <= now,
+            ),
+        ),
+        and_(
+            col(SuggestionJob.status) == JOB_RUNNING,
+            or_(
+                col(SuggestionJob.lease_until).is_(None),
+                col(SuggestionJob.lease_until) < now,
+            ),
+        ),
+    )
@@ -0,0 +1,182 @@
+"""Client-side rate limiting for outbound LLM calls.
+
+Each model gets an ``LLMLimiter`` with two token buckets (requests/minute and
+tokens/minute), a cap on concurrent calls and a bounded wait queue. A call that
+cannot start within ``max_wait`` seconds is rejected up front with
+``RateLimitExceeded`` so the API can answer 429 instead of queueing forever.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from .service import LLMClient
+from .tokens import estimate_tokens
+
+
+class RateLimitExceeded(RuntimeError):
+    def __init__(self, retry_after: float):
+        super().__init__("Too many concurrent suggestion requests; retry later")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Bucket refilled continuously at ``per_minute``; holds a minute's worth.
+
+    ``take`` may drive the level negative: callers reserve capacity first and
+    then sleep for ``wait_time``, so later callers see the queue ahead of them.
+    """
+
+    def __init__(
+        self, per_minute: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.rate = per_minute / 60
+        self.capacity = per_minute
+        self._clock = clock
+        self._level = float(per_minute)
+        self._updated = clock()
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        return max(0.0, (amount - self._level) / self.rate)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self._level -= amount
+
+    def give_back(self, amount: float) -> None:
+        self._level = min(self.capacity, self._level + amount)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(
+            self.capacity, self._level + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+
+class LLMLimiter:
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_concurrency: int = 10,
+        max_queue: int = 100,
+        max_wait: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        """A limit of 0 requests or tokens per minute disables that bucket."""
+        self.requests = (
+            TokenBucket(requests_per_minute, clock) if requests_per_minute else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_minute, clock) if tokens_per_minute else None
+        )
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._sleep = sleep
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    @asynccontextmanager
+    async def acquire(self, tokens: int) -> AsyncIterator[None]:
+        """Hold one concurrency slot, waiting for rate budget first.
+
+        Raises ``RateLimitExceeded`` without waiting when the queue is full or
+        the call could not start within ``max_wait``.
+        """
+        if self._waiting >= self.max_queue:
+            raise RateLimitExceeded(retry_after=self.max_wait)
+        wait = self._wait_time(tokens)
+        if wait > self.max_wait:
+            raise RateLimitExceeded(retry_after=wait)
+
+        self._take(tokens)
+        self._waiting += 1
+        try:
+            if wait:
+                await self._sleep(wait)
+            await self._acquire_slot(self.max_wait - wait)
+        except BaseException:
+            self._give_back(tokens)
+            raise
+        finally:
+            self._waiting -= 1
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    async def _acquire_slot(self, timeout: float) -> None:
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=max(0.0, timeout))
+        except asyncio.TimeoutError:
+            raise RateLimitExceeded(retry_after=self.max_wait) from None
+
+    def _wait_time(self, tokens: int) -> float:
+        waits = [0.0]
+        if self.requests is not None:
+            waits.append(self.requests.wait_time(1))
+        if self.tokens is not None:
+            waits.append(self.tokens.wait_time(tokens))
+        return max(waits)
+
+    def _take(self, tokens: int) -> None:
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(tokens)
+
+    def _give_back(self, tokens: int) -> None:
+        if self.requests is not None:
+            self.requests.give_back(1)
+        if self.tokens is not None:
+            self.tokens.give_back(tokens)
+
+
+class LimitedLLMClient:
+    """Gate ``inner`` behind ``limiter``, counting prompt plus expected output."""
+
+    def __init__(
+        self,
+        inner: LLMClient,
+        limiter: LLMLimiter,
+        expected_output_tokens: int = 0,
+    ):
+        self.inner = inner
+        self.limiter = limiter
+        self.expected_output_tokens = expected_output_tokens
+
+    def cost(
+        self, prompt: str, system: str = "", max_tokens: Optional[int] = None
+    ) -> int:
+        output = self.expected_output_tokens
+        if max_tokens is not None:
+            output = min(output, max_tokens)
+        return estimate_tokens(system) + estimate_tokens(prompt) + output
+
+    async def agenerate(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> str:
+        async with self.limiter.acquire(self.cost(prompt, system, max_tokens)):
+            return await self.inner.agenerate(
+                prompt, system=system, max_tokens=max_tokens
+            )
+
+    async def astream(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        async with self.limiter.acquire(self.cost(prompt, system, max_tokens)):
+            async for chunk in self.inner.astream(
+                prompt, system=system, max_tokens=max_tokens
+            ):
+                yield chunk
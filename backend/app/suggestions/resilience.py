@@ -0,0 +1,370 @@
+"""Retries, circuit breaking and hedging around any ``LLMClient``.
+
+``ResilientLLMClient`` retries overloaded/transient upstream failures with
+full-jitter exponential backoff (never sooner than ``Retry-After``), stops
+calling an upstream that keeps failing until a cool-down has passed, and can
+fire a second, hedged call when the first is slower than recent calls. The
+whole call, retries included, has to finish within ``deadline`` seconds. A
+retryable failure it gives up on, or running out of time, is raised as
+``UpstreamUnavailable``.
+
+Wrap it around a ``LimitedLLMClient`` so every attempt, retry or hedge takes
+its own rate-limit slot; a ``RateLimitExceeded`` from there is raised as is and
+says nothing about the upstream's health.
+"""
+
+import asyncio
+import email.utils
+import math
+import random
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import httpx
+
+from .limiter import RateLimitExceeded
+from .service import LLMClient, UpstreamOverloaded
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream the breaker considers unhealthy."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("LLM upstream unavailable; circuit breaker is open")
+        self.retry_after = retry_after
+
+
+class UpstreamUnavailable(RuntimeError):
+    """Raised when a retryable upstream failure outlasts the retries or deadline.
+
+    The original error is the ``__cause__``; ``retry_after`` is the
+    upstream's ``Retry-After``, if it sent one.
+    """
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__("LLM upstream unavailable; retry later")
+        self.retry_after = retry_after
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, (httpx.TransportError, UpstreamOverloaded))
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Read ``Retry-After`` (delta seconds or HTTP date) from a failed response."""
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return None
+    value = exc.response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(
+    attempt: int,
+    base: float,
+    cap: float,
+    retry_after: Optional[float] = None,
+    rng: random.Random | None = None,
+) -> float:
+    """Full-jitter exponential backoff, raised to ``retry_after`` if given."""
+    rng = rng or random
+    delay = rng.uniform(0, min(cap, base * 2**attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class CircuitBreaker:
+    """Open after ``failure_threshold`` consecutive failures.
+
+    While open, calls fail fast. After ``reset_timeout`` one probe call is let
+    through (half-open): success closes the circuit, failure re-opens it. A
+    probe that never reports back (e.g. cancelled) is replaced after another
+    ``reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == "closed":
+            return
+        now = self._clock()
+        if state == "half_open" and (
+            self._probe_started_at is None
+            or now - self._probe_started_at >= self.reset_timeout
+        ):
+            self._probe_started_at = now
+            return
+        since = self._probe_started_at or self._opened_at or now
+        raise CircuitOpenError(retry_after=max(0.0, self.reset_timeout - (now - since)))
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if (
+            self._probe_started_at is not None
+            or self._failures >= self.failure_threshold
+        ):
+            self._opened_at = self._clock()
+        self._probe_started_at = None
+
+
+class LatencyTracker:
+    """Rolling window of call latencies for picking a hedge delay."""
+
+    def __init__(self, window: int = 100, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+        return ordered[rank]
+
+
+class ResilientLLMClient:
+    def __init__(
+        self,
+        inner: LLMClient,
+        *,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        deadline: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_percentile: Optional[float] = None,
+        latency: Optional[LatencyTracker] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        rng: random.Random | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """``deadline`` caps a call in seconds, retries included; ``None``
+        leaves only the per-attempt HTTP timeout."""
+        self.inner = inner
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.breaker = breaker
+        self.hedge_percentile = hedge_percentile
+        self.latency = latency or LatencyTracker()
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._clock = clock
+
+    async def agenerate(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> str:
+        attempt = 0
+        ends_at = self._ends_at()
+        while True:
+            self._before_call()
+            try:
+                async with asyncio.timeout_at(self._loop_time(ends_at)):
+                    result = await self._call(prompt, system, max_tokens)
+            except TimeoutError as e:
+                self._record_failure()
+                raise UpstreamUnavailable() from e
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # The upstream answered; the request itself was bad.
+                    self._record_success()
+                    raise
+                self._record_failure()
+                delay = self._retry_delay(attempt, e, ends_at)
+                if delay is None:
+                    raise UpstreamUnavailable(retry_after_seconds(e)) from e
+                await self._sleep(delay)
+                attempt += 1
+                continue
+            self._record_success()
+            return result
+
+    async def astream(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Stream from ``inner``, retrying only until the first chunk arrives.
+
+        Once text has been yielded a retry would duplicate it, so later
+        failures are raised at once, and the deadline only bounds the wait for
+        the first chunk. Streams are never hedged.
+        """
+        attempt = 0
+        ends_at = self._ends_at()
+        while True:
+            self._before_call()
+            started = False
+            chunks = aiter(
+                self.inner.astream(prompt, system=system, max_tokens=max_tokens)
+            )
+            try:
+                try:
+                    async with asyncio.timeout_at(self._loop_time(ends_at)):
+                        first = await anext(chunks)
+                except StopAsyncIteration:
+                    self._record_success()
+                    return
+                started = True
+                yield first
+                async for chunk in chunks:
+                    yield chunk
+            except TimeoutError as e:
+                self._record_failure()
+                raise UpstreamUnavailable() from e
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    self._record_success()
+                    raise
+                self._record_failure()
+                delay = None if started else self._retry_delay(attempt, e, ends_at)
+                if delay is None:
+                    raise UpstreamUnavailable(retry_after_seconds(e)) from e
+                await self._sleep(delay)
+                attempt += 1
+                continue
+            self._record_success()
+            return
+
+    async def _call(self, prompt: str, system: str, max_tokens: Optional[int]) -> str:
+        hedge_after = None
+        if self.hedge_percentile is not None:
+            hedge_after = self.latency.percentile(self.hedge_percentile)
+        if hedge_after is None:
+            return await self._timed(prompt, system, max_tokens)
+        return await self._hedged(prompt, system, max_tokens, hedge_after)
+
+    async def _timed(self, prompt: str, system: str, max_tokens: Optional[int]) -> str:
+        start = time.perf_counter()
+        result = await self.inner.agenerate(
+            prompt, system=system, max_tokens=max_tokens
+        )
+        self.latency.record(time.perf_counter() - start)
+        return result
+
+    async def _hedged(
+        self,
+        prompt: str,
+        system: str,
+        max_tokens: Optional[int],
+        hedge_after: float,
+    ) -> str:
+        """Start a second call if the first is still running after ``hedge_after``.
+
+        The first call to succeed wins and the other is cancelled; if both
+        fail, the first call's error is raised, so a hedge turned away by the
+        limiter never masks a retryable upstream failure.
+        """
+        primary = asyncio.create_task(self._timed(prompt, system, max_tokens))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                tasks.add(asyncio.create_task(self._timed(prompt, system, max_tokens)))
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None:
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _retry_delay(
+        self, attempt: int, exc: BaseException, ends_at: Optional[float] = None
+    ) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to give up.
+
+        Gives up when retries are exhausted, the upstream asks us to wait
+        longer than ``backoff_max``, or the time left after waiting is less
+        than a typical call takes.
+        """
+        if attempt >= self.max_retries:
+            return None
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None and retry_after > self.backoff_max:
+            return None
+        delay = backoff_delay(
+            attempt,
+            self.backoff_base,
+            self.backoff_max,
+            retry_after=retry_after,
+            rng=self._rng,
+        )
+        if ends_at is not None:
+            typical = self.latency.percentile(50) or 0.0
+            if self._clock() + delay + typical >= ends_at:
+                return None
+        return delay
+
+    def _ends_at(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self._clock() + self.deadline
+
+    def _loop_time(self, ends_at: Optional[float]) -> Optional[float]:
+        """Convert a ``clock`` time into event loop time for ``timeout_at``."""
+        if ends_at is None:
+            return None
+        loop = asyncio.get_running_loop()
+        return loop.time() + (ends_at - self._clock())
+
+    def _before_call(self) -> None:
+        if self.breaker is not None:
+            self.breaker.before_call()
+
+    def _record_success(self) -> None:
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def _record_failure(self) -> None:
+        if self.breaker is not None:
+            self.breaker.record_failure()
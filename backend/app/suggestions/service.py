@@ -1,106 +1,536 @@
+import asyncio
+import json
+import logging
 import re
-from typing import List, Protocol
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from app.prompts.repository import PromptRepository, render_prompt
+from ..core.metrics import PARSE_FAILURES, observe_llm_call, record_llm_usage
+from ..core.tracing import Span, end_span, set_attributes, span, start_span
+from ..prompts.repository import PromptRepository, PromptTemplate, render_messages
+from .budget import TokenBudget
+from .grounding import ContextChunk, ContextRetriever, render_context
+from .tokens import (
+    TokenUsage,
+    estimate_tokens,
+    metered,
+    metered_stream,
+    record_usage,
+)
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+CLAUDE_MESSAGES_URL = "https://api.anthropic.com/v1/messages"
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+PROMPT_NAME = "topics_first"
+DEFAULT_MAX_TOKENS = 4096
+# Anthropic ignores cache_control on shorter prefixes (1024 tokens for Sonnet
+# and Opus, 2048 for Haiku).
+CACHE_MIN_TOKENS = 1024
+OUTLINE_MARKER = re.compile(r"### Outline [ABC]:")
+OUTLINE_MARKER_LENGTH = len("### Outline A:")
+
+
+class UpstreamOverloaded(RuntimeError):
+    """The upstream reported ``overloaded_error`` in the middle of a stream.
+
+    HTTP 529 covers the same condition before the stream starts; this error
+    lets retries and the circuit breaker treat both alike.
+    """
 
 
 class LLMClient(Protocol):
-    def generate(self, prompt: str) -> str:
-        """Generate text from prompt."""
+    async def agenerate(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> str:
+        """Generate text from prompt without blocking the event loop.
+
+        ``system`` holds static instructions that are the same on every call,
+        so providers that support prompt caching can reuse them.
+        ``max_tokens`` caps the output; ``None`` leaves the client's default.
+        """
+        ...
+
+    def astream(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Yield text deltas from prompt as the model produces them."""
         ...
 
 
 class FakeLLMClient:
     def __init__(self):
         self.last_prompt = None
+        self.last_system = None
 
-    def generate(self, prompt: str) -> str:
+    async def agenerate(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> str:
         self.last_prompt = prompt
+        self.last_system = system
         return ""
 
+    async def astream(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        self.last_prompt = prompt
+        self.last_system = system
+        for chunk in ():
+            yield chunk
+
 
 class OpenAIClient:
-    def __init__(self, api_key: str, model: str):
+    def __init__(self, api_key: str, model: str, http_client: "httpx.AsyncClient"):
         self.api_key = api_key
         self.model = model
+        self.http_client = http_client
 
-    def generate(self, prompt: str) -> str:
-        import httpx
-
-        headers = {
+    def _headers(self) -> dict:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
-        data = {
-            "model": self.model,
-            "messages": [{"role": "user", "content": prompt}],
-        }
-        with httpx.Client() as client:
-            response = client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=60.0,
+
+    def _payload(
+        self, prompt: str, system: str = "", max_tokens: Optional[int] = None
+    ) -> dict:
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        payload = {"model": self.model, "messages": messages}
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+        return payload
+
+    async def agenerate(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> str:
+        with span("llm.request", model=self.model), observe_llm_call(self.model):
+            response = await self.http_client.post(
+                OPENAI_CHAT_URL,
+                headers=self._headers(),
+                json=self._payload(prompt, system, max_tokens),
             )
             response.raise_for_status()
             result = response.json()
-            return result["choices"][0]["message"]["content"] or ""
+            _record_usage(self.model, result.get("usage"))
+        return result["choices"][0]["message"]["content"] or ""
+
+    async def astream(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        data = {**self._payload(prompt, system, max_tokens), "stream": True}
+        trace_span = start_span("llm.request", model=self.model, stream=True)
+        error = None
+        try:
+            with observe_llm_call(self.model):
+                async with self.http_client.stream(
+                    "POST", OPENAI_CHAT_URL, headers=self._headers(), json=data
+                ) as response:
+                    response.raise_for_status()
+                    async for event in iter_sse_data(response):
+                        _record_usage(self.model, event.get("usage"), trace_span)
+                        for choice in event.get("choices", []):
+                            text = choice.get("delta", {}).get("content")
+                            if text:
+                                yield text
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            end_span(trace_span, error)
 
 
 class ClaudeClient:
-    def __init__(self, api_key: str, model: str):
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        http_client: "httpx.AsyncClient",
+        url: str = CLAUDE_MESSAGES_URL,
+        cache_system: bool = True,
+        cache_min_tokens: int = CACHE_MIN_TOKENS,
+    ):
+        """The system block is marked cacheable when ``cache_system`` is set
+        and its estimated size reaches ``cache_min_tokens``."""
         self.api_key = api_key
         self.model = model
+        self.http_client = http_client
+        self.url = url
+        self.cache_system = cache_system
+        self.cache_min_tokens = cache_min_tokens
+        self._cache_warned = False
 
-    def generate(self, prompt: str) -> str:
-        import httpx
-
-        headers = {
+    def _headers(self) -> dict:
+        return {
             "x-api-key": self.api_key,
             "anthropic-version": "2023-06-01",
             "Content-Type": "application/json",
         }
-        data = {
+
+    def _payload(
+        self, prompt: str, system: str = "", max_tokens: Optional[int] = None
+    ) -> dict:
+        payload = {
             "model": self.model,
-            "max_tokens": 4096,
+            "max_tokens": max_tokens or DEFAULT_MAX_TOKENS,
             "messages": [{"role": "user", "content": prompt}],
         }
-        with httpx.Client() as client:
-            response = client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers=headers,
-                json=data,
-                timeout=60.0,
+        if system:
+            block = {"type": "text", "text": system}
+            if self.cache_system and estimate_tokens(system) >= self.cache_min_tokens:
+                # Cache the prefix up to and including this block; every call
+                # with the same template then reads it instead of re-encoding.
+                block["cache_control"] = {"type": "ephemeral"}
+            payload["system"] = [block]
+        return payload
+
+    async def agenerate(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> str:
+        payload = self._payload(prompt, system, max_tokens)
+        with span("llm.request", model=self.model), observe_llm_call(self.model):
+            response = await self.http_client.post(
+                self.url, headers=self._headers(), json=payload
             )
             response.raise_for_status()
             result = response.json()
-            return result["content"][0]["text"] or ""
+            _record_usage(self.model, result.get("usage"))
+        self._check_cache(payload, result.get("usage"))
+        return result["content"][0]["text"] or ""
+
+    async def astream(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        data = {**self._payload(prompt, system, max_tokens), "stream": True}
+        trace_span = start_span("llm.request", model=self.model, stream=True)
+        error = None
+        try:
+            with observe_llm_call(self.model):
+                async with self.http_client.stream(
+                    "POST", self.url, headers=self._headers(), json=data
+                ) as response:
+                    response.raise_for_status()
+                    async for event in iter_sse_data(response):
+                        kind = event.get("type")
+                        if kind == "error":
+                            error_body = event.get("error", {})
+                            message = error_body.get("message", "stream error")
+                            if error_body.get("type") == "overloaded_error":
+                                raise UpstreamOverloaded(
+                                    f"Claude stream failed: {message}"
+                                )
+                            raise RuntimeError(f"Claude stream failed: {message}")
+                        if kind == "message_start":
+                            usage = event.get("message", {}).get("usage")
+                            _record_usage(self.model, usage, trace_span)
+                            self._check_cache(data, usage)
+                        elif kind == "message_delta":
+                            _record_usage(self.model, event.get("usage"), trace_span)
+                        if kind != "content_block_delta":
+                            continue
+                        delta = event.get("delta", {})
+                        if delta.get("type") == "text_delta" and delta.get("text"):
+                            yield delta["text"]
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            end_span(trace_span, error)
+
+    def _check_cache(self, payload: dict, usage: Optional[dict]) -> None:
+        """Warn once if a cache-marked prefix was neither written nor read."""
+        if self._cache_warned or not usage:
+            return
+        if not any("cache_control" in block for block in payload.get("system", [])):
+            return
+        if usage.get("cache_creation_input_tokens") or usage.get(
+            "cache_read_input_tokens"
+        ):
+            return
+        self._cache_warned = True
+        logger.warning(
+            "Prompt cache unused for %s: the upstream neither wrote nor read the "
+            "cached prefix, which is likely shorter than the model's minimum",
+            self.model,
+        )
+
+
+def _record_usage(
+    model: str, usage: Optional[dict], trace_span: Optional[Span] = None
+) -> None:
+    """Count tokens in metrics, on the usage meter and on the trace span.
+
+    The trace span defaults to the current one.
+    """
+    if not usage:
+        return
+    record_llm_usage(model, usage)
+    record_usage(usage)
+    attributes = {
+        "input_tokens": usage.get("input_tokens", usage.get("prompt_tokens")),
+        "output_tokens": usage.get("output_tokens", usage.get("completion_tokens")),
+        "cache_read_tokens": usage.get("cache_read_input_tokens"),
+        "cache_creation_tokens": usage.get("cache_creation_input_tokens"),
+    }
+    if trace_span is not None:
+        trace_span.set(**attributes)
+    else:
+        set_attributes(**attributes)
+
+
+@dataclass
+class SuggestionResult:
+    suggestions: List[str]
+    context: List[ContextChunk] = field(default_factory=list)
+    usage: TokenUsage = field(default_factory=TokenUsage)
 
 
 class SuggestionService:
-    def __init__(self, prompt_repo: PromptRepository, llm_client: LLMClient):
+    def __init__(
+        self,
+        prompt_repo: PromptRepository,
+        llm_client: LLMClient,
+        context_retriever: Optional[ContextRetriever] = None,
+        budget: Optional[TokenBudget] = None,
+    ):
         self.prompt_repo = prompt_repo
         self.llm_client = llm_client
+        self.context_retriever = context_retriever
+        self.budget = budget or TokenBudget(max_output_tokens=DEFAULT_MAX_TOKENS)
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    async def get_suggestions(self, topic: str) -> SuggestionResult:
+        """Get 3 suggestions for a topic, grounded in the best-matching context.
+
+        Concurrent calls for the same normalised topic share one in-flight
+        generation; its result or error is delivered to every caller and
+        nothing is kept once it completes. Only the caller that started the
+        generation gets its token ``usage``, so it is not counted twice.
+        """
+        template = self._load_template()
+        key = (normalize_topic(topic), template.content_hash)
+        task = self._inflight.get(key)
+        started = task is None
+        if task is None:
+            task = asyncio.create_task(self._generate(template, topic))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # Shield so one caller going away does not cancel the shared call.
+        result = await asyncio.shield(task)
+        return SuggestionResult(
+            list(result.suggestions),
+            list(result.context),
+            result.usage if started else TokenUsage(),
+        )
+
+    async def get_suggestions_batch(
+        self, topics: Sequence[str], concurrency: int
+    ) -> List[Union[SuggestionResult, Exception]]:
+        """Get suggestions for many topics, at most ``concurrency`` at a time.
+
+        Results are in input order. A topic that fails yields its exception
+        in place of a result instead of failing the whole batch.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(topic: str) -> Union[SuggestionResult, Exception]:
+            async with semaphore:
+                try:
+                    return await self.get_suggestions(topic)
+                except Exception as e:
+                    return e
+
+        return list(await asyncio.gather(*(run(topic) for topic in topics)))
+
+    async def select_context(self, topic: str) -> List[ContextChunk]:
+        """Rank stored context against topic and pack it into the token budget."""
+        if self.context_retriever is None:
+            return []
+        with span("context.select") as trace_span:
+            chunks = await asyncio.to_thread(self.context_retriever.select, topic)
+            if trace_span is not None:
+                trace_span.set(chunks=len(chunks))
+        return chunks
+
+    def _load_template(self) -> PromptTemplate:
+        with span("prompt.load", prompt=PROMPT_NAME) as trace_span:
+            template = self.prompt_repo.get_template(PROMPT_NAME)
+            if trace_span is not None:
+                trace_span.set(prompt_hash=template.content_hash[:16])
+        return template
+
+    def _render(
+        self, template: PromptTemplate, topic: str, context: List[ContextChunk]
+    ) -> Tuple[str, str]:
+        """Return ``(system, user)``; see ``render_messages``."""
+        with span("prompt.render", topic_length=len(topic)) as trace_span:
+            system, user = render_messages(template, topic, render_context(context))
+            if trace_span is not None:
+                trace_span.set(
+                    system_tokens=estimate_tokens(system),
+                    prompt_tokens=estimate_tokens(user),
+                )
+        return system, user
+
+    async def _generate(self, template: PromptTemplate, topic: str) -> SuggestionResult:
+        context = await self.select_context(topic)
+        system, user = self._render(template, topic, context)
+        max_tokens = self.budget.output_tokens(template.name)
+        with metered() as usage, span("llm"):
+            response = await self.llm_client.agenerate(
+                user, system=system, max_tokens=max_tokens
+            )
+        with span("parse"):
+            try:
+                suggestions = parse_suggestions(response)
+            except ValueError:
+                PARSE_FAILURES.inc()
+                raise
+        return SuggestionResult(suggestions, context, usage)
+
+    @property
+    def inflight(self) -> int:
+        """Number of distinct generations currently running."""
+        return len(self._inflight)
+
+    def _forget(self, key: Tuple[str, str], task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the error as retrieved even if every caller was cancelled.
+            task.exception()
 
-    def get_suggestions(self, topic: str) -> List[str]:
-        """Get 3 suggestions for a topic."""
-        prompt_template = self.prompt_repo.get_prompt("topics_first")
-        final_prompt = render_prompt(prompt_template, topic)
-        response = self.llm_client.generate(final_prompt)
-        return parse_suggestions(response)
+    async def stream_suggestions(
+        self,
+        topic: str,
+        context: Optional[List[ContextChunk]] = None,
+        usage: Optional[TokenUsage] = None,
+    ) -> AsyncIterator[str]:
+        """Yield each of the 3 suggestions as soon as its outline is complete.
+
+        Pass ``context`` from ``select_context`` to reuse an earlier selection,
+        and ``usage`` to have the tokens billed for the call added to it.
+        Raises ``ValueError`` once the stream ends if it did not contain
+        exactly 3 outlines.
+        """
+        template = self._load_template()
+        if context is None:
+            context = await self.select_context(topic)
+        system, user = self._render(template, topic, context)
+        chunks = self.llm_client.astream(
+            user, system=system, max_tokens=self.budget.output_tokens(template.name)
+        )
+        parser = OutlineStreamParser()
+        # Parsing is interleaved with the stream, so it is part of this span.
+        trace_span = start_span("llm", stream=True)
+        error = None
+        try:
+            async for chunk in metered_stream(
+                chunks, usage if usage is not None else TokenUsage()
+            ):
+                for outline in parser.feed(chunk):
+                    yield outline
+            try:
+                completed = parser.finish()
+            except ValueError:
+                PARSE_FAILURES.inc()
+                raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            end_span(trace_span, error)
+        for outline in completed:
+            yield outline
+
+
+def normalize_topic(topic: str) -> str:
+    """Collapse whitespace and case so equivalent topics compare equal."""
+    return " ".join(topic.split()).casefold()
+
+
+class OutlineStreamParser:
+    """Split a growing LLM response into ``### Outline X:`` blocks.
+
+    An outline is complete once the next marker arrives; the last one is only
+    complete when the stream ends and ``finish`` is called.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._starts: List[int] = []
+        self._scan_from = 0
+        self.suggestions: List[str] = []
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add a chunk and return any outlines it completed."""
+        self._buffer += chunk
+        for match in OUTLINE_MARKER.finditer(self._buffer, self._scan_from):
+            self._starts.append(match.start())
+        # Rescan the tail so a marker split across chunks is found next time.
+        last_start = self._starts[-1] + 1 if self._starts else 0
+        tail = len(self._buffer) - OUTLINE_MARKER_LENGTH + 1
+        self._scan_from = max(last_start, tail, 0)
+
+        completed = []
+        while len(self.suggestions) < len(self._starts) - 1:
+            idx = len(self.suggestions)
+            block = self._buffer[self._starts[idx] : self._starts[idx + 1]].strip()
+            self.suggestions.append(block)
+            completed.append(block)
+        return completed
+
+    def finish(self) -> List[str]:
+        """Flush the final outline and validate the total count."""
+        completed = []
+        if len(self.suggestions) < len(self._starts):
+            block = self._buffer[self._starts[-1] :].strip()
+            self.suggestions.append(block)
+            completed.append(block)
+
+        if len(self.suggestions) != 3:
+            raise ValueError(
+                f"Expected exactly 3 suggestions, found {len(self.suggestions)}"
+            )
+        return completed
 
 
 def parse_suggestions(text: str) -> List[str]:
     """Parse the LLM response into exactly 3 suggestions."""
-    # Pattern to find all markers.
-    # Uses lookahead to keep the marker in the split result.
-    pattern = r"(?=### Outline [ABC]:)"
-    parts = re.split(pattern, text)
+    parser = OutlineStreamParser()
+    parser.feed(text)
+    parser.finish()
+    return parser.suggestions
+
 
-    # Filter for parts that start with our marker and strip whitespace
-    suggestions = [p.strip() for p in parts if p.strip().startswith("### Outline")]
+def is_complete_response(text: str) -> bool:
+    """Return whether text parses into exactly 3 suggestions."""
+    try:
+        parse_suggestions(text)
+    except ValueError:
+        return False
+    return True
 
-    if len(suggestions) != 3:
-        raise ValueError(f"Expected exactly 3 suggestions, found {len(suggestions)}")
 
-    return suggestions
+async def iter_sse_data(response: "httpx.Response") -> AsyncIterator[dict]:
+    """Yield the JSON ``data:`` payloads of a server-sent events response."""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:") :].strip()
+        if not data or data == "[DONE]":
+            continue
+        yield json.loads(data)
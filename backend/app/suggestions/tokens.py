@@ -0,0 +1,87 @@
+import math
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+# Claude and GPT tokenizers average roughly four characters of English per
+# token; good enough for budgeting without shipping a tokenizer.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class TokenUsage:
+    """Tokens actually billed for one or more LLM calls.
+
+    ``input_tokens`` includes prompt-cache reads and writes, so it is
+    comparable with ``estimate_tokens`` of the whole prompt.
+    """
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add(self, usage: Dict[str, Any]) -> None:
+        """Add a provider ``usage`` block (Anthropic or OpenAI field names)."""
+        self.input_tokens += (
+            (usage.get("input_tokens") or usage.get("prompt_tokens") or 0)
+            + (usage.get("cache_read_input_tokens") or 0)
+            + (usage.get("cache_creation_input_tokens") or 0)
+        )
+        self.output_tokens += (
+            usage.get("output_tokens") or usage.get("completion_tokens") or 0
+        )
+
+
+_current_usage: ContextVar[Tuple[TokenUsage, ...]] = ContextVar(
+    "current_usage", default=()
+)
+
+
+@contextmanager
+def metered(usage: Optional[TokenUsage] = None) -> Iterator[TokenUsage]:
+    """Collect the usage of every LLM call made inside the block.
+
+    Tasks started inside the block (hedged requests) add to the same meter.
+    Meters nest: a call inside several blocks is added to each of them.
+    """
+    usage = TokenUsage() if usage is None else usage
+    token = _current_usage.set((*_current_usage.get(), usage))
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+async def metered_stream(
+    chunks: AsyncGenerator[str, None], usage: TokenUsage
+) -> AsyncIterator[str]:
+    """Iterate ``chunks`` with ``usage`` as the meter.
+
+    Async generators cannot hold a contextvar across ``yield``, so the meter
+    is set around each step instead.
+    """
+    try:
+        while True:
+            with metered(usage):
+                try:
+                    chunk = await anext(chunks)
+                except StopAsyncIteration:
+                    return
+            yield chunk
+    finally:
+        await chunks.aclose()
+
+
+def record_usage(usage: Dict[str, Any]) -> None:
+    """Add a provider ``usage`` block to the current meters, if there are any."""
+    for meter in _current_usage.get():
+        meter.add(usage)
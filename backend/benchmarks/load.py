@@ -0,0 +1,262 @@
+"""Throughput and latency benchmark for the API against a fake LLM.
+
+Runs the real ``create_app`` (lifespan included) in-process over ASGI, with
+the LLM replaced by ``LatencyLLMClient``, which returns a canned three-outline
+response after an injected delay. Run from ``backend/``::
+
+    python -m benchmarks.load --latency lognormal --latency-ms 800 \\
+        --concurrency 1 8 32 --requests 200 --output benchmarks/results/load.json
+
+    python -m benchmarks.load --compare before.json after.json
+
+Each (endpoint, concurrency) cell reports RPS and p50/p95/p99 in milliseconds.
+The JSON output has stable keys so two runs can be diffed directly or with
+``--compare``.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+CANNED_RESPONSE = "\n\n".join(
+    f"### Outline {label}: Angle {label}\n- Hook\n- Three points\n- Call to action"
+    for label in "ABC"
+)
+DEFAULT_ENDPOINTS = ("health", "suggestions", "topics")
+
+
+def fixed_latency(ms: float) -> Callable[[], float]:
+    return lambda: ms / 1000
+
+
+def lognormal_latency(
+    median_ms: float, sigma: float, rng: random.Random
+) -> Callable[[], float]:
+    mu = math.log(median_ms / 1000)
+    return lambda: rng.lognormvariate(mu, sigma)
+
+
+class LatencyLLMClient:
+    """LLM stand-in that sleeps for ``latency()`` seconds, then answers."""
+
+    def __init__(
+        self, latency: Callable[[], float], response: str = CANNED_RESPONSE
+    ) -> None:
+        self.latency = latency
+        self.response = response
+        self.calls = 0
+
+    async def agenerate(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency())
+        return self.response
+
+    async def astream(
+        self, prompt: str, *, system: str = "", max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        self.calls += 1
+        await asyncio.sleep(self.latency())
+        for start in range(0, len(self.response), 32):
+            yield self.response[start : start + 32]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    ordered = sorted(latencies)
+
+    def pct(p: float) -> Optional[float]:
+        if not ordered:
+            return None
+        rank = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+        return round(ordered[rank] * 1000, 3)
+
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+    }
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    send: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]],
+    concurrency: int,
+    requests: int,
+) -> Dict:
+    """Keep ``concurrency`` requests in flight until ``requests`` are sent."""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await send(client, i)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def _senders(run_id: str, concurrency: int) -> Dict[str, Callable]:
+    return {
+        "health": lambda c, i: c.get("/health"),
+        # Unique topics so single-flight coalescing does not flatter the numbers.
+        "suggestions": lambda c, i: c.post(
+            "/api/suggestions", json={"topic": f"Load {run_id} c{concurrency} #{i}"}
+        ),
+        "topics": lambda c, i: c.get("/api/topics", params={"limit": 20}),
+    }
+
+
+def _configure_env(workdir: Path) -> None:
+    os.environ.setdefault("CLAUDE_API_KEY", "benchmark")
+    os.environ["DATABASE_URL"] = os.environ.get(
+        "BENCH_DATABASE_URL", f"sqlite+aiosqlite:///{workdir / 'bench.db'}"
+    )
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["SEARCH_INDEX_PATH"] = str(workdir / "search.db")
+    os.environ["CONTEXT_DIR"] = str(workdir / "context")
+    os.environ["CONTEXT_INDEX_PATH"] = str(workdir / "context_index.db")
+
+
+async def run(
+    latency: Callable[[], float],
+    concurrency_levels: List[int],
+    requests: int,
+    endpoints: List[str],
+) -> Dict:
+    from app.core.config import get_settings
+    from app.main import create_app
+
+    results: Dict[str, Dict[str, Dict]] = {name: {} for name in endpoints}
+    with tempfile.TemporaryDirectory() as tmp:
+        _configure_env(Path(tmp))
+        get_settings.cache_clear()
+        app = create_app()
+        async with app.router.lifespan_context(app):
+            fake = LatencyLLMClient(latency)
+            # Replace the model client under the service (and the job queue,
+            # which shares it) with the fake.
+            app.state.suggestion_service.llm_client = fake
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", timeout=None
+            ) as client:
+                run_id = f"{time.time_ns():x}"
+                for concurrency in concurrency_levels:
+                    senders = _senders(run_id, concurrency)
+                    for name in endpoints:
+                        results[name][str(concurrency)] = await drive(
+                            client, senders[name], concurrency, requests
+                        )
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict, current: Dict) -> List[str]:
+    """Describe per-cell RPS and p95 changes between two result files."""
+    lines = []
+    for endpoint, levels in current["results"].items():
+        for level, cell in levels.items():
+            before = baseline["results"].get(endpoint, {}).get(level)
+            if not before:
+                continue
+            parts = []
+            for key in ("rps", "p95_ms"):
+                old, new = before.get(key), cell.get(key)
+                if old and new is not None:
+                    parts.append(f"{key} {old} -> {new} ({(new - old) / old:+.1%})")
+            lines.append(f"{endpoint} c={level}: " + ", ".join(parts))
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", choices=("fixed", "lognormal"), default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--endpoints", nargs="+", choices=DEFAULT_ENDPOINTS, default=DEFAULT_ENDPOINTS
+    )
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("BASE", "NEW"))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        base, new = (json.loads(p.read_text()) for p in args.compare)
+        print("\n".join(compare(base, new)))
+        return 0
+
+    if args.latency == "fixed":
+        latency = fixed_latency(args.latency_ms)
+    else:
+        latency = lognormal_latency(
+            args.latency_ms, args.sigma, random.Random(args.seed)
+        )
+
+    results = asyncio.run(
+        run(latency, args.concurrency, args.requests, list(args.endpoints))
+    )
+    report = {
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "config": {
+            "latency": args.latency,
+            "latency_ms": args.latency_ms,
+            "sigma": args.sigma if args.latency == "lognormal" else None,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Compare per-request DB time for the old and new topic persistence paths.
+
+Run from ``backend/``::
+
+    python -m benchmarks.persistence --requests 200
+
+The old path committed the topic, refreshed it for its id and committed the
+suggestions separately; ``save_topic`` does one flush, one bulk insert and
+one commit. Results are printed as JSON (milliseconds per request).
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.core.config import Settings
+from app.core.db import Database
+from app.core.persistence import save_topic
+from app.models import Suggestion, Topic
+
+SUGGESTIONS = [f"### Outline {label}: Angle\nBody text." for label in "ABC"]
+
+
+async def legacy_save(session, title: str) -> Topic:
+    topic = Topic(title=title, detail="")
+    session.add(topic)
+    await session.commit()
+    await session.refresh(topic)
+    for idx, content in enumerate(SUGGESTIONS):
+        session.add(Suggestion(topic_id=topic.id, content=content, position=idx))
+    await session.commit()
+    return topic
+
+
+async def bulk_save(session, title: str) -> Topic:
+    return await save_topic(session, title, suggestions=SUGGESTIONS)
+
+
+async def measure(database: Database, save, requests: int) -> dict:
+    timings = []
+    for i in range(requests):
+        async with database.session() as session:
+            start = time.perf_counter()
+            await save(session, f"Topic {i}")
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+    }
+
+
+async def main(requests: int) -> dict:
+    results = {}
+    for name, save in (("legacy", legacy_save), ("save_topic", bulk_save)):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = Settings(
+                _env_file=None,
+                claude_api_key="unused",
+                database_url=f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}",
+            )
+            database = Database(settings)
+            await database.create_schema()
+            results[name] = await measure(database, save, requests)
+            await database.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.requests)), indent=2))
@@ -0,0 +1,187 @@
+"""Cold-start benchmark for the eager and lazy entry points.
+
+Each sample runs in a fresh interpreter, as a new container would. The child
+imports the factory module (``import_ms``), builds the app, runs lifespan
+startup and serves one ``GET /health`` over raw ASGI (``first_health_ms``),
+then one ``GET /api/topics`` (``first_api_ms``, the cold start a user sees).
+Both are measured from the start of the child script. ``asyncio`` is imported
+before the clock starts because the ASGI server has always loaded it already.
+Run from ``backend/``::
+
+    python -m benchmarks.startup --repeat 5
+    python -m benchmarks.startup --modes lazy --budget-import-ms 150 \\
+        --budget-health-ms 300 --budget-api-ms 3000
+
+With budgets set, the exit status is 1 if the median of any measured mode
+exceeds them.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+FACTORIES = {
+    "eager": "app.main:create_app",
+    "lazy": "app.startup:create_lazy_app",
+}
+
+CHILD = """
+import asyncio
+import time
+
+start = time.perf_counter()
+import importlib
+import json
+import sys
+
+module_name, attr = sys.argv[1].split(":")
+module = importlib.import_module(module_name)
+import_ms = (time.perf_counter() - start) * 1000
+app = getattr(module, attr)()
+
+
+async def main():
+    startup = asyncio.Queue()
+    sent = []
+    await startup.put({"type": "lifespan.startup"})
+
+    async def lifespan_send(message):
+        sent.append(message)
+
+    lifespan = asyncio.create_task(
+        app({"type": "lifespan", "asgi": {"version": "3.0"}}, startup.get,
+            lifespan_send)
+    )
+    while not sent:
+        await asyncio.sleep(0)
+    responses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        responses.append(message)
+
+    def scope(path):
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": path,
+            "raw_path": path.encode(), "root_path": "", "query_string": b"",
+            "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+        }
+
+    await app(scope("/health"), receive, send)
+    health_ms = (time.perf_counter() - start) * 1000
+    health_status = responses[0]["status"]
+    responses.clear()
+    await app(scope("/api/topics"), receive, send)
+    api_ms = (time.perf_counter() - start) * 1000
+    api_status = responses[0]["status"]
+    await startup.put({"type": "lifespan.shutdown"})
+    await lifespan
+    return health_status, health_ms, api_status, api_ms
+
+
+status, health_ms, api_status, api_ms = asyncio.run(main())
+print(json.dumps({
+    "status": status,
+    "api_status": api_status,
+    "import_ms": round(import_ms, 2),
+    "first_health_ms": round(health_ms, 2),
+    "first_api_ms": round(api_ms, 2),
+}))
+"""
+
+
+def sample(factory: str, workdir: Path) -> Dict:
+    env = {
+        **os.environ,
+        "CLAUDE_API_KEY": os.environ.get("CLAUDE_API_KEY", "benchmark"),
+        "DATABASE_URL": f"sqlite+aiosqlite:///{workdir / 'startup.db'}",
+        "LLM_CACHE_PATH": str(workdir / "llm_cache.db"),
+        "SEARCH_INDEX_PATH": str(workdir / "search.db"),
+        "CONTEXT_DIR": str(workdir / "context"),
+        "CONTEXT_INDEX_PATH": str(workdir / "context_index.db"),
+    }
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD, factory],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def run(modes: List[str], repeat: int) -> Dict[str, Dict]:
+    results = {}
+    for mode in modes:
+        samples = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as tmp:
+                samples.append(sample(FACTORIES[mode], Path(tmp)))
+        if any(s["status"] != 200 or s["api_status"] != 200 for s in samples):
+            raise RuntimeError(f"/health or /api/topics failed for {mode}: {samples}")
+        results[mode] = {
+            key: round(statistics.median(s[key] for s in samples), 2)
+            for key in ("import_ms", "first_health_ms", "first_api_ms", "process_ms")
+        }
+    return results
+
+
+def over_budget(
+    results: Dict[str, Dict],
+    import_ms: Optional[float],
+    health_ms: Optional[float],
+    api_ms: Optional[float] = None,
+) -> List[str]:
+    failures = []
+    for mode, cell in results.items():
+        if import_ms is not None and cell["import_ms"] > import_ms:
+            failures.append(f"{mode}: import {cell['import_ms']} ms > {import_ms}")
+        if health_ms is not None and cell["first_health_ms"] > health_ms:
+            failures.append(
+                f"{mode}: first /health {cell['first_health_ms']} ms > {health_ms}"
+            )
+        if api_ms is not None and cell["first_api_ms"] > api_ms:
+            failures.append(
+                f"{mode}: first /api/topics {cell['first_api_ms']} ms > {api_ms}"
+            )
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--modes", nargs="+", choices=list(FACTORIES), default=list(FACTORIES)
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-import-ms", type=float)
+    parser.add_argument("--budget-health-ms", type=float)
+    parser.add_argument("--budget-api-ms", type=float)
+    args = parser.parse_args(argv)
+
+    results = run(args.modes, args.repeat)
+    print(json.dumps(results, indent=2, sort_keys=True))
+    failures = over_budget(
+        results, args.budget_import_ms, args.budget_health_ms, args.budget_api_ms
+    )
+    for failure in failures:
+        print(f"over budget: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,21 @@
+import asyncio
+import json
+import os
 import sys
 import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from typing import Iterator, List, Optional
 
 import pytest
-from backend.app.core.config import get_settings
+from backend.app.core.config import Settings, get_settings
+from backend.app.core.db import get_engine
 from backend.app.main import create_app
 from fastapi.testclient import TestClient
+from sqlmodel import SQLModel
 
 # Ensure backend package is importable by adding project root ahead of default entries.
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -14,16 +24,137 @@ if PROJECT_ROOT_STR not in sys.path:
     sys.path.insert(0, PROJECT_ROOT_STR)
 
 
+@pytest.fixture(autouse=True)
+def _isolate_cwd(tmp_path_factory, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Relative defaults (var/, data/context/) land in a scratch dir, not the repo.
+    monkeypatch.chdir(tmp_path_factory.mktemp("cwd"))
+
+
 @pytest.fixture
-def app_client(monkeypatch: pytest.MonkeyPatch) -> TestClient:
+def database_url(tmp_path) -> str:
+    """SQLite file per test, or ``TEST_DATABASE_URL`` reset to empty tables.
+
+    Run the suite against Postgres with e.g.
+    ``TEST_DATABASE_URL=postgresql://postgres@localhost/mindlore_test pytest``.
+    """
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        return f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"
+    settings = Settings(_env_file=None, claude_api_key="unused", database_url=url)
+    asyncio.run(_drop_tables(settings))
+    return settings.database_url
+
+
+async def _drop_tables(settings: Settings) -> None:
+    engine = get_engine(settings)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+def app_client(
+    monkeypatch: pytest.MonkeyPatch, database_url: str
+) -> Iterator[TestClient]:
     # Ensure settings reload with known env for deterministic tests.
     monkeypatch.delenv("CLAUDE_API_KEY", raising=False)
     monkeypatch.delenv("DATABASE_URL", raising=False)
     get_settings.cache_clear()
     tmp_dir = Path(tempfile.mkdtemp())
-    db_path = tmp_dir / "test.db"
     monkeypatch.setenv("CLAUDE_API_KEY", "sk-test-123")
-    monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{db_path}")
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_dir / "llm_cache.db"))
+    monkeypatch.setenv("SEARCH_INDEX_PATH", str(tmp_dir / "search.db"))
+    monkeypatch.setenv("CONTEXT_DIR", str(tmp_dir / "context"))
+    monkeypatch.setenv("CONTEXT_INDEX_PATH", str(tmp_dir / "context_index.db"))
 
     app = create_app()
-    return TestClient(app)
+    # Enter the client so the lifespan builds app-scoped resources.
+    with TestClient(app) as client:
+        yield client
+
+
+@dataclass
+class FakeResponse:
+    status: int = 200
+    body: object = None
+    headers: dict = field(default_factory=dict)
+    delay: float = 0.0
+
+
+class FakeLLMServer:
+    """Local HTTP server that replays scripted responses in order.
+
+    Once the script runs out the last response is repeated. ``requests``
+    records the JSON body of every request received.
+    """
+
+    def __init__(self) -> None:
+        self.script: List[FakeResponse] = []
+        self.requests: List[dict] = []
+        self._lock = threading.Lock()
+        self._last: Optional[FakeResponse] = None
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/messages"
+
+    def respond(
+        self,
+        status: int = 200,
+        body: object = None,
+        headers: Optional[dict] = None,
+        delay: float = 0.0,
+    ) -> None:
+        """Queue the next response."""
+        with self._lock:
+            self.script.append(FakeResponse(status, body, headers or {}, delay))
+
+    def _next(self, body: dict) -> FakeResponse:
+        with self._lock:
+            self.requests.append(body)
+            if self.script:
+                self._last = self.script.pop(0)
+            return self._last or FakeResponse(status=500)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                length = int(self.headers.get("content-length", 0))
+                reply = server._next(json.loads(self.rfile.read(length) or b"{}"))
+                if reply.delay:
+                    time.sleep(reply.delay)
+                payload = json.dumps(reply.body or {}).encode()
+                self.send_response(reply.status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(payload)))
+                for key, value in reply.headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def fake_llm_server() -> Iterator[FakeLLMServer]:
+    server = FakeLLMServer()
+    server.start()
+    yield server
+    server.stop()
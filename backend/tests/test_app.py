@@ -4,6 +4,7 @@ from backend.app.core.config import Settings, get_settings
 from backend.app.core.version import VERSION
 from backend.app.main import create_app
 from fastapi import FastAPI
+from fastapi.testclient import TestClient
 
 
 def _set_required_env() -> None:
@@ -62,3 +63,30 @@ def test_openapi_schema_includes_title_and_version(app_client) -> None:
     payload = _get_openapi_payload(app_client)
     assert payload["info"]["title"] == "MindLore"
     assert payload["info"]["version"] == app_client.app.state.version
+
+
+def test_lifespan_shares_one_http_client_and_service(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("CLAUDE_API_KEY", "sk-app-123")
+    monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    _reset_settings_cache()
+
+    app = create_app()
+    with TestClient(app):
+        service = app.state.suggestion_service
+        http_client = app.state.http_client
+        assert service.llm_client.inner.inner.inner.http_client is http_client
+        assert not http_client.is_closed
+
+    assert http_client.is_closed
+
+
+def test_context_index_is_kept_outside_the_content_directory(app_client) -> None:
+    settings = app_client.app.state.settings
+    app_client.app.state.context_store.save_context("notes", "Some notes")
+
+    response = app_client.get("/api/contexts")
+
+    assert response.status_code == 200
+    assert [p.name for p in settings.context_dir.iterdir()] == ["notes.md"]
+    assert settings.context_index_path.is_file()
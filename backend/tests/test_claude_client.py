@@ -0,0 +1,73 @@
+import json
+
+import httpx
+import pytest
+from backend.app.suggestions.service import ClaudeClient, UpstreamOverloaded
+
+
+def _sse_body(events: list[dict]) -> bytes:
+    lines = []
+    for event in events:
+        lines.append(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n")
+    return "".join(lines).encode()
+
+
+@pytest.mark.asyncio
+async def test_claude_client_streams_text_deltas():
+    # Given an Anthropic-style streaming response
+    captured: list[httpx.Request] = []
+    body = _sse_body(
+        [
+            {"type": "message_start", "message": {"id": "msg_1"}},
+            {"type": "content_block_start", "index": 0},
+            {
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": "### Outline A:"},
+            },
+            {
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": " Angle"},
+            },
+            {"type": "content_block_stop", "index": 0},
+            {"type": "message_stop"},
+        ]
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured.append(request)
+        return httpx.Response(
+            200, content=body, headers={"content-type": "text/event-stream"}
+        )
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+        client = ClaudeClient(api_key="sk-test", model="claude-x", http_client=http)
+
+        # When
+        chunks = [chunk async for chunk in client.astream("Test prompt")]
+
+    # Then
+    assert chunks == ["### Outline A:", " Angle"]
+    payload = json.loads(captured[0].content)
+    assert payload["stream"] is True
+    assert payload["model"] == "claude-x"
+    assert payload["messages"][0]["content"] == "Test prompt"
+    assert captured[0].headers["x-api-key"] == "sk-test"
+
+
+@pytest.mark.asyncio
+async def test_claude_client_stream_raises_on_error_event():
+    body = _sse_body(
+        [{"type": "error", "error": {"type": "overloaded_error", "message": "busy"}}]
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=body)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+        client = ClaudeClient(api_key="sk-test", model="claude-x", http_client=http)
+
+        with pytest.raises(UpstreamOverloaded, match="busy"):
+            async for _ in client.astream("Test prompt"):
+                pass
@@ -0,0 +1,178 @@
+from backend.app.core.config import get_settings
+from backend.app.core.persistence import save_topic
+from backend.app.main import create_app
+from backend.app.models import Draft, Suggestion, Topic
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+from sqlmodel import select
+
+
+def _create_topic(client: TestClient, title: str = "Caching") -> int:
+    return client.post("/api/topics", json={"title": title}).json()["id"]
+
+
+def test_topic_detail_answers_304_after_one_lookup(app_client: TestClient):
+    topic_id = _create_topic(app_client)
+    first = app_client.get(f"/api/topics/{topic_id}")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert "Last-Modified" in first.headers
+
+    statements: list[str] = []
+    engine = app_client.app.state.database.read_engine.sync_engine
+
+    def listener(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        cached = app_client.get(
+            f"/api/topics/{topic_id}", headers={"If-None-Match": etag}
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+    # Only the topic row was read; suggestions and drafts were skipped.
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+
+
+def _write(client: TestClient, change) -> None:
+    async def run():
+        async with client.app.state.database.session() as session:
+            await change(session)
+            await session.commit()
+
+    client.portal.call(run)
+
+
+def _etag_changes_after(client: TestClient, topic_id: int, change) -> bool:
+    before = client.get(f"/api/topics/{topic_id}")
+    _write(client, change)
+    after = client.get(
+        f"/api/topics/{topic_id}", headers={"If-None-Match": before.headers["ETag"]}
+    )
+    assert after.status_code in (200, 304)
+    return after.status_code == 200 and after.headers["ETag"] != before.headers["ETag"]
+
+
+def test_topic_etag_changes_when_a_draft_is_added(app_client: TestClient):
+    topic_id = _create_topic(app_client)
+
+    async def add_draft(session):
+        session.add(Draft(topic_id=topic_id, content="First draft"))
+
+    assert _etag_changes_after(app_client, topic_id, add_draft)
+    drafts = app_client.get(f"/api/topics/{topic_id}").json()["drafts"]
+    assert [d["content"] for d in drafts] == ["First draft"]
+
+
+def test_topic_etag_changes_when_a_suggestion_is_edited(app_client: TestClient):
+    topic_id = _create_topic(app_client)
+
+    async def add_suggestions(session):
+        await session.exec(
+            insert(Suggestion),
+            params=[{"topic_id": topic_id, "content": "Old", "position": 0}],
+        )
+
+    async def edit_suggestion(session):
+        suggestion = (
+            await session.exec(
+                select(Suggestion).where(Suggestion.topic_id == topic_id)
+            )
+        ).one()
+        suggestion.content = "New"
+        session.add(suggestion)
+
+    assert _etag_changes_after(app_client, topic_id, add_suggestions)
+    assert _etag_changes_after(app_client, topic_id, edit_suggestion)
+
+
+def test_topic_etag_changes_when_the_topic_is_edited(app_client: TestClient):
+    topic_id = _create_topic(app_client)
+
+    async def rename(session):
+        topic = await session.get(Topic, topic_id)
+        topic.title = "Renamed"
+        session.add(topic)
+
+    assert _etag_changes_after(app_client, topic_id, rename)
+
+
+def test_new_topic_with_suggestions_starts_at_revision_one(app_client: TestClient):
+    saved = []
+
+    async def save(session):
+        saved.append(await save_topic(session, "Fresh", suggestions=["A", "B", "C"]))
+
+    _write(app_client, save)
+
+    async def revision():
+        async with app_client.app.state.database.read_session() as session:
+            return (await session.get(Topic, saved[0].id)).revision
+
+    assert app_client.portal.call(revision) == 1
+
+
+def test_topic_detail_honours_if_modified_since(app_client: TestClient):
+    topic_id = _create_topic(app_client)
+    last_modified = app_client.get(f"/api/topics/{topic_id}").headers["Last-Modified"]
+
+    response = app_client.get(
+        f"/api/topics/{topic_id}", headers={"If-Modified-Since": last_modified}
+    )
+
+    assert response.status_code == 304
+
+
+def test_topic_list_revalidates_until_a_topic_is_added(app_client: TestClient):
+    _create_topic(app_client, "First")
+    etag = app_client.get("/api/topics").headers["ETag"]
+
+    assert (
+        app_client.get("/api/topics", headers={"If-None-Match": etag}).status_code
+        == 304
+    )
+    _create_topic(app_client, "Second")
+    assert (
+        app_client.get("/api/topics", headers={"If-None-Match": etag}).status_code
+        == 200
+    )
+
+
+def test_context_listing_is_conditional(app_client: TestClient):
+    store = app_client.app.state.context_store
+    store.save_context("notes", "First version")
+
+    first = app_client.get("/api/contexts")
+    assert first.status_code == 200
+    assert [item["slug"] for item in first.json()["items"]] == ["notes"]
+    etag = first.headers["ETag"]
+
+    cached = app_client.get("/api/contexts", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    store.save_context("notes", "Second version")
+    changed = app_client.get("/api/contexts", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["items"][0]["content"] == "Second version"
+
+
+def test_large_responses_are_gzipped_when_enabled(app_client: TestClient, monkeypatch):
+    monkeypatch.setenv("GZIP_ENABLED", "true")
+    monkeypatch.setenv("GZIP_MINIMUM_SIZE", "100")
+    get_settings.cache_clear()
+    with TestClient(create_app()) as client:
+        client.app.state.context_store.save_context("big", "word " * 500)
+
+        response = client.get("/api/contexts", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.json()["items"][0]["slug"] == "big"
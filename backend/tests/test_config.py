@@ -11,6 +11,7 @@ def _clear_env(monkeypatch: pytest.MonkeyPatch) -> None:
         "CLAUDE_MODEL",
         "PORT",
         "CONTEXT_DIR",
+        "CONTEXT_INDEX_PATH",
         "CLAUDE_API_KEY",
         "DATABASE_URL",
     ):
@@ -28,6 +29,7 @@ def test_settings_load_defaults(monkeypatch: pytest.MonkeyPatch) -> None:
     assert settings.claude_model == "claude-sonnet-4-20250514"
     assert settings.port == 8000
     assert str(settings.context_dir) == "data/context"
+    assert str(settings.context_index_path) == "var/context_index.db"
     assert settings.prompts_dir == repo_root / "prompts"
 
 
@@ -72,3 +74,16 @@ def test_settings_database_url_default(monkeypatch: pytest.MonkeyPatch) -> None:
     settings = Settings(_env_file=None)
 
     assert settings.database_url == "sqlite+aiosqlite:///./var/mindlore.db"
+    assert settings.db_pool_size == 5
+    assert settings.db_max_overflow == 10
+    assert settings.db_pool_timeout_seconds == 30.0
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["postgres://u:p@db:5432/app", "postgresql://u:p@db:5432/app"],
+)
+def test_settings_use_asyncpg_for_postgres_urls(url: str) -> None:
+    settings = Settings(_env_file=None, claude_api_key="sk-test", database_url=url)
+
+    assert settings.database_url == "postgresql+asyncpg://u:p@db:5432/app"
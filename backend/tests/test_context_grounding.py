@@ -0,0 +1,95 @@
+import pytest
+from backend.app.context.store import ContextStore
+from backend.app.prompts.repository import PromptTemplate
+from backend.app.suggestions.grounding import (
+    ContextChunk,
+    ContextRetriever,
+    pack_chunks,
+    split_into_chunks,
+)
+from backend.app.suggestions.service import SuggestionService
+from backend.app.suggestions.tokens import estimate_tokens
+
+VALID_RESPONSE = "### Outline A: 1\n### Outline B: 2\n### Outline C: 3"
+
+
+class MockPromptRepo:
+    def get_prompt(self, name: str) -> str:
+        return f"Template for {name}"
+
+    def get_template(self, name: str) -> PromptTemplate:
+        return PromptTemplate.from_text(name, self.get_prompt(name))
+
+
+def test_split_into_chunks_merges_paragraphs_up_to_limit():
+    text = "a" * 40 + "\n\n" + "b" * 40 + "\n\n" + "c" * 40
+
+    chunks = split_into_chunks("notes", text, max_tokens=20)
+
+    assert [c.text.count("\n\n") for c in chunks] == [1, 0]
+    assert all(c.slug == "notes" for c in chunks)
+    assert chunks[0].tokens == estimate_tokens(chunks[0].text)
+
+
+def test_pack_chunks_respects_budget_including_headers():
+    ranked = [
+        ContextChunk("a", "x" * 400, 100, 3.0),
+        ContextChunk("b", "x" * 400, 100, 2.0),
+        ContextChunk("c", "x" * 40, 10, 1.0),
+    ]
+
+    selected = pack_chunks(ranked, budget=130)
+
+    assert [c.slug for c in selected] == ["a", "c"]
+
+
+def test_retriever_selects_relevant_context_only(tmp_path):
+    store = ContextStore(root=tmp_path)
+    store.save_context("testing", "Property based testing finds edge cases.")
+    store.save_context("cooking", "Slow roasted tomatoes with basil.")
+
+    retriever = ContextRetriever(store, token_budget=200)
+    selected = retriever.select("Property based testing in Python")
+
+    assert [c.slug for c in selected] == ["testing"]
+    assert selected[0].score > 0
+    store.close()
+
+
+def test_retriever_picks_up_edited_context(tmp_path):
+    store = ContextStore(root=tmp_path)
+    store.save_context("notes", "Nothing relevant here.")
+    retriever = ContextRetriever(store, token_budget=200)
+    assert retriever.select("mutation testing") == []
+
+    store.save_context("notes", "Mutation testing measures test quality.")
+
+    assert [c.slug for c in retriever.select("mutation testing")] == ["notes"]
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_service_includes_selected_context_in_prompt(tmp_path):
+    store = ContextStore(root=tmp_path)
+    store.save_context("tdd", "Red green refactor keeps TDD cycles short.")
+    prompts = []
+
+    class RecordingClient:
+        async def agenerate(
+            self, prompt: str, *, system: str = "", max_tokens: int | None = None
+        ) -> str:
+            prompts.append(prompt)
+            return VALID_RESPONSE
+
+    service = SuggestionService(
+        MockPromptRepo(),
+        RecordingClient(),
+        context_retriever=ContextRetriever(store, token_budget=200),
+    )
+
+    result = await service.get_suggestions("TDD cycles")
+
+    assert [c.slug for c in result.context] == ["tdd"]
+    assert "Red green refactor" in prompts[0]
+    assert prompts[0].index("TDD cycles") < prompts[0].index("Red green refactor")
+    store.close()
@@ -1,3 +1,5 @@
+import hashlib
+
 import pytest
 from backend.app.context.store import ContextRecord, ContextStore
 
@@ -74,3 +76,65 @@ def test_list_contexts_handles_concurrent_deletion(tmp_path, monkeypatch) -> Non
 
     # Should not raise FileNotFoundError and should skip the missing file
     assert store.list_contexts() == []
+
+
+def test_list_contexts_supports_offset_and_limit(tmp_path) -> None:
+    store = ContextStore(root=tmp_path)
+    for slug in ("topic-a", "topic-b", "topic-c"):
+        store.save_context(slug, f"{slug} body")
+
+    page = store.list_contexts(offset=1, limit=1)
+
+    assert page == [ContextRecord(slug="topic-b", content="topic-b body")]
+    assert store.count() == 3
+
+
+def test_list_entries_returns_metadata_without_reading_content(
+    tmp_path, monkeypatch
+) -> None:
+    (tmp_path / "topic-a.md").write_text("hello", encoding="utf-8")
+    store = ContextStore(root=tmp_path)
+    store.refresh()
+
+    from pathlib import Path
+
+    def fail_read_text(self, *args, **kwargs):
+        raise AssertionError("content should be loaded lazily")
+
+    monkeypatch.setattr(Path, "read_text", fail_read_text)
+
+    [entry] = store.list_entries()
+
+    assert entry.slug == "topic-a"
+    assert entry.size == len("hello")
+    assert entry.content_hash == hashlib.sha256(b"hello").hexdigest()
+
+
+def test_refresh_rehashes_only_changed_files(tmp_path, monkeypatch) -> None:
+    for slug in ("topic-a", "topic-b"):
+        (tmp_path / f"{slug}.md").write_text(slug, encoding="utf-8")
+    ContextStore(root=tmp_path).refresh()
+
+    from pathlib import Path
+
+    reads = []
+    original_read_bytes = Path.read_bytes
+
+    def counting_read_bytes(self):
+        reads.append(self.name)
+        return original_read_bytes(self)
+
+    monkeypatch.setattr(Path, "read_bytes", counting_read_bytes)
+
+    # A fresh store reuses the persisted index.
+    store = ContextStore(root=tmp_path)
+    store.refresh()
+    assert reads == []
+
+    (tmp_path / "topic-b.md").write_text("changed body", encoding="utf-8")
+    (tmp_path / "topic-a.md").unlink()
+    entries = store.list_entries()
+
+    assert reads == ["topic-b.md"]
+    assert [e.slug for e in entries] == ["topic-b"]
+    assert entries[0].content == "changed body"
@@ -1,6 +1,11 @@
+import asyncio
+
 import pytest
 from backend.app.core.config import Settings
-from backend.app.core.db import get_engine, get_session
+from backend.app.core.db import Database, get_engine, get_session
+from backend.app.core.persistence import save_topic
+from prometheus_client import REGISTRY
+from sqlalchemy.exc import OperationalError
 from sqlmodel import text
 
 
@@ -18,3 +23,235 @@ async def test_get_session_runs_simple_query(tmp_path) -> None:
     async with get_session(engine) as session:
         result = await session.exec(text("SELECT 1"))
         assert result.one()[0] == 1
+
+
+@pytest.mark.asyncio
+async def test_database_reuses_one_engine_for_all_sessions(tmp_path) -> None:
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'nested' / 'test.db'}",
+        db_pool_size=2,
+        db_max_overflow=1,
+    )
+
+    database = Database(settings)
+    await database.create_schema()
+
+    async with database.read_session() as first, database.read_session() as second:
+        assert first is not second
+        assert first.bind is database.read_engine
+        assert second.bind is database.read_engine
+        result = await first.exec(text("SELECT 1"))
+        assert result.one()[0] == 1
+        result = await second.exec(text("SELECT 1"))
+        assert result.one()[0] == 1
+
+    assert database.read_engine.pool.size() == 2
+    # SQLite has one writer per file, so writes share a single connection.
+    assert database.engine.pool.size() == 1
+    await database.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_connections_get_tuning_pragmas(tmp_path) -> None:
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+        sqlite_busy_timeout_ms=1234,
+        sqlite_cache_size_kib=4096,
+    )
+    database = Database(settings)
+    await database.create_schema()
+
+    for engine in (database.engine, database.read_engine):
+        async with engine.connect() as conn:
+
+            async def pragma(name: str, conn=conn):
+                return (await conn.exec_driver_sql(f"PRAGMA {name}")).scalar()
+
+            assert await pragma("journal_mode") == "wal"
+            assert await pragma("synchronous") == 1  # NORMAL
+            assert await pragma("busy_timeout") == 1234
+            assert await pragma("cache_size") == -4096
+            assert await pragma("temp_store") == 2  # MEMORY
+    await database.dispose()
+
+
+@pytest.mark.asyncio
+async def test_read_sessions_cannot_write(tmp_path) -> None:
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+    )
+    database = Database(settings)
+    await database.create_schema()
+
+    async with database.read_session() as session:
+        with pytest.raises(OperationalError, match="readonly"):
+            await session.exec(
+                text("INSERT INTO topic (title, detail) VALUES ('x', '')")
+            )
+    await database.dispose()
+
+
+@pytest.mark.asyncio
+async def test_writers_in_separate_processes_do_not_hit_locked_errors(
+    tmp_path,
+) -> None:
+    # Two Database instances stand in for two uvicorn workers on one file.
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+    )
+    workers = [Database(settings) for _ in range(2)]
+    await workers[0].create_schema()
+
+    async def write(database: Database, n: int) -> None:
+        async with database.session() as session:
+            # Read first, then write: the upgrade that fails under deferred BEGIN.
+            await session.exec(text("SELECT COUNT(*) FROM topic"))
+            await save_topic(session, f"Topic {n}")
+
+    await asyncio.gather(
+        *(write(workers[n % 2], n) for n in range(20)),
+    )
+
+    async with workers[1].read_session() as session:
+        result = await session.exec(text("SELECT COUNT(*) FROM topic"))
+        assert result.one()[0] == 20
+    for database in workers:
+        await database.dispose()
+
+
+@pytest.mark.asyncio
+async def test_create_schema_adds_indexes_to_existing_tables(tmp_path) -> None:
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+    )
+    database = Database(settings)
+    await database.create_schema()
+    async with database.engine.begin() as conn:
+        await conn.exec_driver_sql("DROP INDEX ix_suggestion_topic_id_position")
+
+    await database.create_schema()
+
+    async with database.engine.connect() as conn:
+        rows = await conn.exec_driver_sql("PRAGMA index_list('suggestion')")
+        assert "ix_suggestion_topic_id_position" in {row[1] for row in rows}
+    await database.dispose()
+
+
+@pytest.mark.asyncio
+async def test_create_schema_adds_columns_missing_from_existing_tables(
+    tmp_path,
+) -> None:
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+    )
+    database = Database(settings)
+    async with database.engine.begin() as conn:
+        # The topic table as created before revisions were tracked.
+        await conn.exec_driver_sql(
+            "CREATE TABLE topic (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, "
+            "detail VARCHAR NOT NULL)"
+        )
+        await conn.exec_driver_sql("INSERT INTO topic VALUES (1, 'Old', '')")
+
+    await database.create_schema()
+
+    async with database.read_session() as session:
+        result = await session.exec(text("SELECT revision, updated_at FROM topic"))
+        assert result.one() == (1, None)
+    await database.dispose()
+
+
+@pytest.mark.asyncio
+async def test_connection_time_covers_the_transaction_not_the_session(
+    tmp_path,
+) -> None:
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+    )
+    database = Database(settings)
+    await database.create_schema()
+
+    def held(stat: str) -> float:
+        name = f"mindlore_db_connection_held_seconds_{stat}"
+        return REGISTRY.get_sample_value(name, {"role": "writer"}) or 0.0
+
+    count, total = held("count"), held("sum")
+    async with database.session() as session:
+        await save_topic(session, "Held")
+        # Slow work after the commit, like waiting on the LLM, is not counted
+        await asyncio.sleep(0.3)
+
+    assert held("count") == count + 1
+    assert held("sum") - total < 0.3
+    await database.dispose()
+
+
+def test_postgres_engine_gets_pool_and_statement_cache_options() -> None:
+    pytest.importorskip("asyncpg")
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url="postgresql://u:p@localhost/app",
+        db_pool_recycle_seconds=60,
+        db_statement_cache_size=0,
+    )
+
+    engine = get_engine(settings)
+
+    assert engine.url.query["prepared_statement_cache_size"] == "0"
+    assert engine.pool._recycle == 60
+    assert engine.pool._pre_ping is True
+
+
+@pytest.mark.asyncio
+async def test_pgbouncer_mode_uses_unique_uncached_statements(database_url) -> None:
+    if not database_url.startswith("postgresql"):
+        pytest.skip("needs TEST_DATABASE_URL pointing at Postgres")
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url=database_url,
+        db_pgbouncer=True,
+    )
+    engine = get_engine(settings)
+    query = text("SELECT name FROM pg_prepared_statements")
+
+    async with engine.connect() as conn:
+        # The query lists itself: the one statement prepared for it.
+        names = [(await conn.execute(query)).scalar_one() for _ in range(2)]
+        raw = (await conn.get_raw_connection()).driver_connection
+
+    assert names[0] != names[1]
+    assert all(name.startswith("__asyncpg_") for name in names)
+    assert raw._stmt_cache.get_max_size() == 0
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_schema_bootstrap_is_safe(database_url) -> None:
+    settings = Settings(
+        _env_file=None, claude_api_key="sk-test", database_url=database_url
+    )
+    replicas = [Database(settings) for _ in range(3)]
+
+    await asyncio.gather(*(replica.create_schema() for replica in replicas))
+
+    async with replicas[0].session() as session:
+        result = await session.exec(text("SELECT COUNT(*) FROM topic"))
+        assert result.one()[0] == 0
+    for replica in replicas:
+        await replica.dispose()
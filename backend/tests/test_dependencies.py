@@ -25,3 +25,11 @@ def test_get_prompt_repository_defaults_to_repo_prompts_dir(monkeypatch) -> None
     repo = get_prompt_repository()
 
     assert "## Output format (required)" in repo.get_prompt("topics_first")
+
+
+def test_get_prompt_repository_reuses_one_instance(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("PROMPTS_DIR", str(tmp_path))
+    monkeypatch.setenv("CLAUDE_API_KEY", "sk-test-123")
+    get_settings.cache_clear()
+
+    assert get_prompt_repository() is get_prompt_repository()
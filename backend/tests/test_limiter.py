@@ -0,0 +1,165 @@
+import asyncio
+
+import httpx
+import pytest
+from backend.app.api.dependencies import build_llm_client, get_suggestion_service
+from backend.app.core.config import Settings
+from backend.app.suggestions.limiter import (
+    LimitedLLMClient,
+    LLMLimiter,
+    RateLimitExceeded,
+    TokenBucket,
+)
+
+
+class FakeTime:
+    """Clock whose sleep advances time instantly."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_refills_at_per_minute_rate():
+    fake = FakeTime()
+    bucket = TokenBucket(60, clock=fake.clock)
+
+    bucket.take(60)
+    assert bucket.wait_time(6) == pytest.approx(6.0)
+
+    fake.now = 3
+    assert bucket.wait_time(6) == pytest.approx(3.0)
+
+
+@pytest.mark.asyncio
+async def test_requests_wait_for_budget_then_reject_past_deadline():
+    fake = FakeTime()
+    limiter = LLMLimiter(
+        requests_per_minute=60, max_wait=2.0, clock=fake.clock, sleep=fake.sleep
+    )
+    limiter.requests.take(60)
+
+    async with limiter.acquire(tokens=0):
+        pass
+    assert fake.sleeps == [pytest.approx(1.0)]
+
+    limiter.requests.take(5)
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        async with limiter.acquire(tokens=0):
+            pass
+    assert excinfo.value.retry_after > 2.0
+
+
+@pytest.mark.asyncio
+async def test_token_budget_counts_prompt_and_expected_output():
+    fake = FakeTime()
+    limiter = LLMLimiter(
+        tokens_per_minute=1000, max_wait=0, clock=fake.clock, sleep=fake.sleep
+    )
+    calls = []
+
+    class Inner:
+        async def agenerate(
+            self, prompt: str, *, system: str = "", max_tokens: int | None = None
+        ) -> str:
+            calls.append(prompt)
+            return "ok"
+
+    client = LimitedLLMClient(Inner(), limiter, expected_output_tokens=400)
+
+    await client.agenerate("x" * 400)  # 100 prompt tokens + 400 expected
+    with pytest.raises(RateLimitExceeded):
+        await client.agenerate("x" * 2400)
+
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_bounded_queue():
+    limiter = LLMLimiter(max_concurrency=1, max_queue=1, max_wait=5)
+    release = asyncio.Event()
+    active = 0
+    peak = 0
+
+    async def call() -> None:
+        nonlocal active, peak
+        async with limiter.acquire(tokens=0):
+            active += 1
+            peak = max(peak, active)
+            await release.wait()
+            active -= 1
+
+    first = asyncio.create_task(call())
+    second = asyncio.create_task(call())
+    await asyncio.sleep(0)
+    assert limiter.waiting == 1
+
+    with pytest.raises(RateLimitExceeded):
+        await call()
+
+    release.set()
+    await asyncio.gather(first, second)
+    assert peak == 1
+
+
+@pytest.mark.asyncio
+async def test_waiting_for_slot_times_out():
+    limiter = LLMLimiter(max_concurrency=1, max_wait=0.05)
+
+    async with limiter.acquire(tokens=0):
+        with pytest.raises(RateLimitExceeded):
+            async with limiter.acquire(tokens=0):
+                pass
+
+    assert limiter.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_hedges_take_their_own_limiter_slot():
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"content": [{"type": "text", "text": "ok"}]})
+
+    settings = Settings(
+        claude_api_key="sk-test",
+        llm_max_concurrency=1,
+        llm_max_queue_wait_seconds=0,
+        llm_hedge_enabled=True,
+        llm_hedge_percentile=50,
+        llm_hedge_min_samples=1,
+    )
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+        client = build_llm_client(settings, http)
+        client.latency.record(0.001)  # so every call is slow enough to hedge
+
+        result = await asyncio.wait_for(client.agenerate("prompt"), timeout=1)
+
+    # The hedge found the only slot taken, so one call went upstream, and
+    # being turned away locally did not count against the breaker.
+    assert result == "ok"
+    assert calls == 1
+    assert client.breaker.state == "closed"
+
+
+def test_rate_limited_suggestions_return_429_with_retry_after(app_client):
+    class BusyService:
+        async def get_suggestions(self, topic: str):
+            raise RateLimitExceeded(retry_after=4.5)
+
+    app_client.app.dependency_overrides[get_suggestion_service] = lambda: BusyService()
+
+    response = app_client.post("/api/suggestions", json={"topic": "Anything"})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "5"
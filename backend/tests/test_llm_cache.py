@@ -0,0 +1,163 @@
+import pytest
+from backend.app.suggestions.cache import (
+    CachedLLMClient,
+    LLMResponseCache,
+    MemoryLRU,
+    SQLiteResponseStore,
+    cache_key,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingLLMClient:
+    def __init__(self, response: str = "response"):
+        self.response = response
+        self.calls = 0
+
+    async def agenerate(
+        self, prompt: str, *, system: str = "", max_tokens: int | None = None
+    ) -> str:
+        self.calls += 1
+        return f"{self.response}:{prompt}"
+
+    async def astream(
+        self, prompt: str, *, system: str = "", max_tokens: int | None = None
+    ):
+        self.calls += 1
+        for chunk in (self.response, ":", prompt):
+            yield chunk
+
+
+def _cache(tmp_path, clock, memory_entries=8, max_entries=8, ttl=60.0):
+    memory = MemoryLRU(max_entries=memory_entries, ttl_seconds=ttl, clock=clock)
+    store = SQLiteResponseStore(
+        tmp_path / "cache.db", max_entries=max_entries, ttl_seconds=ttl, clock=clock
+    )
+    return LLMResponseCache(memory, store, version="1")
+
+
+def test_cache_key_depends_on_model_prompt_and_version():
+    base = cache_key("model-a", "prompt", "1")
+
+    assert base == cache_key("model-a", "prompt", "1")
+    assert base != cache_key("model-b", "prompt", "1")
+    assert base != cache_key("model-a", "prompt!", "1")
+    assert base != cache_key("model-a", "prompt", "2")
+
+
+@pytest.mark.asyncio
+async def test_cached_client_serves_repeats_from_memory(tmp_path):
+    cache = _cache(tmp_path, FakeClock())
+    inner = CountingLLMClient()
+    client = CachedLLMClient(inner, cache, model="m")
+
+    first = await client.agenerate("topic")
+    second = await client.agenerate("topic")
+
+    assert first == second == "response:topic"
+    assert inner.calls == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.memory_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    clock = FakeClock()
+    cache = _cache(tmp_path, clock)
+    await CachedLLMClient(CountingLLMClient(), cache, model="m").agenerate("topic")
+    cache.close()
+
+    restarted = _cache(tmp_path, clock)
+    inner = CountingLLMClient()
+    result = await CachedLLMClient(inner, restarted, model="m").agenerate("topic")
+
+    assert result == "response:topic"
+    assert inner.calls == 0
+    assert restarted.stats.disk_hits == 1
+    restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(tmp_path):
+    clock = FakeClock()
+    cache = _cache(tmp_path, clock, ttl=60.0)
+    inner = CountingLLMClient()
+    client = CachedLLMClient(inner, cache, model="m")
+
+    await client.agenerate("topic")
+    clock.now += 61
+    await client.agenerate("topic")
+
+    assert inner.calls == 2
+    assert cache.stats.hits == 0
+    cache.close()
+
+
+def test_memory_tier_evicts_least_recently_used():
+    lru = MemoryLRU(max_entries=2, ttl_seconds=60.0, clock=FakeClock())
+
+    lru.set("a", "A")
+    lru.set("b", "B")
+    assert lru.get("a") == "A"  # "b" is now least recently used
+    lru.set("c", "C")
+
+    assert len(lru) == 2
+    assert lru.get("b") is None
+    assert lru.get("a") == "A"
+
+
+def test_disk_tier_evicts_least_recently_used_beyond_max_entries(tmp_path):
+    clock = FakeClock()
+    store = SQLiteResponseStore(
+        tmp_path / "cache.db", max_entries=2, ttl_seconds=60.0, clock=clock
+    )
+
+    for key in ("a", "b"):
+        clock.now += 1
+        store.set(key, "m", key.upper())
+    clock.now += 1
+    assert store.get("a") == ("A", 1001.0)
+    clock.now += 1
+    store.set("c", "m", "C")
+
+    assert store.count() == 2
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_rejected_responses_are_not_cached(tmp_path):
+    cache = _cache(tmp_path, FakeClock())
+    inner = CountingLLMClient()
+    client = CachedLLMClient(inner, cache, model="m", should_cache=lambda _: False)
+
+    await client.agenerate("topic")
+    await client.agenerate("topic")
+
+    assert inner.calls == 2
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_is_cached_for_later_calls(tmp_path):
+    cache = _cache(tmp_path, FakeClock())
+    inner = CountingLLMClient()
+    client = CachedLLMClient(inner, cache, model="m")
+
+    streamed = "".join([chunk async for chunk in client.astream("topic")])
+    replayed = [chunk async for chunk in client.astream("topic")]
+    generated = await client.agenerate("topic")
+
+    assert streamed == "response:topic"
+    assert replayed == [streamed]
+    assert generated == streamed
+    assert inner.calls == 1
+    cache.close()
@@ -0,0 +1,40 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_load_benchmark_writes_json_report(tmp_path) -> None:
+    output = tmp_path / "load.json"
+
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.load",
+            "--latency-ms",
+            "1",
+            "--concurrency",
+            "1",
+            "2",
+            "--requests",
+            "4",
+            "--output",
+            str(output),
+        ],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        timeout=60,
+    )
+
+    report = json.loads(output.read_text())
+    assert set(report["results"]) == {"health", "suggestions", "topics"}
+    for levels in report["results"].values():
+        assert set(levels) == {"1", "2"}
+        for cell in levels.values():
+            assert cell["errors"] == 0
+            assert cell["requests"] == 4
+            assert cell["p50_ms"] <= cell["p95_ms"] <= cell["p99_ms"]
@@ -0,0 +1,149 @@
+import json
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from backend.app.prompts.repository import PromptTemplate
+from backend.app.suggestions.service import (
+    ClaudeClient,
+    FakeLLMClient,
+    SuggestionService,
+)
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+
+def _sample(name: str, labels: dict | None = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def test_metrics_endpoint_reports_http_latency_by_route_template(
+    app_client: TestClient,
+):
+    # Given a request to a parameterised route
+    labels = {"method": "GET", "route": "/api/topics/{topic_id}", "status": "404"}
+    before = _sample("mindlore_http_request_duration_seconds_count", labels)
+    app_client.get("/api/topics/987654")
+
+    # When
+    response = app_client.get("/metrics")
+
+    # Then the route is labelled by its template, not the raw path
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert _sample("mindlore_http_request_duration_seconds_count", labels) == (
+        before + 1
+    )
+    assert 'route="/api/topics/987654"' not in response.text
+    assert "mindlore_suggestion_jobs_queued 0.0" in response.text
+    assert "mindlore_llm_cache_memory_entries" in response.text
+
+
+def test_metrics_endpoint_can_be_disabled(
+    app_client: TestClient, monkeypatch: pytest.MonkeyPatch
+):
+    from backend.app.core.config import get_settings
+    from backend.app.main import create_app
+
+    monkeypatch.setenv("METRICS_ENABLED", "false")
+    get_settings.cache_clear()
+    with TestClient(create_app()) as client:
+        assert client.get("/metrics").status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_claude_client_records_latency_tokens_and_errors():
+    # Given an upstream that answers once, then fails with 529
+    responses = [
+        httpx.Response(
+            200,
+            json={
+                "content": [{"type": "text", "text": "hi"}],
+                "usage": {"input_tokens": 12, "output_tokens": 5},
+            },
+        ),
+        httpx.Response(529, json={"error": {"type": "overloaded_error"}}),
+    ]
+    model = "claude-metrics-test"
+    ok = {"model": model, "outcome": "ok"}
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: responses.pop(0))
+    ) as http:
+        client = ClaudeClient(api_key="sk-test", model=model, http_client=http)
+
+        # When
+        await client.agenerate("Prompt")
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.agenerate("Prompt")
+
+    # Then
+    assert _sample("mindlore_llm_request_duration_seconds_count", ok) == 1
+    assert (
+        _sample("mindlore_llm_tokens_total", {"model": model, "direction": "input"})
+        == 12
+    )
+    assert (
+        _sample("mindlore_llm_tokens_total", {"model": model, "direction": "output"})
+        == 5
+    )
+    assert _sample("mindlore_llm_errors_total", {"model": model, "code": "529"}) == 1
+
+
+@pytest.mark.asyncio
+async def test_claude_client_counts_streamed_usage():
+    # Given a stream that reports usage in message_start and message_delta
+    events = [
+        {"type": "message_start", "message": {"usage": {"input_tokens": 20}}},
+        {
+            "type": "content_block_delta",
+            "delta": {"type": "text_delta", "text": "hello"},
+        },
+        {"type": "message_delta", "usage": {"output_tokens": 7}},
+        {"type": "message_stop"},
+    ]
+    body = "".join(
+        f"event: {e['type']}\ndata: {json.dumps(e)}\n\n" for e in events
+    ).encode()
+    model = "claude-metrics-stream"
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(
+                200, content=body, headers={"content-type": "text/event-stream"}
+            )
+        )
+    ) as http:
+        client = ClaudeClient(api_key="sk-test", model=model, http_client=http)
+
+        # When
+        chunks = [chunk async for chunk in client.astream("Prompt")]
+
+    # Then
+    assert chunks == ["hello"]
+    assert (
+        _sample("mindlore_llm_tokens_total", {"model": model, "direction": "input"})
+        == 20
+    )
+    assert (
+        _sample("mindlore_llm_tokens_total", {"model": model, "direction": "output"})
+        == 7
+    )
+
+
+@pytest.mark.asyncio
+async def test_parse_failures_are_counted():
+    # Given an LLM that returns a single outline
+    class PromptRepo:
+        def get_template(self, name: str) -> PromptTemplate:
+            return PromptTemplate.from_text(name, "Template")
+
+    llm_client = FakeLLMClient()
+    llm_client.agenerate = AsyncMock(return_value="### Outline A: Only")
+    service = SuggestionService(PromptRepo(), llm_client)
+    before = _sample("mindlore_suggestion_parse_failures_total")
+
+    # When
+    with pytest.raises(ValueError):
+        await service.get_suggestions("Anything")
+
+    # Then
+    assert _sample("mindlore_suggestion_parse_failures_total") == before + 1
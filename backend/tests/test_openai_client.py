@@ -1,29 +1,31 @@
-from unittest.mock import MagicMock, patch
+import json
 
+import httpx
+import pytest
 from backend.app.suggestions.service import OpenAIClient
 
 
-def test_openai_client_calls_api_correctly():
+@pytest.mark.asyncio
+async def test_openai_client_calls_api_correctly():
     # Given
-    mock_response = MagicMock()
-    mock_response.json.return_value = {
-        "choices": [{"message": {"content": "Suggestions from OpenAI"}}]
-    }
-    mock_response.status_code = 200
+    captured: list[httpx.Request] = []
 
-    with patch("httpx.Client") as mock_client_class:
-        mock_client = mock_client_class.return_value.__enter__.return_value
-        mock_client.post.return_value = mock_response
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured.append(request)
+        return httpx.Response(
+            200, json={"choices": [{"message": {"content": "Suggestions from OpenAI"}}]}
+        )
 
-        client = OpenAIClient(api_key="fake-key", model="gpt-5.2")
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+        client = OpenAIClient(api_key="fake-key", model="gpt-5.2", http_client=http)
 
         # When
-        result = client.generate("Test prompt")
+        result = await client.agenerate("Test prompt")
 
-        # Then
-        assert result == "Suggestions from OpenAI"
-        mock_client.post.assert_called_once()
-        _, kwargs = mock_client.post.call_args
-        assert kwargs["json"]["model"] == "gpt-5.2"
-        assert kwargs["json"]["messages"][0]["content"] == "Test prompt"
-        assert kwargs["headers"]["Authorization"] == "Bearer fake-key"
+    # Then
+    assert result == "Suggestions from OpenAI"
+    assert len(captured) == 1
+    payload = json.loads(captured[0].content)
+    assert payload["model"] == "gpt-5.2"
+    assert payload["messages"][0]["content"] == "Test prompt"
+    assert captured[0].headers["Authorization"] == "Bearer fake-key"
@@ -0,0 +1,70 @@
+import pytest
+from backend.app.core.config import Settings
+from backend.app.core.db import Database
+from backend.app.core.persistence import add_topics, save_topic
+from backend.app.models import Suggestion, Topic
+from sqlalchemy import event
+from sqlmodel import select
+
+
+async def _database(database_url) -> Database:
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url=database_url,
+    )
+    database = Database(settings)
+    await database.create_schema()
+    return database
+
+
+@pytest.mark.asyncio
+async def test_save_topic_writes_topic_and_suggestions_in_one_commit(database_url):
+    database = await _database(database_url)
+    statements: list[str] = []
+    commits: list[object] = []
+
+    def record(conn, cursor, statement, *args) -> None:
+        keyword = statement.split()[0].upper()
+        # The SQLite writer engine opens transactions with BEGIN IMMEDIATE.
+        if keyword != "BEGIN":
+            statements.append(keyword)
+
+    event.listen(database.engine.sync_engine, "before_cursor_execute", record)
+    event.listen(database.engine.sync_engine, "commit", commits.append)
+
+    async with database.session() as session:
+        topic = await save_topic(session, "Title", "Detail", ["a", "b", "c"])
+
+    assert topic.id is not None
+    assert len(commits) == 1
+    assert statements == ["INSERT", "INSERT"]
+
+    async with database.session() as session:
+        saved = (
+            await session.exec(
+                select(Suggestion)
+                .where(Suggestion.topic_id == topic.id)
+                .order_by(Suggestion.position)
+            )
+        ).all()
+        assert [(s.content, s.position) for s in saved] == [
+            ("a", 0),
+            ("b", 1),
+            ("c", 2),
+        ]
+    await database.dispose()
+
+
+@pytest.mark.asyncio
+async def test_add_topics_stages_many_topics_until_commit(database_url):
+    database = await _database(database_url)
+
+    async with database.session() as session:
+        topics = await add_topics(session, [("One", "", ["x"]), ("Two", "", [])])
+        assert [t.id for t in topics] == [1, 2]
+        await session.rollback()
+
+    async with database.session() as session:
+        assert (await session.exec(select(Topic))).all() == []
+    await database.dispose()
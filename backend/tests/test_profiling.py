@@ -0,0 +1,50 @@
+import pstats
+
+import pytest
+from backend.app.core.config import get_settings
+from backend.app.core.profiling import ProfilingMiddleware
+from backend.app.main import create_app
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def profiling_client(app_client: TestClient, monkeypatch, tmp_path):
+    monkeypatch.setenv("PROFILING_ENABLED", "true")
+    monkeypatch.setenv("PROFILING_DIR", str(tmp_path / "profiles"))
+    get_settings.cache_clear()
+    with TestClient(create_app()) as client:
+        yield client, tmp_path / "profiles"
+
+
+def test_profiled_request_writes_pstats_and_collapsed_stacks(profiling_client):
+    client, profile_dir = profiling_client
+
+    # When
+    response = client.get("/api/topics", headers={"X-Profile": "1"})
+
+    # Then
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    stats = pstats.Stats(str(profile_dir / f"{profile_id}.pstats"))
+    assert any(func[2] == "list_topics" for func in stats.stats)
+    collapsed = (profile_dir / f"{profile_id}.collapsed").read_text()
+    for line in collapsed.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and stack
+
+
+def test_requests_without_header_are_not_profiled(profiling_client):
+    client, profile_dir = profiling_client
+
+    response = client.get("/health", headers={"X-Profile": "0"})
+
+    assert "X-Profile-Id" not in response.headers
+    assert not profile_dir.exists()
+
+
+def test_profiling_middleware_is_not_installed_by_default(app_client: TestClient):
+    middleware = [m.cls for m in app_client.app.user_middleware]
+
+    assert ProfilingMiddleware not in middleware
+    response = app_client.get("/health", headers={"X-Profile": "1"})
+    assert "X-Profile-Id" not in response.headers
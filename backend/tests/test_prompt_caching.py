@@ -0,0 +1,130 @@
+import json
+
+import httpx
+import pytest
+from backend.app.api.dependencies import get_settings
+from backend.app.main import create_app
+from backend.app.suggestions.service import ClaudeClient
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+VALID_RESPONSE = "### Outline A: 1\n### Outline B: 2\n### Outline C: 3"
+MODEL = "claude-prompt-cache-test"
+
+
+def _tokens(direction: str) -> float:
+    labels = {"model": MODEL, "direction": direction}
+    return REGISTRY.get_sample_value("mindlore_llm_tokens_total", labels) or 0.0
+
+
+@pytest.fixture
+def client(app_client: TestClient, monkeypatch, fake_llm_server):
+    monkeypatch.setenv("CLAUDE_MESSAGES_URL", fake_llm_server.url)
+    monkeypatch.setenv("CLAUDE_MODEL", MODEL)
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    # The bundled template is just under Anthropic's 1024-token minimum.
+    monkeypatch.setenv("CLAUDE_PROMPT_CACHE_MIN_TOKENS", "500")
+    get_settings.cache_clear()
+    with TestClient(create_app()) as client:
+        yield client
+
+
+def test_template_is_sent_as_one_cached_system_block(client, fake_llm_server):
+    # Given an upstream that writes the prefix to its cache, then reads it back
+    fake_llm_server.respond(
+        body={
+            "content": [{"type": "text", "text": VALID_RESPONSE}],
+            "usage": {
+                "input_tokens": 9,
+                "output_tokens": 20,
+                "cache_creation_input_tokens": 1500,
+                "cache_read_input_tokens": 0,
+            },
+        }
+    )
+    fake_llm_server.respond(
+        body={
+            "content": [{"type": "text", "text": VALID_RESPONSE}],
+            "usage": {
+                "input_tokens": 11,
+                "output_tokens": 20,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 1500,
+            },
+        }
+    )
+
+    # When two different topics are requested
+    for topic in ("First topic", "Second topic"):
+        response = client.post("/api/suggestions", json={"topic": topic})
+        assert response.status_code == 200
+
+    # Then both requests share a byte-identical, cache-marked system prefix
+    first, second = fake_llm_server.requests
+    assert first["system"] == second["system"]
+    (block,) = first["system"]
+    assert block["cache_control"] == {"type": "ephemeral"}
+    assert "Topic:" not in block["text"]
+    # And only the user message varies
+    assert first["messages"] == [{"role": "user", "content": "Topic:\nFirst topic\n"}]
+    assert second["messages"][0]["content"].startswith("Topic:\nSecond topic")
+
+    # And cache reads and writes are counted apart from uncached input
+    assert _tokens("input") == 20
+    assert _tokens("cache_creation") == 1500
+    assert _tokens("cache_read") == 1500
+
+
+@pytest.mark.asyncio
+async def test_cache_control_can_be_turned_off():
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(json.loads(request.content))
+        return httpx.Response(200, json={"content": [{"type": "text", "text": ""}]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+        client = ClaudeClient(
+            api_key="sk-test", model=MODEL, http_client=http, cache_system=False
+        )
+        await client.agenerate("Topic:\nx\n", system="Template")
+        await client.agenerate("Topic:\nx\n")
+
+    assert sent[0]["system"] == [{"type": "text", "text": "Template"}]
+    assert "system" not in sent[1]
+
+
+@pytest.mark.asyncio
+async def test_short_prefixes_are_not_marked_and_unused_caches_are_reported(
+    caplog,
+):
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(json.loads(request.content))
+        usage = {"input_tokens": 300, "output_tokens": 1}
+        return httpx.Response(
+            200, json={"content": [{"type": "text", "text": ""}], "usage": usage}
+        )
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+        # Given a template shorter than the minimum cacheable prefix
+        client = ClaudeClient(api_key="sk-test", model=MODEL, http_client=http)
+        await client.agenerate("Topic:\nx\n", system="Short template")
+        # Then it is sent unmarked, and nothing is reported
+        assert "cache_control" not in sent[0]["system"][0]
+        assert caplog.records == []
+
+        # Given a marked prefix the upstream neither writes nor reads
+        marked = ClaudeClient(
+            api_key="sk-test", model=MODEL, http_client=http, cache_min_tokens=1
+        )
+        for _ in range(2):
+            await marked.agenerate("Topic:\nx\n", system="Short template")
+
+    # Then that is logged, once
+    assert "cache_control" in sent[1]["system"][0]
+    assert [r.getMessage() for r in caplog.records if "cache" in r.getMessage()] == [
+        f"Prompt cache unused for {MODEL}: the upstream neither wrote nor read "
+        "the cached prefix, which is likely shorter than the model's minimum"
+    ]
@@ -1,17 +1,34 @@
-from backend.app.prompts.repository import render_prompt
+from backend.app.prompts.repository import PromptTemplate, render_messages
 
 
-def test_render_prompt_includes_topic_and_content():
+def test_render_messages_includes_topic_and_content():
     # Given
-    prompt_template = "System instructions here."
+    template = PromptTemplate.from_text("topics_first", "System instructions here.")
     topic = "Testing TDD in Python"
 
     # When
-    final_prompt = render_prompt(prompt_template, topic)
+    system, user = render_messages(template, topic)
 
     # Then
-    assert prompt_template in final_prompt
-    assert topic in final_prompt
-    assert "Topic:" in final_prompt
+    assert system == "System instructions here."
+    assert user == f"Topic:\n{topic}\n"
     # Ensure topic is only included once
-    assert final_prompt.count(topic) == 1
+    assert f"{system}{user}".count(topic) == 1
+
+
+def test_render_messages_keeps_the_system_part_identical_across_topics():
+    template = PromptTemplate.from_text("topics_first", "System instructions here.")
+
+    first, _ = render_messages(template, "Topic X")
+    second, _ = render_messages(template, "Topic Y", context="Some notes")
+
+    assert first == second == template.text
+
+
+def test_render_messages_appends_context_after_topic():
+    template = PromptTemplate.from_text("topics_first", "System instructions here.")
+
+    _, user = render_messages(template, "Topic X", context="Some notes")
+
+    assert user.startswith("Topic:\nTopic X\n")
+    assert user.index("Topic X") < user.index("Some notes")
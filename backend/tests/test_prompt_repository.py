@@ -1,6 +1,11 @@
+import os
 from pathlib import Path
 
-from backend.app.prompts.repository import FilePromptRepository
+from backend.app.prompts.repository import (
+    CachedPromptRepository,
+    FilePromptRepository,
+    PromptTemplate,
+)
 
 
 def test_file_prompt_repository_loads_topics_first():
@@ -15,3 +20,44 @@ def test_file_prompt_repository_loads_topics_first():
     # Then it should return the content of prompts/topics_first.md
     assert "## Output format (required)" in content
     assert "### Outline A:" in content
+
+
+def test_cached_prompt_repository_reads_file_once_until_it_changes(
+    tmp_path, monkeypatch
+):
+    prompt_file = tmp_path / "topics_first.md"
+    prompt_file.write_text("v1", encoding="utf-8")
+    repo = CachedPromptRepository(prompts_dir=tmp_path)
+
+    reads = []
+    original_read_text = Path.read_text
+
+    def counting_read_text(self, *args, **kwargs):
+        reads.append(self)
+        return original_read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", counting_read_text)
+
+    first = repo.get_template("topics_first")
+    second = repo.get_template("topics_first")
+
+    assert first is second
+    assert repo.get_prompt("topics_first") == "v1"
+    assert len(reads) == 1
+
+    prompt_file.write_text("version 2", encoding="utf-8")
+    stat = prompt_file.stat()
+    os.utime(prompt_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    updated = repo.get_template("topics_first")
+
+    assert updated.text == "version 2"
+    assert updated.content_hash != first.content_hash
+    assert len(reads) == 2
+
+
+def test_prompt_template_hash_is_stable_for_same_content():
+    first = PromptTemplate.from_text("topics_first", "Same text")
+    second = PromptTemplate.from_text("topics_first", "Same text")
+
+    assert first.content_hash == second.content_hash
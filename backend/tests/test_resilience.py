@@ -0,0 +1,283 @@
+import asyncio
+
+import httpx
+import pytest
+from backend.app.api.dependencies import get_suggestion_service
+from backend.app.suggestions.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    ResilientLLMClient,
+    UpstreamUnavailable,
+    backoff_delay,
+)
+from backend.app.suggestions.service import ClaudeClient, UpstreamOverloaded
+
+OK = {"body": {"content": [{"text": "hello"}]}}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _client(server, http, **kwargs) -> tuple[ResilientLLMClient, list[float]]:
+    sleeps: list[float] = []
+
+    async def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    inner = ClaudeClient(api_key="sk-test", model="m", http_client=http, url=server.url)
+    return ResilientLLMClient(inner, sleep=sleep, **kwargs), sleeps
+
+
+@pytest.mark.asyncio
+async def test_retries_overloaded_responses_honouring_retry_after(fake_llm_server):
+    fake_llm_server.respond(status=529, headers={"retry-after": "2"})
+    fake_llm_server.respond(status=503)
+    fake_llm_server.respond(**OK)
+    async with httpx.AsyncClient() as http:
+        client, sleeps = _client(fake_llm_server, http, backoff_base=0.1)
+
+        assert await client.agenerate("prompt") == "hello"
+
+    assert len(fake_llm_server.requests) == 3
+    assert sleeps[0] >= 2
+    assert 0 <= sleeps[1] <= 0.2
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_client_errors(fake_llm_server):
+    fake_llm_server.respond(status=400)
+    async with httpx.AsyncClient() as http:
+        client, sleeps = _client(fake_llm_server, http)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.agenerate("prompt")
+
+    assert len(fake_llm_server.requests) == 1
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_gives_up_when_retry_after_exceeds_backoff_cap(fake_llm_server):
+    fake_llm_server.respond(status=429, headers={"retry-after": "120"})
+    async with httpx.AsyncClient() as http:
+        client, sleeps = _client(fake_llm_server, http, backoff_max=10)
+
+        with pytest.raises(UpstreamUnavailable) as excinfo:
+            await client.agenerate("prompt")
+
+    assert sleeps == []
+    assert excinfo.value.retry_after == 120
+    assert isinstance(excinfo.value.__cause__, httpx.HTTPStatusError)
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_then_recovers_after_probe(fake_llm_server):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    fake_llm_server.respond(status=500)
+    fake_llm_server.respond(status=500)
+    fake_llm_server.respond(**OK)
+    async with httpx.AsyncClient() as http:
+        client, _ = _client(fake_llm_server, http, max_retries=1, breaker=breaker)
+
+        with pytest.raises(UpstreamUnavailable):
+            await client.agenerate("prompt")
+        with pytest.raises(CircuitOpenError) as excinfo:
+            await client.agenerate("prompt")
+        assert excinfo.value.retry_after == 30
+        assert len(fake_llm_server.requests) == 2
+
+        clock.now = 31
+        assert await client.agenerate("prompt") == "hello"
+        assert breaker.state == "closed"
+
+
+def test_failed_probe_reopens_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+
+
+def test_backoff_is_jittered_within_exponential_cap():
+    delays = [backoff_delay(3, base=0.5, cap=2.0) for _ in range(50)]
+
+    assert all(0 <= d <= 2.0 for d in delays)
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.asyncio
+async def test_hedges_slow_call_and_cancels_loser():
+    calls: list[str] = []
+    cancelled = asyncio.Event()
+
+    class SlowThenFastClient:
+        async def agenerate(
+            self, prompt: str, *, system: str = "", max_tokens: int | None = None
+        ) -> str:
+            calls.append(prompt)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+                return "slow"
+            return "fast"
+
+    latency = LatencyTracker(min_samples=3)
+    for _ in range(3):
+        latency.record(0.01)
+    client = ResilientLLMClient(
+        SlowThenFastClient(), hedge_percentile=95, latency=latency
+    )
+
+    result = await asyncio.wait_for(client.agenerate("prompt"), timeout=1)
+
+    assert result == "fast"
+    assert len(calls) == 2
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_only_before_first_chunk():
+    attempts = 0
+    request = httpx.Request("POST", "http://llm")
+
+    class FlakyStream:
+        async def astream(
+            self, prompt: str, *, system: str = "", max_tokens: int | None = None
+        ):
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise httpx.ConnectError("refused", request=request)
+            yield "one"
+            raise httpx.ReadError("reset", request=request)
+
+    async def no_sleep(_: float) -> None:
+        pass
+
+    client = ResilientLLMClient(FlakyStream(), sleep=no_sleep)
+    chunks = []
+
+    with pytest.raises(UpstreamUnavailable) as excinfo:
+        async for chunk in client.astream("prompt"):
+            chunks.append(chunk)
+
+    assert attempts == 2
+    assert chunks == ["one"]
+    assert isinstance(excinfo.value.__cause__, httpx.ReadError)
+
+
+def test_open_circuit_maps_to_503_with_retry_after(app_client):
+    class UnavailableService:
+        async def get_suggestions(self, topic: str):
+            raise CircuitOpenError(retry_after=12.2)
+
+    app_client.app.dependency_overrides[get_suggestion_service] = lambda: (
+        UnavailableService()
+    )
+
+    response = app_client.post("/api/suggestions", json={"topic": "Anything"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "13"
+
+
+def test_exhausted_retries_map_to_503_with_upstream_retry_after(app_client):
+    class OverloadedService:
+        async def get_suggestions(self, topic: str):
+            raise UpstreamUnavailable(retry_after=7.5)
+
+    app_client.app.dependency_overrides[get_suggestion_service] = lambda: (
+        OverloadedService()
+    )
+
+    response = app_client.post("/api/suggestions", json={"topic": "Anything"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "8"
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_the_whole_call_including_retries():
+    attempts = 0
+    request = httpx.Request("POST", "http://llm")
+
+    class HangingClient:
+        async def agenerate(
+            self, prompt: str, *, system: str = "", max_tokens: int | None = None
+        ) -> str:
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise httpx.ReadTimeout("timed out", request=request)
+            await asyncio.sleep(10)
+            return "late"
+
+    client = ResilientLLMClient(HangingClient(), backoff_base=0.01, deadline=0.2)
+
+    with pytest.raises(UpstreamUnavailable) as excinfo:
+        await asyncio.wait_for(client.agenerate("prompt"), timeout=2)
+
+    assert attempts == 2
+    assert isinstance(excinfo.value.__cause__, TimeoutError)
+
+
+def test_no_retry_once_the_deadline_leaves_too_little_time():
+    clock = FakeClock()
+    latency = LatencyTracker(min_samples=1)
+    latency.record(5.0)
+    client = ResilientLLMClient(
+        object(), backoff_base=0.1, latency=latency, clock=clock, deadline=30
+    )
+    error = httpx.ConnectError("refused", request=httpx.Request("POST", "http://llm"))
+
+    assert client._retry_delay(0, error, ends_at=30) is not None
+    clock.now = 26
+    assert client._retry_delay(0, error, ends_at=30) is None
+
+
+@pytest.mark.asyncio
+async def test_stream_overload_is_retried_and_counted_by_the_breaker():
+    attempts = 0
+
+    class OverloadedStream:
+        async def astream(
+            self, prompt: str, *, system: str = "", max_tokens: int | None = None
+        ):
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise UpstreamOverloaded("Claude stream failed: Overloaded")
+            yield "ok"
+
+    async def no_sleep(_: float) -> None:
+        pass
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    client = ResilientLLMClient(OverloadedStream(), sleep=no_sleep)
+
+    assert [chunk async for chunk in client.astream("prompt")] == ["ok"]
+    assert attempts == 2
+
+    attempts = 0
+    tripping = ResilientLLMClient(OverloadedStream(), max_retries=0, breaker=breaker)
+    with pytest.raises(UpstreamUnavailable):
+        async for _ in tripping.astream("prompt"):
+            pass
+    assert breaker.state == "open"
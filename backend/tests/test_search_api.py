@@ -0,0 +1,38 @@
+from fastapi.testclient import TestClient
+
+
+def test_search_returns_topics_and_contexts(app_client: TestClient) -> None:
+    app_client.app.state.context_store.save_context(
+        "roadmap", "Quarterly roadmap planning notes"
+    )
+    created = app_client.post(
+        "/api/topics", json={"title": "Roadmap retro", "detail": "What slipped"}
+    )
+    assert created.status_code == 200
+
+    response = app_client.get("/api/search", params={"q": "roadmap"})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["total"] == 2
+    assert payload["limit"] == 20
+    refs = {(r["kind"], r["ref"]) for r in payload["results"]}
+    assert refs == {("topic", str(created.json()["id"])), ("context", "roadmap.md")}
+    assert all("<mark>" in r["title"] + r["snippet"] for r in payload["results"])
+
+
+def test_search_paginates(app_client: TestClient) -> None:
+    for idx in range(3):
+        app_client.post("/api/topics", json={"title": f"Testing topic {idx}"})
+
+    response = app_client.get(
+        "/api/search", params={"q": "testing", "limit": 2, "offset": 2}
+    )
+
+    payload = response.json()
+    assert payload["total"] == 3
+    assert len(payload["results"]) == 1
+
+
+def test_search_requires_query(app_client: TestClient) -> None:
+    assert app_client.get("/api/search").status_code == 422
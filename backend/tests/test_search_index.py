@@ -0,0 +1,143 @@
+import threading
+
+import pytest
+from backend.app.context.store import ContextStore
+from backend.app.core.config import Settings
+from backend.app.core.db import Database
+from backend.app.core.persistence import add_topics
+from backend.app.search.index import (
+    SearchIndex,
+    backfill_topics,
+    match_expression,
+    sync_contexts,
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    search_index = SearchIndex(tmp_path / "search.db")
+    yield search_index
+    search_index.close()
+
+
+def test_search_ranks_highlights_and_paginates(index) -> None:
+    index.index_topic(1, "Testing pipelines", "", ["### Outline A: flaky tests"])
+    index.index_topic(2, "Gardening", "Tomatoes and testing soil", [])
+    index.index_topic(3, "Cooking", "Nothing relevant", [])
+
+    page = index.search("testing", limit=1)
+
+    assert page.total == 2
+    [hit] = page.hits
+    assert (hit.kind, hit.ref) == ("topic", "1")
+    assert hit.title == "<mark>Testing</mark> pipelines"
+    assert hit.score > 0
+
+    second = index.search("testing", limit=1, offset=1)
+    assert [h.ref for h in second.hits] == ["2"]
+    assert "<mark>testing</mark>" in second.hits[0].snippet
+
+
+def test_highlights_escape_indexed_html(index) -> None:
+    index.index_topic(
+        1, '<img src=x onerror="alert(1)"> script', "", ["<script>script</script>"]
+    )
+
+    [hit] = index.search("script").hits
+
+    assert hit.title == (
+        "&lt;img src=x onerror=&quot;alert(1)&quot;&gt; <mark>script</mark>"
+    )
+    assert (
+        hit.snippet
+        == "&lt;<mark>script</mark>&gt;<mark>script</mark>&lt;/<mark>script</mark>&gt;"
+    )
+
+
+def test_reindexing_a_topic_replaces_its_document(index) -> None:
+    index.index_topic(1, "Old title", "", [])
+    index.index_topic(1, "New title", "", [])
+
+    assert index.search("old").total == 0
+    assert index.search("new").total == 1
+    assert index.last_topic_id() == 1
+
+
+def test_match_expression_quotes_terms_so_syntax_is_literal(index) -> None:
+    index.index_topic(1, "AND OR NOT", "", [])
+
+    assert match_expression('foo "bar" OR*') == '"foo" "bar" "OR"'
+    assert index.search("NOT").total == 1
+    assert index.search("   ").total == 0
+
+
+def test_context_store_keeps_index_in_sync(tmp_path, index) -> None:
+    root = tmp_path / "context"
+    store = ContextStore(root=root, search_index=index)
+
+    store.save_context("release-notes", "Shipping the quarterly roadmap")
+    (root / "meeting.txt").write_text("Roadmap review notes", encoding="utf-8")
+    store.refresh()
+
+    hits = index.search("roadmap").hits
+    assert {(h.kind, h.ref) for h in hits} == {
+        ("context", "release-notes.md"),
+        ("context", "meeting.txt"),
+    }
+
+    (root / "meeting.txt").unlink()
+    store.refresh()
+
+    assert [h.ref for h in index.search("roadmap").hits] == ["release-notes.md"]
+
+
+def test_sync_contexts_backfills_only_changed_entries(tmp_path, index) -> None:
+    root = tmp_path / "context"
+    plain_store = ContextStore(root=root)
+    plain_store.save_context("alpha", "first body")
+    plain_store.save_context("beta", "second body")
+
+    sync_contexts(index, plain_store.list_entries())
+    assert index.search("body").total == 2
+
+    versions = index.context_versions()
+    plain_store.save_context("beta", "rewritten text")
+    sync_contexts(index, plain_store.list_entries())
+
+    assert index.context_versions()["alpha.md"] == versions["alpha.md"]
+    assert index.context_versions()["beta.md"] != versions["beta.md"]
+    assert [h.ref for h in index.search("rewritten").hits] == ["beta.md"]
+
+
+@pytest.mark.asyncio
+async def test_backfill_indexes_new_topics_page_by_page_off_the_loop(
+    database_url, index, monkeypatch
+) -> None:
+    # Given five saved topics, of which the first is already indexed
+    settings = Settings(_env_file=None, claude_api_key="sk", database_url=database_url)
+    database = Database(settings)
+    await database.create_schema()
+    async with database.session() as session:
+        topics = await add_topics(
+            session,
+            [(f"Topic {n}", "", [f"### Outline A: angle {n}"]) for n in range(5)],
+        )
+        await session.commit()
+    index.index_topic(topics[0].id, "Topic 0", "", [])
+    pages = []
+    index_topics = index.index_topics
+
+    def record(page):
+        pages.append((len(page), threading.current_thread() is threading.main_thread()))
+        index_topics(page)
+
+    monkeypatch.setattr(index, "index_topics", record)
+
+    # When the rest are backfilled two at a time
+    assert await backfill_topics(database, index, page_size=2) == 4
+
+    # Then each page was written in one call, off the event loop thread
+    assert pages == [(2, False), (2, False)]
+    assert index.search("angle").total == 4
+    assert index.last_topic_id() == topics[-1].id
+    await database.dispose()
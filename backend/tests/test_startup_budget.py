@@ -0,0 +1,102 @@
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from backend.app.core.config import get_settings
+from backend.app.startup import LazyApp, create_lazy_app
+from fastapi.testclient import TestClient
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Roughly 15x what the lazy entry point takes locally: loose enough for slow
+# CI machines, tight enough to fail once FastAPI or SQLAlchemy sneak back in.
+IMPORT_BUDGET_MS = 100
+FIRST_HEALTH_BUDGET_MS = 250
+# The first real request waits for the background load; about 1.4 s locally.
+FIRST_API_BUDGET_MS = 5000
+
+
+def test_lazy_startup_stays_within_budget() -> None:
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.startup",
+            "--modes",
+            "lazy",
+            "--repeat",
+            "3",
+            "--budget-import-ms",
+            str(IMPORT_BUDGET_MS),
+            "--budget-health-ms",
+            str(FIRST_HEALTH_BUDGET_MS),
+            "--budget-api-ms",
+            str(FIRST_API_BUDGET_MS),
+        ],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+    assert completed.returncode == 0, completed.stderr
+    assert set(json.loads(completed.stdout)) == {"lazy"}
+
+
+def test_lazy_entry_point_does_not_import_heavy_stacks() -> None:
+    code = (
+        "import sys, app.startup; "
+        "print([m for m in ('fastapi', 'sqlalchemy', 'sqlmodel', 'httpx', "
+        "'pydantic') if m in sys.modules])"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert completed.stdout.strip() == "[]"
+
+
+def test_lazy_app_loads_full_app_in_the_background(app_client: TestClient):
+    get_settings.cache_clear()
+    lazy = create_lazy_app()
+    with TestClient(lazy) as client:
+        # /health is answered by the stub while the full app is built
+        light_health = client.get("/health")
+        assert light_health.status_code == 200
+
+        response = client.get("/api/topics")
+        assert response.status_code == 200
+        assert lazy.app is not None
+        assert hasattr(lazy.app.state, "database")
+        # and the full app's /health answers the same
+        assert client.get("/health").json() == light_health.json()
+
+
+def test_health_reports_a_failed_load() -> None:
+    attempts = []
+
+    def broken_factory():
+        attempts.append(1)
+        raise RuntimeError("CLAUDE_API_KEY is not set")
+
+    lazy = LazyApp(broken_factory)
+    with TestClient(lazy, raise_server_exceptions=False) as client:
+        # The load starts with the server; wait for it to fail.
+        deadline = time.monotonic() + 5
+        while lazy.error is None and time.monotonic() < deadline:
+            client.portal.call(asyncio.sleep, 0.01)
+
+        health = client.get("/health")
+        assert health.status_code == 503
+        assert health.json()["status"] == "unavailable"
+        # A real request retries the load and fails the same way
+        assert client.get("/api/topics").status_code == 500
+        assert len(attempts) == 2
+        assert client.get("/health").status_code == 503
@@ -0,0 +1,349 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from backend.app.core.config import Settings
+from backend.app.core.db import Database
+from backend.app.core.persistence import save_topic
+from backend.app.models import Suggestion, SuggestionJob, Topic
+from backend.app.models._time import utcnow
+from backend.app.suggestions.jobs import SuggestionJobQueue
+from backend.app.suggestions.limiter import RateLimitExceeded
+from backend.app.suggestions.service import SuggestionResult
+from sqlmodel import select
+
+OUTLINES = [
+    "### Outline A: Angle 1",
+    "### Outline B: Angle 2",
+    "### Outline C: Angle 3",
+]
+
+
+class FakeSuggestionService:
+    async def get_suggestions(self, topic: str) -> SuggestionResult:
+        if "broken" in topic:
+            raise ValueError("Expected exactly 3 suggestions, found 0")
+        return SuggestionResult(suggestions=list(OUTLINES))
+
+
+async def _database(database_url) -> Database:
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url=database_url,
+    )
+    database = Database(settings)
+    await database.create_schema()
+    return database
+
+
+@pytest.mark.asyncio
+async def test_queue_runs_jobs_and_records_results(database_url) -> None:
+    database = await _database(database_url)
+    queue = SuggestionJobQueue(database, FakeSuggestionService(), workers=2)
+    await queue.start()
+
+    ok = await queue.submit("Good topic")
+    failed = await queue.submit("A broken topic")
+    await asyncio.wait_for(queue.join(), timeout=5)
+    await queue.stop()
+
+    async with database.session() as session:
+        ok = await session.get(SuggestionJob, ok.id)
+        failed = await session.get(SuggestionJob, failed.id)
+        assert ok.status == "done"
+        assert failed.status == "failed"
+        assert "Expected exactly 3" in failed.error
+        contents = (
+            await session.exec(
+                select(Suggestion.content)
+                .where(Suggestion.topic_id == ok.topic_id)
+                .order_by(Suggestion.position)
+            )
+        ).all()
+        assert list(contents) == OUTLINES
+    await database.dispose()
+
+
+@pytest.mark.asyncio
+async def test_start_resumes_unfinished_jobs(database_url) -> None:
+    database = await _database(database_url)
+    async with database.session() as session:
+        session.add(SuggestionJob(topic="Left queued"))
+        session.add(SuggestionJob(topic="Left running", status="running"))
+        session.add(SuggestionJob(topic="Finished", status="failed"))
+        await session.commit()
+
+    queue = SuggestionJobQueue(database, FakeSuggestionService())
+    assert await queue.start() == 2
+    await asyncio.wait_for(queue.join(), timeout=5)
+    await queue.stop()
+
+    async with database.session() as session:
+        jobs = (
+            await session.exec(select(SuggestionJob).order_by(SuggestionJob.id))
+        ).all()
+        assert [job.status for job in jobs] == ["done", "done", "failed"]
+    await database.dispose()
+
+
+def test_job_api_returns_id_then_reports_results(app_client) -> None:
+    app_client.app.state.job_queue.service = FakeSuggestionService()
+
+    response = app_client.post("/api/suggestion-jobs", json={"topic": "Async topic"})
+
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+
+    deadline = time.monotonic() + 5
+    while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.01)
+        job = app_client.get(f"/api/suggestion-jobs/{job['id']}").json()
+
+    assert job["status"] == "done"
+    assert job["suggestions"] == OUTLINES
+    assert job["topic_id"] is not None
+
+
+def test_job_api_returns_404_for_unknown_job(app_client) -> None:
+    response = app_client.get("/api/suggestion-jobs/999")
+
+    assert response.status_code == 404
+
+
+class FailingIndex:
+    def index_topic(self, *args) -> None:
+        raise RuntimeError("search index is read-only")
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_errors_after_generation(database_url) -> None:
+    # Given a single worker whose search index rejects every write
+    database = await _database(database_url)
+    queue = SuggestionJobQueue(
+        database, FakeSuggestionService(), workers=1, search_index=FailingIndex()
+    )
+    await queue.start()
+
+    # When two jobs run one after the other
+    first = await queue.submit("First topic")
+    second = await queue.submit("Second topic")
+    await asyncio.wait_for(queue.join(), timeout=5)
+    await queue.stop()
+
+    # Then both are processed and reported as failed
+    async with database.session() as session:
+        for job in (first, second):
+            job = await session.get(SuggestionJob, job.id)
+            assert job.status == "failed"
+            assert "read-only" in job.error
+    await database.dispose()
+
+
+class CountingSuggestionService(FakeSuggestionService):
+    def __init__(self) -> None:
+        self.topics: list[str] = []
+
+    async def get_suggestions(self, topic: str) -> SuggestionResult:
+        self.topics.append(topic)
+        await asyncio.sleep(0.01)
+        return await super().get_suggestions(topic)
+
+
+@pytest.mark.asyncio
+async def test_queues_sharing_a_database_run_each_job_once(database_url) -> None:
+    # Given queued jobs that two processes both pick up on startup
+    database = await _database(database_url)
+    async with database.session() as session:
+        session.add_all(SuggestionJob(topic=f"Topic {n}") for n in range(6))
+        await session.commit()
+    service = CountingSuggestionService()
+    queues = [SuggestionJobQueue(database, service, workers=2) for _ in range(2)]
+
+    # When both run their queues
+    assert [await queue.start() for queue in queues] == [6, 6]
+    await asyncio.wait_for(asyncio.gather(*(q.join() for q in queues)), timeout=5)
+    for queue in queues:
+        await queue.stop()
+
+    # Then every job was generated exactly once
+    assert sorted(service.topics) == [f"Topic {n}" for n in range(6)]
+    async with database.session() as session:
+        topics = (await session.exec(select(Topic))).all()
+        assert len(topics) == 6
+    await database.dispose()
+
+
+@pytest.mark.asyncio
+async def test_running_jobs_are_taken_over_only_after_their_lease(
+    database_url,
+) -> None:
+    database = await _database(database_url)
+    now = utcnow()
+    async with database.session() as session:
+        session.add(
+            SuggestionJob(
+                topic="Live lease",
+                status="running",
+                owner="other",
+                lease_until=now + timedelta(minutes=5),
+            )
+        )
+        session.add(
+            SuggestionJob(
+                topic="Expired lease",
+                status="running",
+                owner="crashed",
+                lease_until=now - timedelta(minutes=5),
+            )
+        )
+        await session.commit()
+
+    queue = SuggestionJobQueue(database, FakeSuggestionService())
+    assert await queue.start() == 1
+    await asyncio.wait_for(queue.join(), timeout=5)
+    await queue.stop()
+
+    async with database.session() as session:
+        jobs = (
+            await session.exec(select(SuggestionJob).order_by(SuggestionJob.id))
+        ).all()
+        assert [(job.status, job.owner) for job in jobs] == [
+            ("running", "other"),
+            ("done", queue.owner),
+        ]
+    await database.dispose()
+
+
+class BlockingSuggestionService(FakeSuggestionService):
+    def __init__(self) -> None:
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def get_suggestions(self, topic: str) -> SuggestionResult:
+        self.started.set()
+        await self.release.wait()
+        return await super().get_suggestions(topic)
+
+
+@pytest.mark.asyncio
+async def test_running_job_does_not_block_other_writes(database_url) -> None:
+    # Given a job whose model call is still in flight
+    database = await _database(database_url)
+    service = BlockingSuggestionService()
+    queue = SuggestionJobQueue(database, service, workers=1)
+    await queue.start()
+    job = await queue.submit("Slow topic")
+    await asyncio.wait_for(service.started.wait(), timeout=5)
+
+    # When something else writes meanwhile
+    async with database.session() as session:
+        topic = await asyncio.wait_for(save_topic(session, "Other topic"), timeout=1)
+
+    # Then it commits without waiting for the job, which still completes
+    assert topic.id is not None
+    service.release.set()
+    await asyncio.wait_for(queue.join(), timeout=5)
+    await queue.stop()
+    async with database.session() as session:
+        assert (await session.get(SuggestionJob, job.id)).status == "done"
+    await database.dispose()
+
+
+async def _wait_for_status(
+    database: Database, job_id: int, status: str
+) -> SuggestionJob:
+    deadline = time.monotonic() + 5
+    while True:
+        async with database.read_session() as session:
+            job = await session.get(SuggestionJob, job_id)
+        if job.status == status or time.monotonic() > deadline:
+            return job
+        await asyncio.sleep(0.02)
+
+
+@pytest.mark.asyncio
+async def test_sweep_takes_over_jobs_whose_lease_expires_while_running(
+    database_url,
+) -> None:
+    # Given a running queue and a job held by a worker that then dies
+    database = await _database(database_url)
+    queue = SuggestionJobQueue(database, FakeSuggestionService(), sweep_seconds=0.05)
+    assert await queue.start() == 0
+    async with database.session() as session:
+        job = SuggestionJob(
+            topic="Orphaned",
+            status="running",
+            owner="crashed",
+            lease_until=utcnow() + timedelta(seconds=0.2),
+        )
+        session.add(job)
+        await session.commit()
+
+    # When its lease runs out, without any restart
+    job = await _wait_for_status(database, job.id, "done")
+    await queue.stop()
+
+    # Then the sweep picked it up and ran it
+    assert (job.status, job.owner) == ("done", queue.owner)
+    await database.dispose()
+
+
+@pytest.mark.asyncio
+async def test_worker_that_lost_its_lease_does_not_overwrite_the_result(
+    database_url,
+) -> None:
+    # Given a job whose model call outlives its lease
+    database = await _database(database_url)
+    service = BlockingSuggestionService()
+    queue = SuggestionJobQueue(database, service, workers=1)
+    await queue.start()
+    job = await queue.submit("Slow topic")
+    await asyncio.wait_for(service.started.wait(), timeout=5)
+
+    # When another queue takes it over before the call returns
+    async with database.session() as session:
+        taken = await session.get(SuggestionJob, job.id)
+        taken.owner = "other"
+        session.add(taken)
+        await session.commit()
+    service.release.set()
+    await asyncio.wait_for(queue.join(), timeout=5)
+    await queue.stop()
+
+    # Then the late result is dropped, topic and all
+    async with database.session() as session:
+        job = await session.get(SuggestionJob, job.id)
+        assert (job.status, job.owner) == ("running", "other")
+        assert (await session.exec(select(Topic))).all() == []
+    await database.dispose()
+
+
+class BusyOnceSuggestionService(FakeSuggestionService):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def get_suggestions(self, topic: str) -> SuggestionResult:
+        self.calls += 1
+        if self.calls == 1:
+            raise RateLimitExceeded(retry_after=0.05)
+        return await super().get_suggestions(topic)
+
+
+@pytest.mark.asyncio
+async def test_backpressure_requeues_the_job_after_retry_after(database_url) -> None:
+    database = await _database(database_url)
+    service = BusyOnceSuggestionService()
+    queue = SuggestionJobQueue(database, service, workers=1)
+    await queue.start()
+
+    job = await queue.submit("Burst topic")
+    job = await _wait_for_status(database, job.id, "done")
+    await queue.stop()
+
+    assert job.status == "done"
+    assert job.error is None
+    assert service.calls == 2
+    await database.dispose()
@@ -7,12 +7,11 @@ from sqlmodel import SQLModel, select
 
 
 @pytest.mark.asyncio
-async def test_suggestion_persists_with_topic_fk(tmp_path) -> None:
-    db_path = tmp_path / "test.db"
+async def test_suggestion_persists_with_topic_fk(database_url) -> None:
     settings = Settings(
         _env_file=None,
         claude_api_key="sk-test",
-        database_url=f"sqlite+aiosqlite:///{db_path}",
+        database_url=database_url,
     )
     engine = get_engine(settings)
 
@@ -1,5 +1,5 @@
 import pytest
-from backend.app.suggestions.service import parse_suggestions
+from backend.app.suggestions.service import OutlineStreamParser, parse_suggestions
 
 
 def test_parse_suggestions_extracts_exactly_three_outlines():
@@ -42,3 +42,38 @@ def test_parse_suggestions_raises_error_if_not_exactly_three():
     # When / Then
     with pytest.raises(ValueError, match="Expected exactly 3 suggestions"):
         parse_suggestions(llm_response)
+
+
+def test_outline_stream_parser_emits_each_block_once_complete():
+    # Given a response fed one character at a time
+    llm_response = (
+        "Intro.\n### Outline A: First\nBody A\n"
+        "### Outline B: Second\nBody B\n"
+        "### Outline C: Third\nBody C\n"
+    )
+    parser = OutlineStreamParser()
+    emitted_at = []
+
+    # When
+    for idx, char in enumerate(llm_response):
+        for outline in parser.feed(char):
+            emitted_at.append((idx, outline))
+    final = parser.finish()
+
+    # Then A is emitted as soon as B's marker is complete, and so on
+    assert [outline for _, outline in emitted_at] == [
+        "### Outline A: First\nBody A",
+        "### Outline B: Second\nBody B",
+    ]
+    marker_b_end = llm_response.index("### Outline B:") + len("### Outline B:") - 1
+    assert emitted_at[0][0] == marker_b_end
+    assert final == ["### Outline C: Third\nBody C"]
+    assert parser.suggestions == parse_suggestions(llm_response)
+
+
+def test_outline_stream_parser_finish_raises_if_not_exactly_three():
+    parser = OutlineStreamParser()
+    parser.feed("### Outline A: One\n\n### Outline B: Two")
+
+    with pytest.raises(ValueError, match="Expected exactly 3 suggestions, found 2"):
+        parser.finish()
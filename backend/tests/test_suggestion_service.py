@@ -1,15 +1,23 @@
-from unittest.mock import MagicMock
+import asyncio
+from unittest.mock import AsyncMock
 
-from backend.app.prompts.repository import render_prompt
+import pytest
+from backend.app.prompts.repository import PromptTemplate
 from backend.app.suggestions.service import FakeLLMClient, SuggestionService
 
+VALID_RESPONSE = "### Outline A: 1\n### Outline B: 2\n### Outline C: 3"
+
 
 class MockPromptRepo:
     def get_prompt(self, name: str) -> str:
         return f"Template for {name}"
 
+    def get_template(self, name: str) -> PromptTemplate:
+        return PromptTemplate.from_text(name, self.get_prompt(name))
+
 
-def test_suggestion_service_calls_llm_with_rendered_prompt():
+@pytest.mark.asyncio
+async def test_suggestion_service_calls_llm_with_rendered_prompt():
     # Given
     prompt_repo = MockPromptRepo()
     llm_client = FakeLLMClient()
@@ -18,18 +26,126 @@ def test_suggestion_service_calls_llm_with_rendered_prompt():
     mock_response = "### Outline A: 1\n### Outline B: 2\n### Outline C: 3"
 
     # We use a side effect to capture the prompt AND return the mock response
-    def mock_generate(prompt):
+    async def mock_generate(prompt, *, system="", max_tokens=None):
         llm_client.last_prompt = prompt
+        llm_client.last_system = system
         return mock_response
 
-    llm_client.generate = MagicMock(side_effect=mock_generate)
+    llm_client.agenerate = AsyncMock(side_effect=mock_generate)
 
     service = SuggestionService(prompt_repo=prompt_repo, llm_client=llm_client)
     topic = "Scaling Quality Engineering"
 
     # When
-    service.get_suggestions(topic)
+    await service.get_suggestions(topic)
 
     # Then
-    expected_prompt = render_prompt("Template for topics_first", topic)
-    assert llm_client.last_prompt == expected_prompt
+    # The template goes in the cacheable system part, the topic in the user part.
+    assert llm_client.last_system == "Template for topics_first"
+    assert llm_client.last_prompt == f"Topic:\n{topic}\n"
+
+
+class GatedLLMClient:
+    """Blocks every call until ``release`` is set so calls overlap."""
+
+    def __init__(self, response: str = VALID_RESPONSE, error: Exception | None = None):
+        self.response = response
+        self.error = error
+        self.release = asyncio.Event()
+        self.prompts: list[str] = []
+
+    async def agenerate(
+        self, prompt: str, *, system: str = "", max_tokens: int | None = None
+    ) -> str:
+        self.prompts.append(prompt)
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+async def _run_concurrently(service, topics, llm_client):
+    tasks = [asyncio.create_task(service.get_suggestions(t)) for t in topics]
+    await asyncio.sleep(0)
+    llm_client.release.set()
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_topics_share_one_llm_call():
+    llm_client = GatedLLMClient()
+    service = SuggestionService(prompt_repo=MockPromptRepo(), llm_client=llm_client)
+
+    results = await _run_concurrently(
+        service, ["Scaling QE", "  scaling   qe ", "SCALING QE"], llm_client
+    )
+
+    assert len(llm_client.prompts) == 1
+    assert results[0] == results[1] == results[2]
+    assert len(results[0].suggestions) == 3
+    assert service._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_failure_propagates_to_every_caller():
+    llm_client = GatedLLMClient(error=RuntimeError("upstream down"))
+    service = SuggestionService(prompt_repo=MockPromptRepo(), llm_client=llm_client)
+
+    results = await _run_concurrently(service, ["Topic", "topic"], llm_client)
+
+    assert len(llm_client.prompts) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert service._inflight == {}
+
+    # Nothing is retained: the next call tries again.
+    llm_client.error = None
+    assert len((await service.get_suggestions("Topic")).suggestions) == 3
+    assert len(llm_client.prompts) == 2
+
+
+@pytest.mark.asyncio
+async def test_different_topics_are_not_coalesced():
+    llm_client = GatedLLMClient()
+    service = SuggestionService(prompt_repo=MockPromptRepo(), llm_client=llm_client)
+
+    await _run_concurrently(service, ["Topic one", "Topic two"], llm_client)
+
+    assert len(llm_client.prompts) == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_topics_concurrently_up_to_the_cap():
+    active = 0
+    peak = 0
+
+    class CountingLLMClient:
+        async def agenerate(
+            self, prompt: str, *, system: str = "", max_tokens: int | None = None
+        ) -> str:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return VALID_RESPONSE
+
+    service = SuggestionService(MockPromptRepo(), CountingLLMClient())
+
+    results = await service.get_suggestions_batch(
+        [f"Topic {i}" for i in range(8)], concurrency=3
+    )
+
+    assert peak == 3
+    assert all(len(r.suggestions) == 3 for r in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_returns_errors_in_place():
+    llm_client = FakeLLMClient()
+    llm_client.agenerate = AsyncMock(side_effect=[VALID_RESPONSE, "garbage"])
+    service = SuggestionService(MockPromptRepo(), llm_client)
+
+    results = await service.get_suggestions_batch(["One", "Two"], concurrency=1)
+
+    assert len(results[0].suggestions) == 3
+    assert isinstance(results[1], ValueError)
@@ -1,17 +1,25 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 from backend.app.api.dependencies import get_suggestion_service
+from backend.app.suggestions.grounding import ContextChunk
+from backend.app.suggestions.service import SuggestionResult
 from fastapi.testclient import TestClient
 
 
 def test_create_suggestions_returns_200_and_list_of_suggestions(app_client: TestClient):
     # Given a mocked suggestion service
     mock_service = MagicMock()
-    mock_service.get_suggestions.return_value = [
-        "### Outline A: Angle 1",
-        "### Outline B: Angle 2",
-        "### Outline C: Angle 3",
-    ]
+    mock_service.get_suggestions = AsyncMock()
+    mock_service.get_suggestions.return_value = SuggestionResult(
+        suggestions=[
+            "### Outline A: Angle 1",
+            "### Outline B: Angle 2",
+            "### Outline C: Angle 3",
+        ],
+        context=[
+            ContextChunk(slug="tdd-notes", text="Red, green", tokens=3, score=1.5)
+        ],
+    )
     app_client.app.dependency_overrides[get_suggestion_service] = lambda: mock_service
 
     # When
@@ -25,6 +33,7 @@ def test_create_suggestions_returns_200_and_list_of_suggestions(app_client: Test
     assert "suggestions" in payload
     assert len(payload["suggestions"]) == 3
     assert payload["suggestions"][0] == "### Outline A: Angle 1"
+    assert payload["context"] == [{"slug": "tdd-notes", "tokens": 3, "score": 1.5}]
 
     # Cleanup
     app_client.app.dependency_overrides.clear()
@@ -0,0 +1,106 @@
+import pytest
+from backend.app.api.dependencies import (
+    get_session_dep,
+    get_settings,
+    get_suggestion_service,
+)
+from backend.app.core.config import Settings
+from backend.app.core.db import get_engine, get_session
+from backend.app.main import create_app
+from backend.app.models import Suggestion, Topic
+from backend.app.prompts.repository import PromptTemplate
+from backend.app.suggestions.service import SuggestionService
+from httpx import ASGITransport, AsyncClient
+from sqlmodel import SQLModel, select
+
+VALID_RESPONSE = "### Outline A: 1\n### Outline B: 2\n### Outline C: 3"
+
+
+class MockPromptRepo:
+    def get_prompt(self, name: str) -> str:
+        return f"Template for {name}"
+
+    def get_template(self, name: str) -> PromptTemplate:
+        return PromptTemplate.from_text(name, self.get_prompt(name))
+
+
+class TopicAwareLLMClient:
+    """Returns a malformed response for any prompt mentioning "broken"."""
+
+    async def agenerate(
+        self, prompt: str, *, system: str = "", max_tokens: int | None = None
+    ) -> str:
+        return "no outlines here" if "broken" in prompt else VALID_RESPONSE
+
+
+async def _post_batch(database_url, topics, **settings_overrides):
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url=database_url,
+        **settings_overrides,
+    )
+    engine = get_engine(settings)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    service = SuggestionService(MockPromptRepo(), TopicAwareLLMClient())
+    app = create_app()
+    app.dependency_overrides[get_settings] = lambda: settings
+    app.dependency_overrides[get_suggestion_service] = lambda: service
+
+    async def override_session_dep():
+        async with get_session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session_dep] = override_session_dep
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/api/suggestions/batch", json={"topics": topics})
+    return response, engine
+
+
+@pytest.mark.asyncio
+async def test_batch_persists_successes_and_reports_per_topic_errors(database_url):
+    response, engine = await _post_batch(
+        database_url, ["First topic", "A broken topic", "Second topic"]
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["topic"] for r in results] == [
+        "First topic",
+        "A broken topic",
+        "Second topic",
+    ]
+    assert results[0]["error"] is None
+    assert len(results[0]["suggestions"]) == 3
+    assert "Expected exactly 3 suggestions" in results[1]["error"]
+    assert results[1]["topic_id"] is None
+
+    async with get_session(engine) as session:
+        topics = (await session.exec(select(Topic).order_by(Topic.id))).all()
+        assert [t.title for t in topics] == ["First topic", "Second topic"]
+        assert [t.id for t in topics] == [
+            results[0]["topic_id"],
+            results[2]["topic_id"],
+        ]
+        suggestions = (await session.exec(select(Suggestion))).all()
+        assert len(suggestions) == 6
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_more_topics_than_allowed(database_url):
+    response, _ = await _post_batch(
+        database_url, ["a", "b", "c"], suggestion_batch_max_topics=2
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_blank_topics(database_url):
+    response, _ = await _post_batch(database_url, ["ok", "  "])
+
+    assert response.status_code == 422
@@ -8,26 +8,28 @@ from backend.app.core.config import Settings
 from backend.app.core.db import get_engine, get_session
 from backend.app.main import create_app
 from backend.app.models import Suggestion, Topic
+from backend.app.suggestions.service import SuggestionResult
 from httpx import ASGITransport, AsyncClient
 from sqlmodel import SQLModel, select
 
 
 class FakeSuggestionService:
-    def get_suggestions(self, topic: str):
-        return [
-            "### Outline A: Angle 1",
-            "### Outline B: Angle 2",
-            "### Outline C: Angle 3",
-        ]
+    async def get_suggestions(self, topic: str):
+        return SuggestionResult(
+            suggestions=[
+                "### Outline A: Angle 1",
+                "### Outline B: Angle 2",
+                "### Outline C: Angle 3",
+            ]
+        )
 
 
 @pytest.mark.asyncio
-async def test_post_suggestions_persists_topic_and_suggestions(tmp_path) -> None:
-    db_path = tmp_path / "test.db"
+async def test_post_suggestions_persists_topic_and_suggestions(database_url) -> None:
     settings = Settings(
         _env_file=None,
         claude_api_key="sk-test",
-        database_url=f"sqlite+aiosqlite:///{db_path}",
+        database_url=database_url,
     )
     engine = get_engine(settings)
 
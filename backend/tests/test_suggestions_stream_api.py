@@ -0,0 +1,157 @@
+import json
+
+import httpx
+import pytest
+from backend.app.api.dependencies import (
+    get_session_dep,
+    get_settings,
+    get_suggestion_service,
+)
+from backend.app.core.config import Settings
+from backend.app.core.db import get_engine, get_session
+from backend.app.main import create_app
+from backend.app.models import Suggestion, Topic
+from backend.app.prompts.repository import PromptTemplate
+from backend.app.suggestions.service import SuggestionService
+from httpx import ASGITransport, AsyncClient
+from sqlmodel import SQLModel, select
+
+OUTLINES = (
+    "### Outline A: Angle 1\nBody A\n",
+    "### Outline B: Angle 2\nBody B\n",
+    "### Outline C: Angle 3\nBody C\n",
+)
+
+
+class MockPromptRepo:
+    def get_prompt(self, name: str) -> str:
+        return f"Template for {name}"
+
+    def get_template(self, name: str) -> PromptTemplate:
+        return PromptTemplate.from_text(name, self.get_prompt(name))
+
+
+class ChunkedLLMClient:
+    def __init__(self, text: str, chunk_size: int = 7):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.last_prompt = None
+        self.last_system = None
+
+    async def agenerate(
+        self, prompt: str, *, system: str = "", max_tokens: int | None = None
+    ) -> str:
+        self.last_prompt = prompt
+        self.last_system = system
+        return self.text
+
+    async def astream(
+        self, prompt: str, *, system: str = "", max_tokens: int | None = None
+    ):
+        self.last_prompt = prompt
+        self.last_system = system
+        for i in range(0, len(self.text), self.chunk_size):
+            yield self.text[i : i + self.chunk_size]
+
+
+def _parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def _post_stream(database_url, llm_client) -> tuple[list, object]:
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url=database_url,
+    )
+    engine = get_engine(settings)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    service = SuggestionService(MockPromptRepo(), llm_client)
+    app = create_app()
+    app.dependency_overrides[get_settings] = lambda: settings
+    app.dependency_overrides[get_suggestion_service] = lambda: service
+
+    async def override_session_dep():
+        async with get_session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session_dep] = override_session_dep
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/suggestions/stream", json={"topic": "Streamed Topic"}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return _parse_events(response.text), engine
+
+
+@pytest.mark.asyncio
+async def test_stream_suggestions_emits_outlines_then_persists(database_url) -> None:
+    llm_client = ChunkedLLMClient("Intro\n" + "".join(OUTLINES))
+
+    events, engine = await _post_stream(database_url, llm_client)
+
+    assert llm_client.last_system == "Template for topics_first"
+    assert llm_client.last_prompt == "Topic:\nStreamed Topic\n"
+    assert [name for name, _ in events] == ["outline", "outline", "outline", "done"]
+    assert [data["index"] for _, data in events[:3]] == [0, 1, 2]
+    expected = [outline.strip() for outline in OUTLINES]
+    assert [data["content"] for _, data in events[:3]] == expected
+    done = events[-1][1]
+    assert done["suggestions"] == expected
+
+    async with get_session(engine) as verify_session:
+        saved_topic = (await verify_session.exec(select(Topic))).one()
+        assert saved_topic.id == done["topic_id"]
+        assert saved_topic.title == "Streamed Topic"
+        saved = (
+            await verify_session.exec(
+                select(Suggestion)
+                .where(Suggestion.topic_id == saved_topic.id)
+                .order_by(Suggestion.position)
+            )
+        ).all()
+        assert [s.content for s in saved] == expected
+
+
+@pytest.mark.asyncio
+async def test_stream_suggestions_reports_parse_error_without_persisting(
+    database_url,
+) -> None:
+    llm_client = ChunkedLLMClient("".join(OUTLINES[:2]))
+
+    events, engine = await _post_stream(database_url, llm_client)
+
+    assert [name for name, _ in events] == ["outline", "error"]
+    assert "Expected exactly 3 suggestions" in events[-1][1]["detail"]
+
+    async with get_session(engine) as verify_session:
+        assert (await verify_session.exec(select(Topic))).all() == []
+
+
+class UnreachableLLMClient:
+    async def astream(
+        self, prompt: str, *, system: str = "", max_tokens: int | None = None
+    ):
+        raise httpx.ConnectError("All connection attempts failed")
+        yield ""
+
+
+@pytest.mark.asyncio
+async def test_stream_suggestions_reports_upstream_failure_as_error_event(
+    database_url,
+) -> None:
+    events, engine = await _post_stream(database_url, UnreachableLLMClient())
+
+    assert events == [("error", {"detail": "Suggestion generation failed"})]
+    async with get_session(engine) as verify_session:
+        assert (await verify_session.exec(select(Topic))).all() == []
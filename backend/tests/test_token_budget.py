@@ -0,0 +1,207 @@
+import pytest
+from backend.app.api.dependencies import get_settings
+from backend.app.main import create_app
+from backend.app.prompts.repository import PromptTemplate
+from backend.app.suggestions.budget import (
+    BudgetedLLMClient,
+    BudgetExceeded,
+    TokenBudget,
+)
+from backend.app.suggestions.service import SuggestionService
+from backend.app.suggestions.tokens import TokenUsage, record_usage
+from fastapi.testclient import TestClient
+
+VALID_RESPONSE = "### Outline A: 1\n### Outline B: 2\n### Outline C: 3"
+DAY = 86_400
+
+
+class Clock:
+    def __init__(self, now: float = 10 * DAY + 3600) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_each_prompt_gets_its_own_output_budget():
+    budget = TokenBudget(max_output_tokens=4096, output_tokens_by_prompt={"a": 500})
+
+    assert budget.output_tokens("a") == 500
+    assert budget.output_tokens("b") == 4096
+    assert budget.reserve(100).max_tokens == 4096
+
+
+def test_per_call_budget_rejects_or_downgrades():
+    strict = TokenBudget(max_output_tokens=1000, per_call=800)
+    with pytest.raises(BudgetExceeded) as excinfo:
+        strict.reserve(300)
+    assert excinfo.value.retry_after is None
+
+    lenient = TokenBudget(
+        max_output_tokens=1000, per_call=800, mode="downgrade", min_output_tokens=200
+    )
+    assert lenient.reserve(300).max_tokens == 500
+    # Less than min_output_tokens left is rejected even when downgrading.
+    with pytest.raises(BudgetExceeded):
+        lenient.reserve(700)
+
+
+def test_daily_budget_settles_actual_usage_and_resets_at_midnight():
+    clock = Clock()
+    budget = TokenBudget(max_output_tokens=1000, per_day=3000, clock=clock)
+
+    # Given a reservation that turns out to use far less than reserved
+    with budget.spend(500) as grant:
+        assert budget.spent_today() == 1500
+        record_usage({"input_tokens": 480, "output_tokens": 120})
+    assert grant.usage == TokenUsage(480, 120)
+    assert budget.spent_today() == 600
+
+    # When the rest of the day's budget is used up
+    budget.seed(1500)
+    with pytest.raises(BudgetExceeded) as excinfo:
+        budget.reserve(500)
+
+    # Then the caller is told to come back tomorrow, when spend starts over
+    assert excinfo.value.retry_after == DAY - 3600
+    clock.now += excinfo.value.retry_after
+    assert budget.spent_today() == 0
+    assert budget.reserve(500).max_tokens == 1000
+
+
+class MockPromptRepo:
+    def get_template(self, name: str) -> PromptTemplate:
+        return PromptTemplate.from_text(name, f"Template for {name}")
+
+
+class MeteredStreamClient:
+    def __init__(self) -> None:
+        self.max_tokens = None
+
+    async def astream(self, prompt, *, system="", max_tokens=None):
+        self.max_tokens = max_tokens
+        record_usage({"input_tokens": 30, "output_tokens": 1})
+        for line in VALID_RESPONSE.splitlines(keepends=True):
+            yield line
+        record_usage({"output_tokens": 19})
+
+
+@pytest.mark.asyncio
+async def test_streamed_usage_is_metered_and_settled():
+    client = MeteredStreamClient()
+    budget = TokenBudget(output_tokens_by_prompt={"topics_first": 700})
+    service = SuggestionService(
+        MockPromptRepo(), BudgetedLLMClient(client, budget), budget=budget
+    )
+    usage = TokenUsage()
+
+    outlines = [o async for o in service.stream_suggestions("Topic", [], usage)]
+
+    assert len(outlines) == 3
+    assert client.max_tokens == 700
+    assert usage == TokenUsage(30, 20)
+    assert budget.spent_today() == 50
+
+
+@pytest.fixture
+def budgeted_client(app_client: TestClient, monkeypatch, fake_llm_server):
+    monkeypatch.setenv("CLAUDE_MESSAGES_URL", fake_llm_server.url)
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    monkeypatch.setenv("LLM_OUTPUT_TOKENS_BY_PROMPT", '{"topics_first": 900}')
+    monkeypatch.setenv("LLM_MAX_TOKENS_PER_DAY", "2500")
+    get_settings.cache_clear()
+    with TestClient(create_app()) as client:
+        yield client
+
+
+def test_usage_is_saved_per_topic_and_daily_budget_is_enforced(
+    budgeted_client, fake_llm_server
+):
+    fake_llm_server.respond(
+        body={
+            "content": [{"type": "text", "text": VALID_RESPONSE}],
+            "usage": {
+                "input_tokens": 40,
+                "cache_read_input_tokens": 1000,
+                "output_tokens": 60,
+            },
+        }
+    )
+
+    # When a suggestion is generated
+    response = budgeted_client.post("/api/suggestions", json={"topic": "Budgets"})
+
+    # Then the output budget for the prompt is sent as max_tokens
+    assert response.status_code == 200
+    assert fake_llm_server.requests[0]["max_tokens"] == 900
+    # And the billed tokens are saved on the topic and reported per day
+    (topic,) = budgeted_client.get("/api/topics").json()["items"]
+    detail = budgeted_client.get(f"/api/topics/{topic['id']}").json()
+    assert (detail["input_tokens"], detail["output_tokens"]) == (1040, 60)
+    usage = budgeted_client.get("/api/usage").json()
+    assert (usage["topics"], usage["input_tokens"], usage["output_tokens"]) == (
+        1,
+        1040,
+        60,
+    )
+    assert len(usage["days"]) == 1
+    assert usage["budget"]["spent_today"] == 1100
+    assert usage["budget"]["remaining_today"] == 1400
+
+    # And a call that no longer fits today's budget is rejected without
+    # reaching the upstream
+    response = budgeted_client.post("/api/suggestions", json={"topic": "More"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert len(fake_llm_server.requests) == 1
+
+
+def test_daily_spend_survives_a_restart(budgeted_client, fake_llm_server):
+    fake_llm_server.respond(
+        body={
+            "content": [{"type": "text", "text": VALID_RESPONSE}],
+            "usage": {"input_tokens": 700, "output_tokens": 300},
+        }
+    )
+    assert (
+        budgeted_client.post("/api/suggestions", json={"topic": "Before"}).status_code
+        == 200
+    )
+
+    with TestClient(create_app()) as restarted:
+        usage = restarted.get("/api/usage").json()
+
+    assert usage["budget"]["spent_today"] == 1000
+
+
+def test_cached_answers_are_served_once_the_budget_is_spent(
+    app_client: TestClient, monkeypatch, fake_llm_server
+):
+    monkeypatch.setenv("CLAUDE_MESSAGES_URL", fake_llm_server.url)
+    monkeypatch.setenv("LLM_OUTPUT_TOKENS_BY_PROMPT", '{"topics_first": 900}')
+    monkeypatch.setenv("LLM_MAX_TOKENS_PER_DAY", "2500")
+    monkeypatch.setenv("LLM_BUDGET_MODE", "downgrade")
+    get_settings.cache_clear()
+    fake_llm_server.respond(
+        body={
+            "content": [{"type": "text", "text": VALID_RESPONSE}],
+            "usage": {"input_tokens": 1500, "output_tokens": 500},
+        }
+    )
+
+    with TestClient(create_app()) as client:
+        # Given a cached answer that used up most of today's budget
+        first = client.post("/api/suggestions", json={"topic": "Cached"})
+        assert first.status_code == 200
+
+        # When the same topic is asked for again
+        again = client.post("/api/suggestions", json={"topic": "Cached"})
+
+        # Then it is served from the cache, neither rejected nor downgraded
+        assert again.status_code == 200
+        assert again.json()["suggestions"] == first.json()["suggestions"]
+        assert len(fake_llm_server.requests) == 1
+        # And only a new prompt is held to the budget
+        other = client.post("/api/suggestions", json={"topic": "Uncached"})
+        assert other.status_code == 429
+        assert client.get("/api/usage").json()["budget"]["spent_today"] == 2000
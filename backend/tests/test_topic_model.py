@@ -6,12 +6,11 @@ from sqlmodel import SQLModel, select
 
 
 @pytest.mark.asyncio
-async def test_topic_round_trip(tmp_path) -> None:
-    db_path = tmp_path / "test.db"
+async def test_topic_round_trip(database_url) -> None:
     settings = Settings(
         _env_file=None,
         claude_api_key="sk-test",
-        database_url=f"sqlite+aiosqlite:///{db_path}",
+        database_url=database_url,
     )
     engine = get_engine(settings)
 
@@ -9,12 +9,11 @@ from sqlmodel import SQLModel, select
 
 
 @pytest.mark.asyncio
-async def test_post_topic_persists_and_returns_topic(tmp_path) -> None:
-    db_path = tmp_path / "test.db"
+async def test_post_topic_persists_and_returns_topic(database_url) -> None:
     settings = Settings(
         _env_file=None,
         claude_api_key="sk-test",
-        database_url=f"sqlite+aiosqlite:///{db_path}",
+        database_url=database_url,
     )
     engine = get_engine(settings)
 
@@ -47,3 +46,18 @@ async def test_post_topic_persists_and_returns_topic(tmp_path) -> None:
         saved = result.one()
         assert saved.title == "My Topic"
         assert saved.detail == "Details"
+
+
+def test_topic_requests_share_app_database_without_ddl(app_client, monkeypatch):
+    database = app_client.app.state.database
+    create_all_calls = []
+    monkeypatch.setattr(
+        SQLModel.metadata, "create_all", lambda *a, **kw: create_all_calls.append(a)
+    )
+
+    for title in ("First", "Second"):
+        response = app_client.post("/api/topics", json={"title": title})
+        assert response.status_code == 200
+
+    assert app_client.app.state.database is database
+    assert create_all_calls == []
@@ -0,0 +1,105 @@
+import pytest
+import pytest_asyncio
+from backend.app.api.dependencies import (
+    get_read_session_dep,
+    get_session_dep,
+    get_settings,
+)
+from backend.app.core.config import Settings
+from backend.app.core.db import get_engine, get_session
+from backend.app.core.persistence import save_topic
+from backend.app.main import create_app
+from backend.app.models import Draft
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlmodel import SQLModel
+
+
+@pytest_asyncio.fixture
+async def seeded(database_url):
+    settings = Settings(
+        _env_file=None,
+        claude_api_key="sk-test",
+        database_url=database_url,
+    )
+    engine = get_engine(settings)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with get_session(engine) as session:
+        for idx in range(5):
+            topic = await save_topic(
+                session, f"Topic {idx}", suggestions=[f"S{idx}-{p}" for p in range(3)]
+            )
+            session.add(Draft(topic_id=topic.id, content=f"Draft {idx}"))
+            await session.commit()
+
+    app = create_app()
+    app.dependency_overrides[get_settings] = lambda: settings
+
+    async def override_session_dep():
+        async with get_session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session_dep] = override_session_dep
+    app.dependency_overrides[get_read_session_dep] = override_session_dep
+
+    statements: list[str] = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client, statements
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_list_topics_pages_newest_first_with_cursor(seeded) -> None:
+    client, statements = seeded
+
+    first = (await client.get("/api/topics", params={"limit": 2})).json()
+    second = (
+        await client.get(
+            "/api/topics", params={"limit": 2, "cursor": first["next_cursor"]}
+        )
+    ).json()
+    last = (
+        await client.get(
+            "/api/topics", params={"limit": 2, "cursor": second["next_cursor"]}
+        )
+    ).json()
+
+    assert [t["title"] for t in first["items"]] == ["Topic 4", "Topic 3"]
+    assert [t["title"] for t in second["items"]] == ["Topic 2", "Topic 1"]
+    assert [t["title"] for t in last["items"]] == ["Topic 0"]
+    assert last["next_cursor"] is None
+    assert len(statements) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_topic_returns_ordered_suggestions_and_drafts(seeded) -> None:
+    client, statements = seeded
+
+    response = await client.get("/api/topics/2")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["title"] == "Topic 1"
+    assert [s["content"] for s in body["suggestions"]] == ["S1-0", "S1-1", "S1-2"]
+    assert [s["position"] for s in body["suggestions"]] == [0, 1, 2]
+    assert [d["content"] for d in body["drafts"]] == ["Draft 1"]
+    # One query each for the topic, its suggestions and its drafts.
+    assert len(statements) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_topic_returns_404_for_missing_topic(seeded) -> None:
+    client, _ = seeded
+
+    response = await client.get("/api/topics/999")
+
+    assert response.status_code == 404
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+from backend.app.core.config import get_settings
+from backend.app.core.tracing import (
+    JsonlSpanExporter,
+    Span,
+    _current_trace,
+    span,
+    start_span,
+    to_otlp,
+)
+from backend.app.main import create_app
+from fastapi.testclient import TestClient
+
+VALID_RESPONSE = "### Outline A: 1\n### Outline B: 2\n### Outline C: 3"
+
+
+@pytest.fixture
+def traced_client(app_client: TestClient, monkeypatch, tmp_path, fake_llm_server):
+    monkeypatch.setenv("TRACING_ENABLED", "true")
+    monkeypatch.setenv("TRACING_PATH", str(tmp_path / "traces.jsonl"))
+    monkeypatch.setenv("CLAUDE_MESSAGES_URL", fake_llm_server.url)
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    get_settings.cache_clear()
+    with TestClient(create_app()) as client:
+        yield client, tmp_path / "traces.jsonl"
+
+
+def test_suggestion_request_is_traced_with_nested_spans(traced_client, fake_llm_server):
+    client, path = traced_client
+    fake_llm_server.respond(
+        body={
+            "content": [{"type": "text", "text": VALID_RESPONSE}],
+            "usage": {"input_tokens": 40, "output_tokens": 12},
+        }
+    )
+
+    # When
+    response = client.post("/api/suggestions", json={"topic": "Tracing"})
+
+    # Then the browser-facing header lists the top-level phases
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    for phase in ("di.session", "prompt.load", "prompt.render", "llm", "parse"):
+        assert f"{phase};dur=" in timing
+    assert "db.commit;dur=" in timing
+    assert "total;dur=" in timing
+
+    # And the exported trace links each span to its parent
+    (line,) = path.read_text().splitlines()
+    spans = {s["name"]: s for s in json.loads(line)["spans"]}
+    root = spans["request"]
+    assert root["parent_id"] is None
+    assert root["attributes"]["http_route"] == "/api/suggestions"
+    assert root["attributes"]["http_status_code"] == 200
+    assert spans["llm"]["parent_id"] == root["span_id"]
+    llm_request = spans["llm.request"]
+    assert llm_request["parent_id"] == spans["llm"]["span_id"]
+    assert llm_request["attributes"]["input_tokens"] == 40
+    assert llm_request["attributes"]["output_tokens"] == 12
+    assert spans["prompt.render"]["attributes"]["topic_length"] == len("Tracing")
+    assert len(spans["prompt.load"]["attributes"]["prompt_hash"]) == 16
+
+
+def test_span_is_a_no_op_outside_a_trace():
+    assert _current_trace.get() is None
+    with span("orphan") as orphan:
+        assert orphan is None
+    assert start_span("orphan") is None
+
+
+def test_otlp_export_format(tmp_path):
+    root = Span("request", "ab" * 16, "01" * 8, None, 1_000, 5_000)
+    child = Span("llm", "ab" * 16, "02" * 8, "01" * 8, 2_000, 4_000, error="Boom")
+    child.set(model="claude", input_tokens=3, cached=False, score=0.5)
+    exporter = JsonlSpanExporter(tmp_path / "otlp.jsonl", format="otlp")
+
+    exporter.export([root, child])
+
+    record = json.loads((tmp_path / "otlp.jsonl").read_text())
+    assert record == to_otlp([root, child])
+    scope_spans = record["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    exported_root, exported_child = scope_spans
+    assert exported_root["kind"] == 2 and "parentSpanId" not in exported_root
+    assert exported_child["parentSpanId"] == "01" * 8
+    assert exported_child["startTimeUnixNano"] == "2000"
+    assert exported_child["status"] == {"code": 2, "message": "Boom"}
+    assert {"key": "input_tokens", "value": {"intValue": "3"}} in exported_child[
+        "attributes"
+    ]
+    assert {"key": "cached", "value": {"boolValue": False}} in exported_child[
+        "attributes"
+    ]
+
+
+def test_exporter_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        JsonlSpanExporter(tmp_path / "x.jsonl", format="zipkin")